@@ -1,13 +1,15 @@
 import logging
 from logging.handlers import RotatingFileHandler
 import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
 
-from flask import Flask
-from flask_wtf import CSRFProtect
-from dotenv import load_dotenv
-
-from .models import GestorPropostas
-from .services.storage import StorageManager
+# Importar o pacote não tem efeitos colaterais: logging, banco, repositório e
+# Flask só são preparados em create_app() (ou no primeiro acesso a
+# `repositorio`/`gestor`). Assim scripts, testes e workers que só precisam de
+# models ou storage não pagam pela aplicação inteira.
 
 # === caminhos base ===
 # pasta do pacote gestor_propostas
@@ -20,55 +22,162 @@ STATIC_DIR = os.path.join(ROOT_DIR, "static")
 
 # === configuração de logging ===
 LOG_DIR = os.path.join(ROOT_DIR, "logs")
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
 
-LOG_LEVEL = os.environ.get("DEALFLOW_LOG_LEVEL", "INFO").upper()
-
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        RotatingFileHandler(LOG_FILE, maxBytes=5_000_000, backupCount=3, encoding='utf-8'),
-        logging.StreamHandler()  # também para console
-    ]
-)
 logger = logging.getLogger(__name__)
 
-# Carrega variáveis do .env quando disponível
-load_dotenv(os.path.join(ROOT_DIR, ".env"))
-
-# instância global do gestor (usada no ui.py)
-gestor = GestorPropostas()
-StorageManager.init_db()
-StorageManager.carregar_tudo(gestor)
+_lock = threading.RLock()
+_logging_configurado = False
+# (fase, segundos) de cada etapa da inicialização, na ordem; ver profile_startup.py
+_fases: List[Tuple[str, float]] = []
+
+
+def _ativado(nome: str) -> bool:
+    return os.environ.get(nome, "").lower() in {"1", "true", "yes"}
+
+
+@contextmanager
+def _fase(nome: str) -> Iterator[None]:
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        _fases.append((nome, time.perf_counter() - inicio))
+
+
+def fases_inicializacao() -> List[Tuple[str, float]]:
+    return list(_fases)
+
+
+def configurar_logging() -> None:
+    global _logging_configurado
+    with _lock:
+        if _logging_configurado:
+            return
+        with _fase("logging"):
+            log_dir = os.environ.get("DEALFLOW_LOG_DIR") or LOG_DIR
+            os.makedirs(log_dir, exist_ok=True)
+            log_file = os.path.join(log_dir, os.path.basename(LOG_FILE))
+            logging.basicConfig(
+                level=os.environ.get("DEALFLOW_LOG_LEVEL", "INFO").upper(),
+                format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                handlers=[
+                    RotatingFileHandler(log_file, maxBytes=5_000_000, backupCount=3, encoding='utf-8'),
+                    logging.StreamHandler()  # também para console
+                ]
+            )
+        _logging_configurado = True
+
+
+def inicializar():
+    """Prepara banco, alocador de ids e repositório (uma vez por processo).
+
+    Cria os globais `gestor` e `repositorio` e devolve o repositório.
+    """
+    global gestor, repositorio
+    with _lock:
+        if "repositorio" in globals():
+            return repositorio
+
+        with _fase("dotenv"):
+            from dotenv import load_dotenv
+
+            # Carrega variáveis do .env quando disponível
+            load_dotenv(os.path.join(ROOT_DIR, ".env"))
+
+        # Carregar todo o banco em memória é opcional; por padrão as views consultam
+        # o SQLite através do repositório.
+        preload = _ativado("DEALFLOW_PRELOAD")
+        # com PRELOAD, serve pelo SQLite enquanto o gestor carrega em segundo plano
+        preload_em_segundo_plano = _ativado("DEALFLOW_PRELOAD_BACKGROUND")
+        cache_size = int(os.environ.get("DEALFLOW_CACHE_SIZE", "0") or 0)
+        # com PRELOAD, guarda os itens em colunas (array) em vez de um objeto por item
+        compacto = _ativado("DEALFLOW_COMPACT")
+        # com PRELOAD, lê cada tabela numa conexão própria durante a carga
+        carga_paralela = _ativado("DEALFLOW_PARALLEL_LOAD")
+        # orçamento do índice de busca aproximada de clientes (0 desativa; usa só FTS)
+        fuzzy_max_bytes = int(os.environ.get("DEALFLOW_FUZZY_MAX_BYTES", str(128 * 1024 * 1024)) or 0)
+        checkpoint_interval = float(os.environ.get("DEALFLOW_CHECKPOINT_INTERVAL", "0") or 0)
+
+        with _fase("import models/services"):
+            from .models import GestorPropostas, definir_alocador_ids
+            from .services.ids import IdAllocator
+            from .services.repository import Repository
+            from .services.storage import StorageManager
+
+        with _fase("init_db (migrações)"):
+            StorageManager.init_db()
+        # ids novos saem de blocos reservados no banco, sem colisão entre workers
+        definir_alocador_ids(IdAllocator(StorageManager))
+
+        # repositório usado pelas views (ui.py); o gestor só passa a ser usado
+        # depois de carregado (ver Repository.carregar_gestor)
+        with _fase("repositório"):
+            novo = Repository(
+                cache_size=cache_size,
+                fuzzy_max_bytes=fuzzy_max_bytes,
+                compacto=compacto,
+                paralelo=carga_paralela,
+            )
+        # instância global do gestor (preenchida apenas com DEALFLOW_PRELOAD)
+        gestor = GestorPropostas()
+        if preload:
+            with _fase("carga do gestor (PRELOAD)" + (" em segundo plano" if preload_em_segundo_plano else "")):
+                novo.carregar_gestor(gestor, em_segundo_plano=preload_em_segundo_plano)
+        if fuzzy_max_bytes:
+            novo.construir_indice_clientes(em_segundo_plano=True)
+
+        if checkpoint_interval > 0:
+            StorageManager.checkpoints.start(checkpoint_interval)
+
+        repositorio = novo
+        return repositorio
+
+
+def __getattr__(nome: str):
+    # `from gestor_propostas import repositorio` inicializa sob demanda
+    if nome in ("gestor", "repositorio"):
+        inicializar()
+        return globals()[nome]
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 
 def create_app():
-    # indica explicitamente onde estão templates e estáticos
-    app = Flask(
-        __name__,
-        template_folder=TEMPLATE_DIR,
-        static_folder=STATIC_DIR,
-    )
-
-    app.secret_key = os.environ.get(
-        "DEALFLOW_SECRET_KEY",
-        "troque-este-segredo-depois",
-    )
-
-    app.config.update(
-        SESSION_COOKIE_HTTPONLY=True,
-        SESSION_COOKIE_SAMESITE=os.environ.get("DEALFLOW_SESSION_SAMESITE", "Lax"),
-        SESSION_COOKIE_SECURE=os.environ.get("DEALFLOW_SECURE_COOKIES", "").lower() in {"1", "true", "yes"},
-    )
-
-    CSRFProtect(app)
-
-    # importa e registra o blueprint da UI
-    from .ui import bp as ui_bp
-    app.register_blueprint(ui_bp)
-    from .auth import bp as auth_bp
-    app.register_blueprint(auth_bp)
+    configurar_logging()
+    inicializar()
+
+    with _fase("import flask"):
+        from flask import Flask
+        from flask_wtf import CSRFProtect
+
+    with _fase("create_app"):
+        # indica explicitamente onde estão templates e estáticos
+        app = Flask(
+            __name__,
+            template_folder=TEMPLATE_DIR,
+            static_folder=STATIC_DIR,
+        )
+
+        app.secret_key = os.environ.get(
+            "DEALFLOW_SECRET_KEY",
+            "troque-este-segredo-depois",
+        )
+
+        app.config.update(
+            SESSION_COOKIE_HTTPONLY=True,
+            SESSION_COOKIE_SAMESITE=os.environ.get("DEALFLOW_SESSION_SAMESITE", "Lax"),
+            SESSION_COOKIE_SECURE=_ativado("DEALFLOW_SECURE_COOKIES"),
+        )
+
+        CSRFProtect(app)
+
+        # importa e registra o blueprint da UI
+        from .ui import bp as ui_bp
+        app.register_blueprint(ui_bp)
+        from .auth import bp as auth_bp
+        app.register_blueprint(auth_bp)
+        # API JSON somente leitura em /api/v1
+        from .api import bp as api_bp
+        app.register_blueprint(api_bp)
 
     return app
@@ -0,0 +1,286 @@
+"""API JSON somente leitura em /api/v1 (clientes, propostas, itens e templates).
+
+- `?fields=id,titulo,total` escolhe os campos de cada registro;
+- listagens paginam por cursor: a resposta traz `proximo`/`anterior`, que
+  voltam como `?apos=`/`?antes=` (ver Repository.paginar_propostas);
+- `?ids=1,2,3` busca vários registros de uma vez, na ordem pedida;
+- autenticação pela sessão da UI ou HTTP Basic (usuários de users.json).
+"""
+import hashlib
+import json
+import threading
+import time
+from datetime import date, datetime
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+from flask import Blueprint, Response, request, session
+
+from .auth import AuthManager
+
+# instância global criada por inicializar() em __init__.py; resolvida ao
+# registrar o blueprint para que importar este módulo não abra o banco
+repositorio = None
+
+try:
+    import orjson
+except ImportError:  # opcional: sem ele, json da stdlib com separadores compactos
+    orjson = None
+
+bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+LIMITE_PADRAO = 50
+LIMITE_MAXIMO = 500
+# credenciais Basic já verificadas valem por este tempo sem repetir o hash Argon2
+CREDENCIAIS_TTL = 60.0
+
+_credenciais: Dict[bytes, float] = {}
+_credenciais_lock = threading.Lock()
+
+
+# ========= serialização ========= #
+
+def _dumps(dados) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(dados)
+    return json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json(dados, status: int = 200) -> Response:
+    return Response(_dumps(dados), status=status, mimetype="application/json")
+
+
+def _erro(mensagem: str, status: int) -> Response:
+    return _json({"erro": mensagem}, status)
+
+
+def _data(valor) -> Optional[str]:
+    if isinstance(valor, datetime):
+        return valor.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(valor, date):
+        return valor.strftime("%Y-%m-%d")
+    return None
+
+
+# campo -> função que extrai o valor; `fields` escolhe entre eles
+CAMPOS_CLIENTE: Dict[str, Callable] = {
+    "id": lambda c: c.id,
+    "nome": lambda c: c.nome,
+    "documento": lambda c: c.documento,
+    "contato": lambda c: c.contato,
+}
+
+CAMPOS_ITEM: Dict[str, Callable] = {
+    "id": lambda i: i.id,
+    "descricao": lambda i: i.descricao,
+    "quantidade": lambda i: i.quantidade,
+    "valor_unitario": lambda i: i.valor_unitario,
+    "total": lambda i: i.total,
+}
+
+CAMPOS_PROPOSTA: Dict[str, Callable] = {
+    "id": lambda p: p.id,
+    "titulo": lambda p: p.titulo,
+    "status": lambda p: p.status,
+    "cliente_id": lambda p: p.cliente.id,
+    "cliente": lambda p: {"id": p.cliente.id, "nome": p.cliente.nome},
+    "data_criacao": lambda p: _data(p.data_criacao),
+    "validade": lambda p: _data(p.validade),
+    "responsavel": lambda p: p.responsavel,
+    "condicoes_pagamento": lambda p: p.condicoes_pagamento,
+    "template_id": lambda p: p.template_id,
+    "subtotal": lambda p: p.calcular_subtotal(),
+    "desconto": lambda p: p.calcular_desconto(),
+    "total": lambda p: p.calcular_total(),
+    "itens": lambda p: [_serializar(i, CAMPOS_ITEM) for i in p.itens],
+}
+# `itens` só vem quando pedido em `fields`
+PADRAO_PROPOSTA = [campo for campo in CAMPOS_PROPOSTA if campo != "itens"]
+
+CAMPOS_TEMPLATE: Dict[str, Callable] = {
+    "id": lambda t: t.id,
+    "nome": lambda t: t.nome,
+    "titulo_padrao": lambda t: t.titulo_padrao,
+    "responsavel_padrao": lambda t: t.responsavel_padrao,
+    "condicoes_pagamento_padrao": lambda t: t.condicoes_pagamento_padrao,
+    "intro_texto": lambda t: t.intro_texto,
+    "termos": lambda t: t.termos,
+    "rodape": lambda t: t.rodape,
+    "cor_primaria": lambda t: t.cor_primaria,
+    "usar_logo": lambda t: t.usar_logo,
+}
+
+
+def _serializar(obj, campos: Dict[str, Callable], nomes: Optional[List[str]] = None) -> dict:
+    return {nome: campos[nome](obj) for nome in (nomes or campos)}
+
+
+class _ParametroInvalido(ValueError):
+    pass
+
+
+def _campos(campos: Dict[str, Callable], padrao: Optional[List[str]] = None) -> List[str]:
+    pedido = request.args.get("fields", "").strip()
+    if not pedido:
+        return padrao or list(campos)
+    nomes = [nome.strip() for nome in pedido.split(",") if nome.strip()]
+    desconhecidos = [nome for nome in nomes if nome not in campos]
+    if desconhecidos:
+        raise _ParametroInvalido(f"Campos desconhecidos: {', '.join(desconhecidos)}")
+    return nomes
+
+
+def _ids() -> Optional[List[int]]:
+    valor = request.args.get("ids")
+    if valor is None:
+        return None
+    try:
+        ids = [int(parte) for parte in valor.split(",") if parte.strip()]
+    except ValueError:
+        raise _ParametroInvalido("`ids` deve ser uma lista de inteiros separados por vírgula")
+    if len(ids) > LIMITE_MAXIMO:
+        raise _ParametroInvalido(f"No máximo {LIMITE_MAXIMO} ids por requisição")
+    return ids
+
+
+def _limite() -> int:
+    return min(max(request.args.get("limit", LIMITE_PADRAO, type=int), 1), LIMITE_MAXIMO)
+
+
+def _lista(registros, campos: Dict[str, Callable], nomes: List[str], pagina=None) -> Response:
+    corpo = {"dados": [_serializar(obj, campos, nomes) for obj in registros]}
+    if pagina is not None:
+        corpo["proximo"] = pagina.proximo
+        corpo["anterior"] = pagina.anterior
+    return _json(corpo)
+
+
+# ========= autenticação ========= #
+
+def _credenciais_validas(usuario: str, senha: str) -> bool:
+    chave = hashlib.sha256(f"{usuario}\0{senha}".encode("utf-8")).digest()
+    agora = time.monotonic()
+    with _credenciais_lock:
+        if _credenciais.get(chave, 0.0) > agora:
+            return True
+    if AuthManager.authenticate(usuario, senha) is None:
+        return False
+    with _credenciais_lock:
+        _credenciais[chave] = agora + CREDENCIAIS_TTL
+    return True
+
+
+@bp.record_once
+def _resolver_repositorio(_state):
+    global repositorio
+    if repositorio is None:
+        from . import repositorio
+
+
+@bp.before_request
+def _antes():
+    if "username" not in session:
+        auth = request.authorization
+        if not auth or auth.type != "basic" or not _credenciais_validas(auth.username or "", auth.password or ""):
+            resposta = _erro("Autenticação necessária.", 401)
+            resposta.headers["WWW-Authenticate"] = 'Basic realm="DealFlow API"'
+            return resposta
+    # gravações de outros workers desde a última requisição
+    repositorio.sincronizar()
+
+
+def _tratar_parametros(view):
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except _ParametroInvalido as exc:
+            return _erro(str(exc), 400)
+
+    return wrapper
+
+
+# ========= rotas ========= #
+
+@bp.route("/resumo")
+def resumo():
+    dados = repositorio.resumo_dashboard()
+    dados["status_counts"] = dict(dados["status_counts"])
+    dados["arrecadacao_por_mes"] = dict(dados["arrecadacao_por_mes"])
+    return _json(dados)
+
+
+@bp.route("/clientes")
+@_tratar_parametros
+def clientes():
+    nomes = _campos(CAMPOS_CLIENTE)
+    ids = _ids()
+    if ids is not None:
+        return _lista(repositorio.obter_clientes(ids), CAMPOS_CLIENTE, nomes)
+    pagina = repositorio.paginar_clientes(limit=_limite(), apos=request.args.get("apos") or None)
+    return _lista(pagina.registros, CAMPOS_CLIENTE, nomes, pagina)
+
+
+@bp.route("/clientes/<int:cliente_id>")
+@_tratar_parametros
+def cliente(cliente_id: int):
+    obj = repositorio.obter_cliente(cliente_id)
+    if obj is None:
+        return _erro("Cliente não encontrado.", 404)
+    return _json(_serializar(obj, CAMPOS_CLIENTE, _campos(CAMPOS_CLIENTE)))
+
+
+@bp.route("/propostas")
+@_tratar_parametros
+def propostas():
+    nomes = _campos(CAMPOS_PROPOSTA, PADRAO_PROPOSTA)
+    ids = _ids()
+    if ids is not None:
+        return _lista(repositorio.obter_propostas(ids), CAMPOS_PROPOSTA, nomes)
+    pagina = repositorio.paginar_propostas(
+        status=request.args.get("status", "").strip(),
+        q=request.args.get("q", "").strip(),
+        ordenar=request.args.get("ordenar", "").strip(),
+        limit=_limite(),
+        apos=request.args.get("apos") or None,
+        antes=request.args.get("antes") or None,
+    )
+    return _lista(pagina.registros, CAMPOS_PROPOSTA, nomes, pagina)
+
+
+@bp.route("/propostas/<int:pid>")
+@_tratar_parametros
+def proposta(pid: int):
+    obj = repositorio.obter_proposta(pid)
+    if obj is None:
+        return _erro("Proposta não encontrada.", 404)
+    return _json(_serializar(obj, CAMPOS_PROPOSTA, _campos(CAMPOS_PROPOSTA, PADRAO_PROPOSTA)))
+
+
+@bp.route("/propostas/<int:pid>/itens")
+@_tratar_parametros
+def itens(pid: int):
+    obj = repositorio.obter_proposta(pid)
+    if obj is None:
+        return _erro("Proposta não encontrada.", 404)
+    return _lista(obj.itens, CAMPOS_ITEM, _campos(CAMPOS_ITEM))
+
+
+@bp.route("/templates")
+@_tratar_parametros
+def templates():
+    nomes = _campos(CAMPOS_TEMPLATE)
+    ids = _ids()
+    if ids is not None:
+        return _lista(repositorio.obter_templates(ids), CAMPOS_TEMPLATE, nomes)
+    pagina = repositorio.paginar_templates(limit=_limite(), apos=request.args.get("apos") or None)
+    return _lista(pagina.registros, CAMPOS_TEMPLATE, nomes, pagina)
+
+
+@bp.route("/templates/<int:tid>")
+@_tratar_parametros
+def template(tid: int):
+    obj = repositorio.obter_template(tid)
+    if obj is None:
+        return _erro("Template não encontrado.", 404)
+    return _json(_serializar(obj, CAMPOS_TEMPLATE, _campos(CAMPOS_TEMPLATE)))
@@ -1,12 +1,40 @@
+from array import array
 from datetime import datetime
-from typing import List, Optional
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+# Gerador de ids novos: por padrão, um contador por classe (uso só em memória).
+# A aplicação troca por um alocador que reserva blocos no banco
+# (services/ids.py), que recebe o nome da tabela.
+_alocador_ids: Optional[Callable[[str], int]] = None
+_contadores_lock = threading.Lock()
+
+
+def definir_alocador_ids(alocador: Optional[Callable[[str], int]]) -> None:
+    global _alocador_ids
+    _alocador_ids = alocador
+
+
+def _novo_id(modelo) -> int:
+    if _alocador_ids is not None:
+        return _alocador_ids(modelo._tabela)
+    with _contadores_lock:
+        novo = modelo._contador_id
+        modelo._contador_id = novo + 1
+    return novo
+
 
 class Cliente:
+    __slots__ = ("id", "nome", "documento", "contato")
     _contador_id = 1
+    _tabela = "clientes"
 
-    def __init__(self, nome: str, documento: str = "", contato: str = ""):
-        self.id = Cliente._contador_id
-        Cliente._contador_id += 1
+    def __init__(self, nome: str, documento: str = "", contato: str = "", id: Optional[int] = None):
+        if id is None:
+            id = _novo_id(Cliente)
+        self.id = id
 
         self.nome = nome
         self.documento = documento
@@ -19,14 +47,50 @@ class Cliente:
 
 
 class ItemProposta:
-    def __init__(self, descricao: str, quantidade: int, valor_unitario: float):
+    __slots__ = ("id", "descricao", "_proposta", "_quantidade", "_valor_unitario")
+
+    def __init__(
+        self,
+        descricao: str,
+        quantidade: int,
+        valor_unitario: float,
+        id: Optional[int] = None,
+    ):
+        # id da linha em `itens`; None até o item ser persistido
+        self.id = id
         self.descricao = descricao
-        self.quantidade = quantidade
-        self.valor_unitario = valor_unitario
+        # proposta que contém o item (avisada quando quantidade/valor mudam)
+        self._proposta: Optional["Proposta"] = None
+        self._quantidade = quantidade
+        self._valor_unitario = valor_unitario
+
+    @property
+    def quantidade(self) -> int:
+        return self._quantidade
+
+    @quantidade.setter
+    def quantidade(self, valor: int):
+        antes = self.total
+        self._quantidade = valor
+        self._avisar(self.total - antes)
+
+    @property
+    def valor_unitario(self) -> float:
+        return self._valor_unitario
+
+    @valor_unitario.setter
+    def valor_unitario(self, valor: float):
+        antes = self.total
+        self._valor_unitario = valor
+        self._avisar(self.total - antes)
+
+    def _avisar(self, delta: float) -> None:
+        if self._proposta is not None:
+            self._proposta._somar_subtotal(delta)
 
     @property
     def total(self) -> float:
-        return self.quantidade * self.valor_unitario
+        return self._quantidade * self._valor_unitario
 
     def __str__(self) -> str:
         return (
@@ -36,7 +100,21 @@ class ItemProposta:
 
 
 class TemplateProposta:
+    __slots__ = (
+        "id",
+        "nome",
+        "titulo_padrao",
+        "responsavel_padrao",
+        "condicoes_pagamento_padrao",
+        "intro_texto",
+        "termos",
+        "rodape",
+        "cor_primaria",
+        "usar_logo",
+        "logo_path",
+    )
     _contador_id = 1
+    _tabela = "templates"
 
     def __init__(
         self,
@@ -50,9 +128,11 @@ class TemplateProposta:
         cor_primaria: str = "#1f4e79",
         usar_logo: bool = True,
         logo_path: str = "static/img/dealflow_logo.png",
+        id: Optional[int] = None,
     ):
-        self.id = TemplateProposta._contador_id
-        TemplateProposta._contador_id += 1
+        if id is None:
+            id = _novo_id(TemplateProposta)
+        self.id = id
 
         self.nome = nome
         self.titulo_padrao = titulo_padrao
@@ -69,8 +149,156 @@ class TemplateProposta:
         return f"({self.id}) {self.nome}"
 
 
+class _ListaItens(list):
+    """Lista de itens de uma proposta que mantém o subtotal em cache.
+
+    Inclusões e remoções pontuais ajustam o subtotal pela diferença;
+    operações em bloco (fatias, ordenação etc.) só invalidam o cache.
+    """
+
+    __slots__ = ("_proposta",)
+
+    def __init__(self, proposta: "Proposta", itens: Iterable[ItemProposta] = ()):
+        super().__init__()
+        self._proposta = proposta
+        for item in itens:
+            self.append(item)
+
+    def _vincular(self, itens: Iterable[ItemProposta]) -> None:
+        for item in itens:
+            item._proposta = self._proposta
+
+    def _desvincular(self, item: ItemProposta) -> None:
+        if item._proposta is self._proposta:
+            item._proposta = None
+
+    def append(self, item: ItemProposta) -> None:
+        super().append(item)
+        item._proposta = self._proposta
+        self._proposta._somar_subtotal(item.total)
+
+    def insert(self, indice: int, item: ItemProposta) -> None:
+        super().insert(indice, item)
+        item._proposta = self._proposta
+        self._proposta._somar_subtotal(item.total)
+
+    def extend(self, itens: Iterable[ItemProposta]) -> None:
+        for item in itens:
+            self.append(item)
+
+    def __iadd__(self, itens: Iterable[ItemProposta]) -> "_ListaItens":
+        self.extend(itens)
+        return self
+
+    def pop(self, indice: int = -1) -> ItemProposta:
+        item = super().pop(indice)
+        self._desvincular(item)
+        self._proposta._somar_subtotal(-item.total)
+        return item
+
+    def remove(self, item: ItemProposta) -> None:
+        super().remove(item)
+        self._desvincular(item)
+        self._proposta._somar_subtotal(-item.total)
+
+    def clear(self) -> None:
+        for item in self:
+            self._desvincular(item)
+        super().clear()
+        self._proposta._subtotal = 0
+
+    def __setitem__(self, indice, valor) -> None:
+        if isinstance(indice, slice):
+            antigos, valor = self[indice], list(valor)
+            novos = valor
+        else:
+            antigos, novos = [self[indice]], [valor]
+        for item in antigos:
+            self._desvincular(item)
+        super().__setitem__(indice, valor)
+        self._vincular(novos)
+        self._proposta._invalidar_subtotal()
+
+    def __delitem__(self, indice) -> None:
+        antigos = self[indice] if isinstance(indice, slice) else [self[indice]]
+        for item in antigos:
+            self._desvincular(item)
+        super().__delitem__(indice)
+        self._proposta._invalidar_subtotal()
+
+    def __imul__(self, n: int) -> "_ListaItens":
+        super().__imul__(n)
+        self._proposta._invalidar_subtotal()
+        return self
+
+    def sort(self, *args, **kwargs) -> None:
+        # a soma não muda, mas em ponto flutuante a ordem importa
+        super().sort(*args, **kwargs)
+        self._proposta._invalidar_subtotal()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._proposta._invalidar_subtotal()
+
+
+class ItensColunares:
+    """Itens de uma proposta guardados em colunas, sem um objeto por item.
+
+    Usado no modo compacto de `StorageManager.carregar_tudo`. Subtotal e
+    quantidade de itens saem direto das colunas; no primeiro acesso a
+    `Proposta.itens` as colunas viram uma lista comum de ItemProposta.
+    """
+
+    __slots__ = ("ids", "descricoes", "quantidades", "valores")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.descricoes: List[str] = []
+        self.quantidades = array("q")
+        self.valores = array("d")
+
+    def adicionar(self, descricao: str, quantidade: int, valor_unitario: float, id: Optional[int] = None):
+        # 0 = item ainda não persistido
+        self.ids.append(id or 0)
+        # descrições se repetem muito entre propostas
+        self.descricoes.append(sys.intern(descricao))
+        self.quantidades.append(quantidade)
+        self.valores.append(valor_unitario)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def subtotal(self) -> float:
+        return sum(q * v for q, v in zip(self.quantidades, self.valores))
+
+    def materializar(self) -> List[ItemProposta]:
+        return [
+            ItemProposta(descricao, quantidade, valor, id=item_id or None)
+            for item_id, descricao, quantidade, valor in zip(
+                self.ids, self.descricoes, self.quantidades, self.valores
+            )
+        ]
+
+
 class Proposta:
+    __slots__ = (
+        "id",
+        "cliente",
+        "titulo",
+        "data_criacao",
+        "status",
+        "_itens",
+        "_subtotal",
+        "validade",
+        "responsavel",
+        "condicoes_pagamento",
+        "template_id",
+        "tipo_desconto",
+        "desconto_percentual",
+        "desconto_valor",
+    )
     _contador_id = 1
+    _tabela = "propostas"
     STATUS_VALIDOS = ["rascunho", "enviada", "aceita", "recusada", "cancelada"]
 
     def __init__(
@@ -81,14 +309,18 @@ class Proposta:
         responsavel: str = "",
         condicoes_pagamento: str = "",
         template_id: Optional[int] = None,
+        id: Optional[int] = None,
     ):
-        self.id = Proposta._contador_id
-        Proposta._contador_id += 1
+        if id is None:
+            id = _novo_id(Proposta)
+        self.id = id
 
         self.cliente = cliente
         self.titulo = titulo or f"Proposta {self.id}"
         self.data_criacao = datetime.now()
         self.status = "rascunho"
+        # subtotal em cache (None = recalcular); mantido por _ListaItens
+        self._subtotal: Optional[float] = 0
         self.itens: List[ItemProposta] = []
         self.validade = validade         
         self.responsavel = responsavel
@@ -99,11 +331,41 @@ class Proposta:
         self.desconto_percentual = 0.0
         self.desconto_valor = 0.0
 
+    @property
+    def itens(self) -> List[ItemProposta]:
+        if type(self._itens) is ItensColunares:
+            self.itens = self._itens.materializar()
+        return self._itens
+
+    @itens.setter
+    def itens(self, itens: Iterable[ItemProposta]):
+        self._subtotal = 0
+        self._itens = _ListaItens(self, itens)
+
+    def usar_itens_colunares(self, colunas: ItensColunares) -> None:
+        """Troca os itens pela representação compacta (modo de carga em massa)."""
+        self._itens = colunas
+        self._subtotal = None
+
+    def _somar_subtotal(self, delta: float) -> None:
+        if self._subtotal is not None:
+            self._subtotal += delta
+
+    def _invalidar_subtotal(self) -> None:
+        self._subtotal = None
+
     def adicionar_item(self, item: ItemProposta):
         self.itens.append(item)
 
     def calcular_subtotal(self) -> float:
-        return sum(item.total for item in self.itens)
+        # O(1): o subtotal acompanha as alterações nos itens; desconto e total
+        # derivam dele sem percorrer a lista
+        if self._subtotal is None:
+            if type(self._itens) is ItensColunares:
+                self._subtotal = self._itens.subtotal()
+            else:
+                self._subtotal = sum(item.total for item in self._itens)
+        return self._subtotal
 
     def definir_desconto_percentual(self, percentual: float):
         self.tipo_desconto = "%"
@@ -115,8 +377,9 @@ class Proposta:
         self.desconto_valor = max(0.0, valor)
         self.desconto_percentual = 0.0
 
-    def calcular_desconto(self) -> float:
-        subtotal = self.calcular_subtotal()
+    def calcular_desconto(self, subtotal: Optional[float] = None) -> float:
+        if subtotal is None:
+            subtotal = self.calcular_subtotal()
         if self.tipo_desconto == "%":
             return subtotal * (self.desconto_percentual / 100.0)
         elif self.tipo_desconto == "R":
@@ -125,7 +388,7 @@ class Proposta:
 
     def calcular_total(self) -> float:
         subtotal = self.calcular_subtotal()
-        desconto = self.calcular_desconto()
+        desconto = self.calcular_desconto(subtotal)
         return max(0.0, subtotal - desconto)
 
     def alterar_status(self, novo_status: str):
@@ -139,32 +402,370 @@ class Proposta:
         total = self.calcular_total()
         return (
             f"#{self.id} - {self.titulo} | Cliente: {self.cliente.nome} | "
-            f"Status: {self.status} | Itens: {len(self.itens)} | "
+            f"Status: {self.status} | Itens: {len(self._itens)} | "
             f"Subtotal: R$ {subtotal:.2f} | Total: R$ {total:.2f}"
         )
 
 
+class MapaIds:
+    """Mapa id -> objeto que não muda depois de publicado.
+
+    Os ids ficam em fatias de 1024 ids consecutivos; uma edição (`editar`)
+    copia só o dicionário de fatias e as fatias em que mexe, então quem
+    ainda segura a versão anterior continua vendo-a inteira e sem locks.
+    A iteração segue a ordem dos ids.
+    """
+
+    __slots__ = ("_fatias", "_tamanho")
+    BITS = 10
+
+    def __init__(self, fatias: Optional[Dict[int, Dict[int, object]]] = None, tamanho: int = 0):
+        self._fatias = fatias or {}
+        self._tamanho = tamanho
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __contains__(self, oid: int) -> bool:
+        fatia = self._fatias.get(oid >> self.BITS)
+        return fatia is not None and oid in fatia
+
+    def get(self, oid: int, padrao=None):
+        fatia = self._fatias.get(oid >> self.BITS)
+        return padrao if fatia is None else fatia.get(oid, padrao)
+
+    def __iter__(self) -> Iterator[int]:
+        fatias = self._fatias
+        for chave in sorted(fatias):
+            yield from fatias[chave]
+
+    def values(self) -> Iterator:
+        fatias = self._fatias
+        for chave in sorted(fatias):
+            yield from fatias[chave].values()
+
+    def editar(self) -> "_EdicaoMapa":
+        return _EdicaoMapa(self)
+
+
+class _EdicaoMapa:
+    """Cópia em edição de um MapaIds; `concluir()` devolve a nova versão."""
+
+    __slots__ = ("_fatias", "_copiadas", "_tamanho")
+
+    def __init__(self, mapa: MapaIds):
+        self._fatias = dict(mapa._fatias)
+        self._copiadas: set = set()
+        self._tamanho = len(mapa)
+
+    def _fatia(self, chave: int) -> Dict[int, object]:
+        if chave not in self._copiadas:
+            self._fatias[chave] = dict(self._fatias.get(chave, ()))
+            self._copiadas.add(chave)
+        return self._fatias[chave]
+
+    def __contains__(self, oid: int) -> bool:
+        fatia = self._fatias.get(oid >> MapaIds.BITS)
+        return fatia is not None and oid in fatia
+
+    def get(self, oid: int, padrao=None):
+        fatia = self._fatias.get(oid >> MapaIds.BITS)
+        return padrao if fatia is None else fatia.get(oid, padrao)
+
+    def __setitem__(self, oid: int, obj) -> None:
+        fatia = self._fatia(oid >> MapaIds.BITS)
+        if oid not in fatia:
+            self._tamanho += 1
+        fatia[oid] = obj
+
+    def pop(self, oid: int, padrao=None):
+        chave = oid >> MapaIds.BITS
+        if oid not in self:
+            return padrao
+        fatia = self._fatia(chave)
+        obj = fatia.pop(oid)
+        self._tamanho -= 1
+        if not fatia:
+            del self._fatias[chave]
+            self._copiadas.discard(chave)
+        return obj
+
+    def values(self) -> Iterator:
+        for chave in sorted(self._fatias):
+            yield from self._fatias[chave].values()
+
+    def concluir(self) -> MapaIds:
+        return MapaIds(self._fatias, self._tamanho)
+
+
+class SnapshotGestor:
+    """Versão imutável do conteúdo de um GestorPropostas.
+
+    Leituras (dashboard, listagens, exportações) podem segurar um snapshot
+    pelo tempo que quiserem: as escritas publicam uma versão nova e nunca
+    alteram esta. Os objetos (Cliente, Proposta...) são compartilhados
+    entre versões; o que é imutável é a estrutura de índices.
+    """
+
+    __slots__ = ("_clientes", "_propostas", "_templates", "_por_status", "_por_cliente", "_por_mes", "_chaves")
+
+    def __init__(self):
+        self._clientes = MapaIds()
+        self._propostas = MapaIds()
+        self._templates = MapaIds()
+        self._por_status: Dict[str, MapaIds] = {}
+        # podem ser muitos clientes: o próprio índice também é um MapaIds
+        self._por_cliente = MapaIds()
+        self._por_mes: Dict[str, MapaIds] = {}
+        # chaves com que cada proposta está indexada (status, cliente, mês)
+        self._chaves = MapaIds()
+
+    @property
+    def clientes(self) -> List[Cliente]:
+        return list(self._clientes.values())
+
+    @property
+    def propostas(self) -> List[Proposta]:
+        return list(self._propostas.values())
+
+    @property
+    def templates(self) -> List[TemplateProposta]:
+        return list(self._templates.values())
+
+    def listar_clientes(self) -> List[Cliente]:
+        return self.clientes
+
+    def obter_cliente_por_id(self, cliente_id: int) -> Optional[Cliente]:
+        return self._clientes.get(cliente_id)
+
+    def listar_propostas(self) -> List[Proposta]:
+        return self.propostas
+
+    def obter_proposta_por_id(self, proposta_id: int) -> Optional[Proposta]:
+        return self._propostas.get(proposta_id)
+
+    def propostas_por_status(self, status: str) -> List[Proposta]:
+        return list(self._por_status.get(status, MapaIds()).values())
+
+    def propostas_do_cliente(self, cliente_id: int) -> List[Proposta]:
+        return list(self._por_cliente.get(cliente_id, MapaIds()).values())
+
+    def propostas_do_mes(self, mes: str) -> List[Proposta]:
+        return list(self._por_mes.get(mes, MapaIds()).values())
+
+    def contagem_por_status(self) -> Dict[str, int]:
+        return {status: len(grupo) for status, grupo in self._por_status.items()}
+
+    def listar_templates(self) -> List[TemplateProposta]:
+        return self.templates
+
+    def obter_template_por_id(self, template_id: int) -> Optional[TemplateProposta]:
+        return self._templates.get(template_id)
+
+
+class _EdicaoGestor:
+    """Alterações em andamento sobre um snapshot; os mapas são copiados sob demanda."""
+
+    INDICES = ("_por_status", "_por_cliente", "_por_mes")
+
+    def __init__(self, base: SnapshotGestor):
+        self.base = base
+        self._mapas: Dict[str, _EdicaoMapa] = {}
+        # índice -> {chave: edição do grupo}
+        self._grupos: Dict[str, Dict[object, _EdicaoMapa]] = {nome: {} for nome in self.INDICES}
+
+    def mapa(self, nome: str) -> _EdicaoMapa:
+        edicao = self._mapas.get(nome)
+        if edicao is None:
+            edicao = self._mapas[nome] = getattr(self.base, nome).editar()
+        return edicao
+
+    def grupo(self, indice: str, chave) -> _EdicaoMapa:
+        grupos = self._grupos[indice]
+        edicao = grupos.get(chave)
+        if edicao is None:
+            edicao = grupos[chave] = getattr(self.base, indice).get(chave, MapaIds()).editar()
+        return edicao
+
+    def zerar(self, *nomes: str) -> None:
+        """Recomeça do vazio os mapas e índices informados."""
+        for nome in nomes:
+            if nome in self._grupos:
+                # grupos vazios somem na conclusão
+                self._grupos[nome] = {chave: MapaIds().editar() for chave in getattr(self.base, nome)}
+            else:
+                self._mapas[nome] = MapaIds().editar()
+
+    def concluir(self) -> SnapshotGestor:
+        versao = SnapshotGestor()
+        for nome in versao.__slots__:
+            setattr(versao, nome, getattr(self.base, nome))
+        for nome, edicao in self._mapas.items():
+            setattr(versao, nome, edicao.concluir())
+        for indice, grupos in self._grupos.items():
+            if not grupos:
+                continue
+            base = getattr(self.base, indice)
+            novo = base.editar() if isinstance(base, MapaIds) else dict(base)
+            for chave, edicao in grupos.items():
+                mapa = edicao.concluir()
+                if len(mapa):
+                    novo[chave] = mapa
+                else:
+                    novo.pop(chave, None)
+            setattr(versao, indice, novo.concluir() if isinstance(novo, _EdicaoMapa) else novo)
+        return versao
+
+
 class GestorPropostas:
+    """Guarda clientes, propostas e templates indexados por id.
+
+    Além dos índices primários, mantém índices secundários de propostas por
+    status, por cliente e por mês de criação ("AAAA-MM"), atualizados a cada
+    criação, remoção ou chamada de `reindexar_proposta`.
+
+    O conteúdo é um SnapshotGestor imutável: cada escrita monta uma versão
+    nova (copiando só o que mudou) e a publica com uma atribuição, então
+    leitores em outras threads nunca veem um índice pela metade. Use
+    `snapshot()` para fazer várias leituras sobre a mesma versão e `lote()`
+    para publicar muitas escritas de uma vez.
+    """
+
     def __init__(self):
-        self.clientes: List[Cliente] = []
-        self.propostas: List[Proposta] = []
-        self.templates: List[TemplateProposta] = []
+        self._versao = SnapshotGestor()
+        self._escrita_lock = threading.RLock()
+        self._edicao: Optional[_EdicaoGestor] = None
+
+    def snapshot(self) -> SnapshotGestor:
+        return self._versao
+
+    @contextmanager
+    def lote(self) -> Iterator[None]:
+        """Agrupa escritas: os leitores só veem o resultado ao final do bloco."""
+        with self._escrita_lock:
+            if self._edicao is not None:
+                yield
+                return
+            self._edicao = _EdicaoGestor(self._versao)
+            try:
+                yield
+                self._versao = self._edicao.concluir()
+            finally:
+                self._edicao = None
+
+    @contextmanager
+    def _editar(self) -> Iterator[_EdicaoGestor]:
+        with self.lote():
+            yield self._edicao
+
+    # listas mantidas por compatibilidade; a fonte de verdade são os snapshots
 
-    def criar_cliente(self, nome: str, documento: str = "", contato: str = "") -> Cliente:
-        cliente = Cliente(nome, documento, contato)
-        self.clientes.append(cliente)
+    @property
+    def clientes(self) -> List[Cliente]:
+        return self._versao.clientes
+
+    @clientes.setter
+    def clientes(self, clientes: List[Cliente]):
+        with self._editar() as ed:
+            ed.zerar("_clientes")
+            for cliente in clientes:
+                self.registrar_cliente(cliente)
+
+    @property
+    def propostas(self) -> List[Proposta]:
+        return self._versao.propostas
+
+    @propostas.setter
+    def propostas(self, propostas: List[Proposta]):
+        with self._editar() as ed:
+            ed.zerar("_propostas", "_chaves", *ed.INDICES)
+            for proposta in propostas:
+                self.registrar_proposta(proposta)
+
+    @property
+    def templates(self) -> List[TemplateProposta]:
+        return self._versao.templates
+
+    @templates.setter
+    def templates(self, templates: List[TemplateProposta]):
+        with self._editar() as ed:
+            ed.zerar("_templates")
+            for template in templates:
+                self.registrar_template(template)
+
+    def limpar(self):
+        with self._editar() as ed:
+            ed.zerar(*SnapshotGestor.__slots__)
+
+    # ---- Clientes ---- #
+
+    def registrar_cliente(self, cliente: Cliente) -> Cliente:
+        self.registrar_clientes((cliente,))
         return cliente
 
+    def registrar_clientes(self, clientes: Iterable[Cliente]) -> None:
+        with self._editar() as ed:
+            mapa = ed.mapa("_clientes")
+            for cliente in clientes:
+                mapa[cliente.id] = cliente
+
+    def criar_cliente(self, nome: str, documento: str = "", contato: str = "") -> Cliente:
+        return self.registrar_cliente(Cliente(nome, documento, contato))
+
     def listar_clientes(self) -> List[Cliente]:
         return self.clientes
 
     def obter_cliente_por_indice(self, indice: int) -> Optional[Cliente]:
-        if 0 <= indice < len(self.clientes):
-            return self.clientes[indice]
+        clientes = self.clientes
+        if 0 <= indice < len(clientes):
+            return clientes[indice]
         return None
 
+    def obter_cliente_por_id(self, cliente_id: int) -> Optional[Cliente]:
+        return self._versao.obter_cliente_por_id(cliente_id)
+
     # ---- Propostas ---- #
 
+    @staticmethod
+    def _chave_mes(proposta: Proposta) -> str:
+        data = proposta.data_criacao
+        return f"{data.year:04d}-{data.month:02d}" if data else ""
+
+    def _indexar(self, ed: _EdicaoGestor, proposta: Proposta) -> None:
+        chaves = (proposta.status, proposta.cliente.id, self._chave_mes(proposta))
+        for indice, chave in zip(ed.INDICES, chaves):
+            ed.grupo(indice, chave)[proposta.id] = proposta
+        ed.mapa("_chaves")[proposta.id] = chaves
+
+    def _desindexar(self, ed: _EdicaoGestor, proposta_id: int) -> None:
+        chaves = ed.mapa("_chaves").pop(proposta_id)
+        if chaves is None:
+            return
+        for indice, chave in zip(ed.INDICES, chaves):
+            ed.grupo(indice, chave).pop(proposta_id)
+
+    def registrar_proposta(self, proposta: Proposta) -> Proposta:
+        self.registrar_propostas((proposta,))
+        return proposta
+
+    def registrar_propostas(self, propostas: Iterable[Proposta]) -> None:
+        with self._editar() as ed:
+            mapa = ed.mapa("_propostas")
+            for proposta in propostas:
+                self._desindexar(ed, proposta.id)
+                mapa[proposta.id] = proposta
+                self._indexar(ed, proposta)
+
+    def reindexar_proposta(self, proposta: Proposta) -> None:
+        """Atualiza os índices secundários após mudar status, cliente ou data."""
+        with self._editar() as ed:
+            if proposta.id not in ed.mapa("_propostas"):
+                return
+            chaves = (proposta.status, proposta.cliente.id, self._chave_mes(proposta))
+            if ed.mapa("_chaves").get(proposta.id) != chaves:
+                self._desindexar(ed, proposta.id)
+                self._indexar(ed, proposta)
+
     def criar_proposta(
         self,
         cliente: Cliente,
@@ -182,19 +783,49 @@ class GestorPropostas:
             condicoes_pagamento=condicoes_pagamento,
             template_id=template_id,
         )
-        self.propostas.append(proposta)
-        return proposta
+        return self.registrar_proposta(proposta)
+
+    def alterar_status_proposta(self, proposta: Proposta, novo_status: str) -> None:
+        proposta.alterar_status(novo_status)
+        self.reindexar_proposta(proposta)
 
     def listar_propostas(self) -> List[Proposta]:
         return self.propostas
 
     def obter_proposta_por_indice(self, indice: int) -> Optional[Proposta]:
-        if 0 <= indice < len(self.propostas):
-            return self.propostas[indice]
+        propostas = self.propostas
+        if 0 <= indice < len(propostas):
+            return propostas[indice]
         return None
 
+    def obter_proposta_por_id(self, proposta_id: int) -> Optional[Proposta]:
+        return self._versao.obter_proposta_por_id(proposta_id)
+
+    def propostas_por_status(self, status: str) -> List[Proposta]:
+        return self._versao.propostas_por_status(status)
+
+    def propostas_do_cliente(self, cliente_id: int) -> List[Proposta]:
+        return self._versao.propostas_do_cliente(cliente_id)
+
+    def propostas_do_mes(self, mes: str) -> List[Proposta]:
+        return self._versao.propostas_do_mes(mes)
+
+    def contagem_por_status(self) -> Dict[str, int]:
+        return self._versao.contagem_por_status()
+
+    def remover_proposta(self, proposta_id: int) -> Optional[Proposta]:
+        with self._editar() as ed:
+            proposta = ed.mapa("_propostas").pop(proposta_id)
+            self._desindexar(ed, proposta_id)
+        return proposta
+
     # ---- Templates ---- #
 
+    def registrar_template(self, template: TemplateProposta) -> TemplateProposta:
+        with self._editar() as ed:
+            ed.mapa("_templates")[template.id] = template
+        return template
+
     def criar_template(
         self,
         nome: str,
@@ -220,14 +851,19 @@ class GestorPropostas:
             usar_logo=usar_logo,
             logo_path=logo_path,
         )
-        self.templates.append(template)
-        return template
+        return self.registrar_template(template)
 
     def listar_templates(self) -> List[TemplateProposta]:
         return self.templates
 
     def obter_template_por_id(self, template_id: int) -> Optional[TemplateProposta]:
-        for template in self.templates:
-            if template.id == template_id:
-                return template
-        return None
+        return self._versao.obter_template_por_id(template_id)
+
+    def remover_template(self, template_id: int) -> Optional[TemplateProposta]:
+        with self._editar() as ed:
+            template = ed.mapa("_templates").pop(template_id)
+            if template:
+                for proposta in ed.mapa("_propostas").values():
+                    if proposta.template_id == template_id:
+                        proposta.template_id = None
+        return template
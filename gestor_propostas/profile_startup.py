@@ -0,0 +1,111 @@
+"""Relatório do tempo de inicialização: imports e cada fase de create_app().
+
+Os imports pesados são medidos um a um antes de create_app(), na ordem em
+que a aplicação os faria; o que sobra em cada fase é o trabalho da própria
+fase (migrações, carga do gestor etc.). Com --detalhar, roda
+`python -X importtime` num processo à parte e lista os módulos mais lentos.
+
+Uso:
+    python -m gestor_propostas.profile_startup
+    python -m gestor_propostas.profile_startup --db /tmp/dealflow.db --detalhar 15
+"""
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+# na ordem em que inicializar() e create_app() os fazem
+IMPORTS = (
+    ("dotenv", "inicialização"),
+    ("gestor_propostas.models", "inicialização"),
+    ("gestor_propostas.services.repository", "inicialização"),
+    ("flask", "create_app"),
+    ("flask_wtf", "create_app"),
+)
+# fora da inicialização: só na primeira exportação
+IMPORTS_ADIADOS = (
+    ("openpyxl", "primeiro Excel"),
+    ("reportlab.pdfgen.canvas", "primeiro PDF"),
+)
+
+
+def _medir_imports(modulos: Tuple[Tuple[str, str], ...]) -> List[Tuple[str, str, float]]:
+    medidos = []
+    for modulo, quando in modulos:
+        inicio = time.perf_counter()
+        try:
+            importlib.import_module(modulo)
+        except ImportError:
+            continue
+        medidos.append((modulo, quando, time.perf_counter() - inicio))
+    return medidos
+
+
+def _imports_mais_lentos(n: int) -> List[Tuple[str, float]]:
+    """Módulos de primeiro nível com maior tempo acumulado em -X importtime."""
+    saida = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            "import gestor_propostas, openpyxl, reportlab.pdfgen.canvas; gestor_propostas.create_app()",
+        ],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    ).stderr
+    acumulado: Dict[str, float] = {}
+    for linha in saida.splitlines():
+        # "import time: <próprio> | <acumulado> | <recuo><módulo>", em microssegundos
+        partes = linha.split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue
+        # só o primeiro nível (um espaço de recuo): o acumulado já inclui os filhos
+        if partes[2].startswith("  "):
+            continue
+        raiz = partes[2].strip().split(".")[0]
+        acumulado[raiz] = acumulado.get(raiz, 0.0) + int(partes[1]) / 1e6
+    return sorted(acumulado.items(), key=lambda item: -item[1])[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tempo de inicialização por fase")
+    parser.add_argument("--db", help="Banco a usar (padrão: DEALFLOW_DB_PATH ou instance/dealflow.db)")
+    parser.add_argument("--detalhar", type=int, default=0, metavar="N", help="Lista os N imports mais lentos")
+    args = parser.parse_args()
+
+    if args.db:
+        # lido quando services.storage é importado
+        os.environ["DEALFLOW_DB_PATH"] = args.db
+
+    inicio = time.perf_counter()
+    imports = _medir_imports(IMPORTS)
+    import gestor_propostas
+
+    gestor_propostas.create_app()
+    total = time.perf_counter() - inicio
+    adiados = _medir_imports(IMPORTS_ADIADOS)
+
+    print("Imports")
+    for modulo, quando, segundos in imports:
+        print(f"  {modulo:40} {segundos * 1000:9.1f} ms  ({quando})")
+    print("Fases")
+    for fase, segundos in gestor_propostas.fases_inicializacao():
+        print(f"  {fase:40} {segundos * 1000:9.1f} ms")
+    print(f"  {'total até create_app()':40} {total * 1000:9.1f} ms")
+    print("Imports adiados")
+    for modulo, quando, segundos in adiados:
+        print(f"  {modulo:40} {segundos * 1000:9.1f} ms  ({quando})")
+
+    if args.detalhar:
+        print(f"Imports mais lentos (-X importtime, {args.detalhar})")
+        for raiz, segundos in _imports_mais_lentos(args.detalhar):
+            print(f"  {raiz:40} {segundos * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
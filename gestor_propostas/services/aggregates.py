@@ -0,0 +1,98 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from ..models import Proposta
+from .migrations import METRICAS_REBUILD_SQL
+from .storage import StorageManager
+
+logger = logging.getLogger(__name__)
+
+# (status, mês "AAAA-MM") -> [quantidade, soma dos totais]
+Grupos = Dict[Tuple[str, str], List[float]]
+
+# diferença de soma abaixo disso é arredondamento acumulado, não drift
+TOLERANCIA = 0.005
+
+
+class AggregateEngine:
+    """Agregados do dashboard lidos da tabela `metricas_dashboard`.
+
+    A tabela (migração 5) é mantida por triggers a cada gravação em
+    propostas ou itens, então `resumo()` lê só uma linha por (status, mês),
+    não importa quantas propostas existam. `verificar()` e `reconstruir()`
+    comparam e refazem a tabela a partir de propostas.
+    """
+
+    SQL_GRUPOS = "SELECT status, mes, qtd, soma FROM metricas_dashboard WHERE qtd <> 0"
+    SQL_RECALCULO = (
+        "SELECT status, substr(data_criacao, 1, 7), COUNT(*), COALESCE(SUM(total), 0) "
+        "FROM propostas GROUP BY 1, 2"
+    )
+
+    def __init__(self, storage=StorageManager):
+        self.storage = storage
+
+    @staticmethod
+    def _agrupar(rows) -> Grupos:
+        return {(status, mes): [qtd, soma] for status, mes, qtd, soma in rows}
+
+    def grupos(self) -> Grupos:
+        """Quantidade e soma dos totais por (status, mês)."""
+        return self._agrupar(self.storage._get_conn().execute(self.SQL_GRUPOS))
+
+    def contar(self, status: Optional[str] = None) -> int:
+        """Quantidade de propostas (de um status ou todas) sem percorrer propostas."""
+        sql, params = "SELECT COALESCE(SUM(qtd), 0) FROM metricas_dashboard", ()
+        if status:
+            sql, params = sql + " WHERE status = ?", (status,)
+        return self.storage._get_conn().execute(sql, params).fetchone()[0]
+
+    def resumo(self) -> Dict[str, object]:
+        """Mesmos campos de Repository.resumo_dashboard (menos total_clientes)."""
+        ordem = {nome: i for i, nome in enumerate(Proposta.STATUS_VALIDOS)}
+        por_status: Dict[str, int] = {}
+        aceitas: Dict[str, List[float]] = {}
+        for (status, mes), (qtd, soma) in self.grupos().items():
+            por_status[status] = por_status.get(status, 0) + qtd
+            if status == "aceita":
+                acumulado = aceitas.setdefault(mes, [0, 0.0])
+                acumulado[0] += qtd
+                acumulado[1] += soma
+
+        return {
+            "total_propostas": sum(por_status.values()),
+            "qtd_aceitas": sum(qtd for qtd, _ in aceitas.values()),
+            "valor_total_aceitas": sum(soma for _, soma in aceitas.values()),
+            "status_counts": sorted(
+                por_status.items(), key=lambda item: (ordem.get(item[0], len(ordem)), item[0])
+            ),
+            "arrecadacao_por_mes": [(mes, aceitas[mes][1]) for mes in sorted(aceitas) if mes],
+        }
+
+    def verificar(self) -> Dict[Tuple[str, str], Tuple[Optional[List[float]], Optional[List[float]]]]:
+        """Grupos em que a tabela diverge de propostas: chave -> (tabela, recalculado)."""
+        conn = self.storage._get_conn()
+        gravados = self._agrupar(conn.execute(self.SQL_GRUPOS))
+        recalculados = self._agrupar(conn.execute(self.SQL_RECALCULO))
+
+        divergentes = {}
+        for chave in gravados.keys() | recalculados.keys():
+            gravado, recalculado = gravados.get(chave), recalculados.get(chave)
+            if (
+                gravado is None
+                or recalculado is None
+                or gravado[0] != recalculado[0]
+                or abs(gravado[1] - recalculado[1]) > TOLERANCIA
+            ):
+                divergentes[chave] = (gravado, recalculado)
+        return divergentes
+
+    def reconstruir(self) -> int:
+        """Refaz a tabela a partir de propostas; devolve quantos grupos divergiam."""
+        with self.storage.transacao() as conn:
+            divergentes = len(self.verificar())
+            for comando in METRICAS_REBUILD_SQL:
+                conn.execute(comando)
+        if divergentes:
+            logger.warning(f"Métricas do dashboard reconstruídas: {divergentes} grupo(s) divergiam.")
+        return divergentes
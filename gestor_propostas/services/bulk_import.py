@@ -0,0 +1,306 @@
+"""Importação em massa de clientes, propostas e itens a partir de CSV ou JSONL.
+
+Os arquivos são lidos em fluxo, `tamanho_lote` registros por vez. Cada lote
+vai para o banco com executemany numa transação própria, junto com o
+progresso (`importacoes`) e o mapa id de origem -> id gravado
+(`importacao_ids`, migração 9). Se o processo cair, rodar de novo com o
+mesmo `nome` continua depois do último lote gravado, sem duplicar nada.
+
+Campos (cabeçalho do CSV ou chaves do JSON):
+    clientes:  id, nome, documento, contato
+    propostas: id, cliente_id, titulo, data_criacao, status, validade,
+               responsavel, condicoes_pagamento, tipo_desconto,
+               desconto_percentual, desconto_valor
+    itens:     proposta_id, descricao, quantidade, valor_unitario
+`id`, `cliente_id` e `proposta_id` são os ids do sistema de origem.
+"""
+import csv
+import json
+import time
+from collections import deque
+from dataclasses import dataclass
+from datetime import date, datetime
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..models import Proposta
+from .ids import IdAllocator
+from .storage import StorageManager
+from .valores import parse_money
+
+# na ordem em que precisam ser importados (chaves estrangeiras)
+TIPOS = ("clientes", "propostas", "itens")
+
+INSERT_SQL = {
+    "clientes": "INSERT INTO clientes (id, nome, documento, contato) VALUES (?, ?, ?, ?)",
+    "propostas": """
+        INSERT INTO propostas (
+            id, cliente_id, titulo, data_criacao, status, validade, responsavel,
+            condicoes_pagamento, tipo_desconto, desconto_percentual, desconto_valor
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    "itens": "INSERT INTO itens (proposta_id, descricao, quantidade, valor_unitario) VALUES (?, ?, ?, ?)",
+}
+
+
+class RegistroInvalido(ValueError):
+    pass
+
+
+@dataclass
+class ResultadoImportacao:
+    tipo: str
+    # registros lidos nesta execução (os já gravados antes não contam)
+    lidos: int = 0
+    importados: int = 0
+    rejeitados: int = 0
+    # registros pulados por já estarem gravados de uma execução anterior
+    retomado_em: int = 0
+    segundos: float = 0.0
+
+    @property
+    def por_segundo(self) -> float:
+        return self.lidos / self.segundos if self.segundos else 0.0
+
+
+def ler_registros(caminho: str) -> Iterator[object]:
+    """Registros de um .jsonl/.ndjson (um objeto por linha) ou .csv com cabeçalho.
+
+    Uma linha JSON inválida vem como o texto original, para ser rejeitada
+    sem interromper a importação.
+    """
+    with open(caminho, encoding="utf-8-sig", newline="") as arquivo:
+        if caminho.lower().endswith((".jsonl", ".ndjson")):
+            for linha in arquivo:
+                if not linha.strip():
+                    continue
+                try:
+                    yield json.loads(linha)
+                except ValueError:
+                    yield linha
+        else:
+            yield from csv.DictReader(arquivo)
+
+
+# ---- conversão de campos ---- #
+
+def _texto(registro: dict, campo: str, obrigatorio: bool = False) -> Optional[str]:
+    valor = registro.get(campo)
+    if valor is None or str(valor).strip() == "":
+        if obrigatorio:
+            raise RegistroInvalido(f"campo `{campo}` é obrigatório")
+        return None
+    return str(valor).strip()
+
+
+def _numero(registro: dict, campo: str, tipo=float, padrao=None):
+    valor = _texto(registro, campo)
+    if valor is None:
+        return padrao
+    if tipo is float:
+        # mesmo formato aceito na tela ("1.234,56", "R$ 10,00", "10.5")
+        numero = parse_money(valor)
+        if numero is None:
+            raise RegistroInvalido(f"`{campo}` inválido: {valor!r}")
+        return numero
+    try:
+        return tipo(valor)
+    except ValueError:
+        raise RegistroInvalido(f"`{campo}` inválido: {valor!r}")
+
+
+def _data_hora(registro: dict, campo: str) -> str:
+    valor = _texto(registro, campo)
+    if valor is None:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        return datetime.fromisoformat(valor).strftime("%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        raise RegistroInvalido(f"`{campo}` inválido (use AAAA-MM-DD [HH:MM:SS]): {valor!r}")
+
+
+def _data(registro: dict, campo: str) -> Optional[str]:
+    valor = _texto(registro, campo)
+    if valor is None:
+        return None
+    try:
+        return date.fromisoformat(valor[:10]).strftime("%Y-%m-%d")
+    except ValueError:
+        raise RegistroInvalido(f"`{campo}` inválido (use AAAA-MM-DD): {valor!r}")
+
+
+class BulkImporter:
+    """Importa os arquivos de uma migração identificada por `nome`.
+
+    `rejeitado(tipo, numero, motivo)` é chamado para cada registro recusado
+    e `progresso(resultado)` ao fim de cada lote gravado.
+    """
+
+    def __init__(
+        self,
+        nome: str = "importacao",
+        tamanho_lote: int = 1000,
+        storage=StorageManager,
+        rejeitado: Optional[Callable[[str, int, str], None]] = None,
+        progresso: Optional[Callable[[ResultadoImportacao], None]] = None,
+    ):
+        self.nome = nome
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.storage = storage
+        self.rejeitado = rejeitado
+        self.progresso = progresso
+        # ids reservados em blocos do tamanho do lote, fora das transações
+        self.alocador = IdAllocator(storage, bloco=self.tamanho_lote)
+        # tipo -> {id de origem: id gravado}; carregado do banco ao retomar
+        self._mapas: Dict[str, Dict[str, int]] = {}
+
+    # ---- estado persistido ---- #
+
+    def _mapa(self, tipo: str) -> Dict[str, int]:
+        mapa = self._mapas.get(tipo)
+        if mapa is None:
+            cur = self.storage._get_conn().execute(
+                "SELECT origem, id FROM importacao_ids WHERE nome = ? AND tipo = ?", (self.nome, tipo)
+            )
+            mapa = self._mapas[tipo] = dict(cur)
+        return mapa
+
+    def _checkpoint(self, tipo: str) -> Tuple[int, bool]:
+        row = self.storage._get_conn().execute(
+            "SELECT linhas, concluida FROM importacoes WHERE nome = ? AND tipo = ?", (self.nome, tipo)
+        ).fetchone()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def _salvar_checkpoint(self, conn, tipo: str, linhas: int, concluida: bool = False) -> None:
+        conn.execute(
+            """
+            INSERT INTO importacoes (nome, tipo, linhas, concluida, atualizado_em) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(nome, tipo) DO UPDATE SET
+                linhas = excluded.linhas,
+                concluida = excluded.concluida,
+                atualizado_em = excluded.atualizado_em
+            """,
+            (self.nome, tipo, linhas, int(concluida), datetime.now().isoformat(timespec="seconds")),
+        )
+
+    # ---- registro -> (id de origem, valores) ---- #
+
+    def _cliente(self, registro: dict) -> Tuple[Optional[str], tuple]:
+        return _texto(registro, "id", obrigatorio=True), (
+            _texto(registro, "nome", obrigatorio=True),
+            _texto(registro, "documento") or "",
+            _texto(registro, "contato") or "",
+        )
+
+    def _proposta(self, registro: dict) -> Tuple[Optional[str], tuple]:
+        origem = _texto(registro, "id", obrigatorio=True)
+        cliente_origem = _texto(registro, "cliente_id", obrigatorio=True)
+        cliente_id = self._mapa("clientes").get(cliente_origem)
+        if cliente_id is None:
+            raise RegistroInvalido(f"cliente {cliente_origem!r} não foi importado")
+        status = (_texto(registro, "status") or "rascunho").lower()
+        if status not in Proposta.STATUS_VALIDOS:
+            raise RegistroInvalido(f"status inválido: {status!r}")
+        tipo_desconto = _texto(registro, "tipo_desconto")
+        if tipo_desconto not in (None, "%", "R"):
+            raise RegistroInvalido(f"tipo_desconto inválido (use % ou R): {tipo_desconto!r}")
+        return origem, (
+            cliente_id,
+            # sem título, vira "Proposta <id>" na gravação, como em Proposta()
+            _texto(registro, "titulo"),
+            _data_hora(registro, "data_criacao"),
+            status,
+            _data(registro, "validade"),
+            _texto(registro, "responsavel") or "",
+            _texto(registro, "condicoes_pagamento") or "",
+            tipo_desconto,
+            _numero(registro, "desconto_percentual", padrao=0.0),
+            _numero(registro, "desconto_valor", padrao=0.0),
+        )
+
+    def _item(self, registro: dict) -> Tuple[Optional[str], tuple]:
+        proposta_origem = _texto(registro, "proposta_id", obrigatorio=True)
+        proposta_id = self._mapa("propostas").get(proposta_origem)
+        if proposta_id is None:
+            raise RegistroInvalido(f"proposta {proposta_origem!r} não foi importada")
+        quantidade = _numero(registro, "quantidade", tipo=int)
+        if quantidade is None or quantidade <= 0:
+            raise RegistroInvalido("`quantidade` deve ser um inteiro maior que zero")
+        valor = _numero(registro, "valor_unitario")
+        if valor is None or valor < 0:
+            raise RegistroInvalido("`valor_unitario` deve ser um número maior ou igual a zero")
+        return None, (proposta_id, _texto(registro, "descricao", obrigatorio=True), quantidade, valor)
+
+    # ---- importação ---- #
+
+    def importar(self, tipo: str, caminho: str) -> ResultadoImportacao:
+        if tipo not in TIPOS:
+            raise ValueError(f"Tipo de importação inválido: {tipo}")
+        converter = {"clientes": self._cliente, "propostas": self._proposta, "itens": self._item}[tipo]
+        resultado = ResultadoImportacao(tipo)
+        feitas, concluida = self._checkpoint(tipo)
+        resultado.retomado_em = feitas
+        if concluida:
+            return resultado
+
+        inicio = time.perf_counter()
+        registros = enumerate(ler_registros(caminho), start=1)
+        # pula o que uma execução anterior já gravou
+        deque(islice(registros, feitas), maxlen=0)
+        mapa = self._mapa(tipo) if tipo != "itens" else None
+        while True:
+            lote = list(islice(registros, self.tamanho_lote))
+            if not lote:
+                break
+            validos: List[Tuple[Optional[str], tuple]] = []
+            vistos = set()
+            for numero, registro in lote:
+                try:
+                    if not isinstance(registro, dict):
+                        raise RegistroInvalido("linha não é um objeto JSON")
+                    origem, valores = converter(registro)
+                    if mapa is not None and (origem in mapa or origem in vistos):
+                        raise RegistroInvalido(f"id de origem {origem!r} repetido")
+                except RegistroInvalido as exc:
+                    resultado.rejeitados += 1
+                    if self.rejeitado is not None:
+                        self.rejeitado(tipo, numero, str(exc))
+                    continue
+                vistos.add(origem)
+                validos.append((origem, valores))
+
+            self._gravar(tipo, validos, lote[-1][0])
+            resultado.lidos += len(lote)
+            resultado.importados += len(validos)
+            resultado.segundos = time.perf_counter() - inicio
+            if self.progresso is not None:
+                self.progresso(resultado)
+
+        with self.storage.transacao() as conn:
+            self._salvar_checkpoint(conn, tipo, feitas + resultado.lidos, concluida=True)
+        resultado.segundos = time.perf_counter() - inicio
+        return resultado
+
+    def _gravar(self, tipo: str, validos: List[Tuple[Optional[str], tuple]], linhas: int) -> None:
+        if tipo == "itens":
+            ids: List[int] = []
+            params = [valores for _, valores in validos]
+        else:
+            ids = [self.alocador(tipo) for _ in validos]
+            params = [(novo_id,) + valores for novo_id, (_, valores) in zip(ids, validos)]
+            if tipo == "propostas":
+                params = [p[:2] + (p[2] or f"Proposta {p[0]}",) + p[3:] for p in params]
+
+        with self.storage.transacao() as conn:
+            if params:
+                conn.executemany(INSERT_SQL[tipo], params)
+            if ids:
+                conn.executemany(
+                    "INSERT INTO importacao_ids (nome, tipo, origem, id) VALUES (?, ?, ?, ?)",
+                    [(self.nome, tipo, origem, novo_id) for novo_id, (origem, _) in zip(ids, validos)],
+                )
+            self._salvar_checkpoint(conn, tipo, linhas)
+        # só depois do commit: um lote desfeito não deixa ids no mapa
+        if ids:
+            self._mapa(tipo).update((origem, novo_id) for novo_id, (origem, _) in zip(ids, validos))
@@ -0,0 +1,76 @@
+import threading
+from typing import Dict, Optional, Set
+
+from .storage import StorageManager
+
+# tabela -> ids alterados
+Alteracoes = Dict[str, Set[int]]
+
+
+class ChangeFeed:
+    """Lê o log `alteracoes` (migração 7) para saber o que outros processos gravaram.
+
+    Triggers registram cada gravação em clientes, propostas (inclusive itens)
+    e templates com uma sequência crescente. Cada processo guarda a última
+    sequência que já aplicou; `PRAGMA data_version`, que só muda quando
+    outra conexão faz commit, evita ler o log quando nada mudou.
+    """
+
+    def __init__(self, storage=StorageManager, manter: int = 100_000):
+        self.storage = storage
+        # linhas mantidas no log; quem ficar mais atrasado que isso recarrega tudo
+        self.manter = manter
+        self.ultimo_seq = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _maior_seq(self, conn) -> int:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM alteracoes").fetchone()[0]
+
+    def ultima_sequencia(self, conn=None) -> int:
+        """Sequência da gravação mais recente, deste ou de outro processo (serve de versão)."""
+        return self._maior_seq(conn or self.storage._get_conn())
+
+    def posicionar(self) -> None:
+        """Marca o log como lido até aqui (chamar antes de carregar o estado)."""
+        with self._lock:
+            self.ultimo_seq = self._maior_seq(self.storage._get_conn())
+
+    def _mudou(self, conn) -> bool:
+        # data_version é por conexão (uma por thread no pool)
+        versao = conn.execute("PRAGMA data_version").fetchone()[0]
+        chave = (self.storage.DB_PATH, id(conn))
+        vistas = self._local.__dict__.setdefault("versoes", {})
+        if vistas.get(chave) == versao:
+            return False
+        vistas[chave] = versao
+        return True
+
+    def novas(self) -> Optional[Alteracoes]:
+        """Ids alterados desde a última leitura; None se o log já foi podado além dela."""
+        conn = self.storage._get_conn()
+        if not self._mudou(conn):
+            return {}
+        with self._lock:
+            menor = conn.execute("SELECT MIN(seq) FROM alteracoes").fetchone()[0]
+            if menor is not None and menor > self.ultimo_seq + 1:
+                self.ultimo_seq = self._maior_seq(conn)
+                return None
+
+            alteracoes: Alteracoes = {}
+            for seq, tabela, registro_id in conn.execute(
+                "SELECT seq, tabela, registro_id FROM alteracoes WHERE seq > ? ORDER BY seq",
+                (self.ultimo_seq,),
+            ):
+                alteracoes.setdefault(tabela, set()).add(registro_id)
+                self.ultimo_seq = seq
+            if self.ultimo_seq - (menor or 0) > 2 * self.manter:
+                self.podar()
+            return alteracoes
+
+    def podar(self) -> None:
+        with self.storage.transacao() as conn:
+            conn.execute(
+                "DELETE FROM alteracoes WHERE seq <= (SELECT MAX(seq) FROM alteracoes) - ?",
+                (self.manter,),
+            )
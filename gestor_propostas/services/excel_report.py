@@ -1,13 +1,18 @@
 import os
 import tempfile
-from datetime import datetime
+from typing import Iterable
 
 from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font
 
 class ExcelReportGenerator:
     @classmethod
-    def gerar_excel(cls, gestor, caminho: str | None = None) -> str:
+    def gerar_excel(cls, linhas: Iterable[list], caminho: str | None = None) -> str:
+        """Planilha com uma linha por proposta.
+
+        `linhas` vem de Repository.linhas_relatorio(), com os totais gravados
+        no banco.
+        """
         if not caminho:
             fd, caminho = tempfile.mkstemp(
                 suffix=".xlsx", prefix="dealflow_propostas_"
@@ -43,38 +48,8 @@ class ExcelReportGenerator:
             cell.alignment = Alignment(horizontal="center")
 
         # Linhas de dados
-        for p in gestor.listar_propostas():
-            subtotal = p.calcular_subtotal()
-            total = p.calcular_total()
-            desconto = subtotal - total
-
-            data_criacao_str = (
-                p.data_criacao.strftime("%d/%m/%Y %H:%M")
-                if p.data_criacao
-                else ""
-            )
-            validade_str = (
-                p.validade.strftime("%d/%m/%Y") if p.validade else ""
-            )
-
-            ws.append(
-                [
-                    p.id,
-                    p.titulo,
-                    p.cliente.nome,
-                    p.cliente.documento,
-                    p.cliente.contato,
-                    p.status,
-                    data_criacao_str,
-                    p.responsavel or "",
-                    validade_str,
-                    p.condicoes_pagamento or "",
-                    float(subtotal),
-                    float(desconto),
-                    float(total),
-                ]
-            )
-
+        for linha in linhas:
+            ws.append(linha)
 
         for col in ws.columns:
             max_len = 0
@@ -90,3 +65,34 @@ class ExcelReportGenerator:
 
         wb.save(caminho)
         return caminho
+
+    @staticmethod
+    def _linha(p) -> list:
+        subtotal = p.calcular_subtotal()
+        total = p.calcular_total()
+        desconto = subtotal - total
+
+        data_criacao_str = (
+            p.data_criacao.strftime("%d/%m/%Y %H:%M")
+            if p.data_criacao
+            else ""
+        )
+        validade_str = (
+            p.validade.strftime("%d/%m/%Y") if p.validade else ""
+        )
+
+        return [
+            p.id,
+            p.titulo,
+            p.cliente.nome,
+            p.cliente.documento,
+            p.cliente.contato,
+            p.status,
+            data_criacao_str,
+            p.responsavel or "",
+            validade_str,
+            p.condicoes_pagamento or "",
+            float(subtotal),
+            float(desconto),
+            float(total),
+        ]
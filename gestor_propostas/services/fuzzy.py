@@ -0,0 +1,324 @@
+import re
+import sys
+import threading
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_NAO_ALFANUM_RE = re.compile(r"[^0-9a-z]+")
+
+# custo aproximado de cada lista nova no dicionário (chave + array vazio + slot do dict)
+_BYTES_POR_TRIGRAMA = sys.getsizeof("abc") + sys.getsizeof(array("I")) + 64
+# id (q) + qtd. de trigramas do nome (H) + do documento (H)
+_BYTES_POR_SLOT = 8 + 2 + 2
+_BYTES_POR_ENTRADA = array("I").itemsize
+
+
+def normalizar(texto: Optional[str]) -> str:
+    """Minúsculas, sem acentos e só com letras/dígitos separados por espaço."""
+    if not texto:
+        return ""
+    ascii_ = unicodedata.normalize("NFKD", texto.casefold()).encode("ascii", "ignore").decode()
+    return _NAO_ALFANUM_RE.sub(" ", ascii_).strip()
+
+
+def trigramas_nome(texto: str, parcial: bool = False) -> Set[str]:
+    """Trigramas de cada palavra com bordas ("  j", " jo", "joa", "oao", "ao ").
+
+    Com `parcial`, a última palavra é tratada como prefixo ainda em digitação
+    e não gera o trigrama de fim de palavra.
+    """
+    palavras = normalizar(texto).split()
+    grams: Set[str] = set()
+    for pos, palavra in enumerate(palavras):
+        fim = "" if parcial and pos == len(palavras) - 1 else " "
+        marcada = f"  {palavra}{fim}"
+        grams.update([marcada[i:i + 3] for i in range(len(marcada) - 2)])
+    return grams
+
+
+def trigramas_documento(documento: Optional[str]) -> Set[str]:
+    # documentos são comparados só pelos dígitos; "#" separa do espaço de nomes
+    digitos = "".join(ch for ch in documento or "" if ch.isdigit())
+    return {"#" + digitos[i:i + 3] for i in range(len(digitos) - 2)}
+
+
+def _bitmap(slots: Iterable[int], n_slots: int) -> int:
+    bits = bytearray((n_slots + 7) // 8)
+    for slot in slots:
+        bits[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(bits, "little")
+
+
+def _maior_ou_igual(planos: List[int], valor: int, todos: int) -> int:
+    """Máscara dos slots cujo contador (em planos de bits, LSB primeiro) é >= valor."""
+    if valor >= 1 << len(planos):
+        return 0
+    maior, igual = 0, todos
+    for i in range(len(planos) - 1, -1, -1):
+        if valor >> i & 1:
+            igual &= planos[i]
+        else:
+            maior |= igual & planos[i]
+            igual &= ~planos[i]
+    return maior | igual
+
+
+def _igual(planos: List[int], valor: int, todos: int) -> int:
+    if valor >= 1 << len(planos):
+        return 0
+    igual = todos
+    for i, plano in enumerate(planos):
+        igual &= plano if valor >> i & 1 else ~plano
+    return igual
+
+
+def _somar(planos: List[int], bits: int) -> None:
+    # somador bit a bit: cada plano guarda um bit do contador de todos os slots
+    for i, plano in enumerate(planos):
+        if not bits:
+            return
+        planos[i], bits = plano ^ bits, plano & bits
+    if bits:
+        planos.append(bits)
+
+
+class TrigramIndex:
+    """Índice de trigramas em memória para busca aproximada de clientes.
+
+    Cada cliente ocupa um slot e cada trigrama guarda seus slots em um
+    `array('I')`. Na consulta as listas viram bitmaps (inteiros do Python) e a
+    contagem de trigramas em comum é feita com operações bit a bit, sem laço
+    por cliente; bitmaps de trigramas muito frequentes ficam em cache.
+
+    Todo o consumo entra em `bytes_usados`. Ao passar de `max_bytes` o índice
+    para de aceitar clientes e marca `excedido` — quem consulta deve usar
+    outra busca.
+    """
+
+    def __init__(self, max_bytes: int = 128 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._resetar()
+
+    def _resetar(self) -> None:
+        self.excedido = False
+        self.ultimo_id = 0
+        self._ids = array("q")
+        self._tam_nome = array("H")
+        self._tam_doc = array("H")
+        self._listas: Dict[str, array] = {}
+        self._removidos = 0
+        self._bytes = 0
+        # trigrama -> (qtd. de slots já incluídos, bitmap)
+        self._cache: Dict[str, Tuple[int, int]] = {}
+        self._cache_tam: Dict[str, Tuple[int, List[int]]] = {}
+        self._max_tam = {"nome": 0, "doc": 0}
+        self._bytes_cache = 0
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._removidos
+
+    @property
+    def bytes_usados(self) -> int:
+        return self._bytes + self._bytes_cache
+
+    # ---- manutenção ---- #
+
+    def adicionar(self, cliente_id: int, nome: str, documento: str = "") -> bool:
+        """Indexa (ou reindexa) um cliente. Retorna False se o orçamento estourou."""
+        with self._lock:
+            return self._adicionar(cliente_id, nome, documento)
+
+    def carregar(self, linhas: Iterable[Tuple[int, str, str]]) -> int:
+        """Indexa (id, nome, documento) em lote; retorna quantos entraram."""
+        total = 0
+        with self._lock:
+            for cliente_id, nome, documento in linhas:
+                if not self._adicionar(cliente_id, nome, documento):
+                    break
+                total += 1
+        return total
+
+    def _adicionar(self, cliente_id: int, nome: str, documento: str) -> bool:
+        g_nome = trigramas_nome(nome)
+        g_doc = trigramas_documento(documento)
+        grams = g_nome | g_doc
+
+        if cliente_id <= self.ultimo_id:
+            self._remover_slot(cliente_id)
+        listas = self._listas
+        novos = sum(1 for g in grams if g not in listas)
+        custo = _BYTES_POR_SLOT + len(grams) * _BYTES_POR_ENTRADA + novos * _BYTES_POR_TRIGRAMA
+        if self.bytes_usados + custo > self.max_bytes:
+            self.excedido = True
+            return False
+
+        slot = len(self._ids)
+        self._ids.append(cliente_id)
+        self._tam_nome.append(min(len(g_nome), 0xFFFF))
+        self._tam_doc.append(min(len(g_doc), 0xFFFF))
+        self._max_tam["nome"] = max(self._max_tam["nome"], self._tam_nome[-1])
+        self._max_tam["doc"] = max(self._max_tam["doc"], self._tam_doc[-1])
+        for gram in grams:
+            lista = listas.get(gram)
+            if lista is None:
+                lista = listas[gram] = array("I")
+            lista.append(slot)
+        self._bytes += custo
+        if cliente_id > self.ultimo_id:
+            self.ultimo_id = cliente_id
+        return True
+
+    def remover(self, cliente_id: int) -> None:
+        with self._lock:
+            self._remover_slot(cliente_id)
+
+    def _remover_slot(self, cliente_id: int) -> None:
+        # o slot vira lápide; as listas são limpas só na compactação
+        try:
+            slot = self._ids.index(cliente_id)
+        except ValueError:
+            return
+        self._ids[slot] = 0
+        self._removidos += 1
+        if self._removidos > 1024 and self._removidos * 4 > len(self._ids):
+            self._compactar()
+
+    def _compactar(self) -> None:
+        novo_slot = array("I", [0]) * len(self._ids)
+        ids, tam_nome, tam_doc = array("q"), array("H"), array("H")
+        for slot, cliente_id in enumerate(self._ids):
+            if cliente_id:
+                novo_slot[slot] = len(ids)
+                ids.append(cliente_id)
+                tam_nome.append(self._tam_nome[slot])
+                tam_doc.append(self._tam_doc[slot])
+
+        listas: Dict[str, array] = {}
+        entradas = 0
+        for gram, lista in self._listas.items():
+            nova = array("I", [novo_slot[s] for s in lista if self._ids[s]])
+            if nova:
+                listas[gram] = nova
+                entradas += len(nova)
+
+        ultimo_id = self.ultimo_id
+        self._resetar()
+        self._ids, self._tam_nome, self._tam_doc = ids, tam_nome, tam_doc
+        self._listas = listas
+        self.ultimo_id = ultimo_id
+        self._max_tam = {"nome": max(tam_nome, default=0), "doc": max(tam_doc, default=0)}
+        self._bytes = (
+            len(ids) * _BYTES_POR_SLOT
+            + entradas * _BYTES_POR_ENTRADA
+            + len(listas) * _BYTES_POR_TRIGRAMA
+        )
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._resetar()
+
+    # ---- consulta ---- #
+
+    def _bits_trigrama(self, gram: str, n_slots: int) -> int:
+        lista = self._listas.get(gram)
+        if not lista:
+            return 0
+        n = len(lista)
+        incluidos, bits = self._cache.get(gram, (0, 0))
+        if incluidos:
+            # listas só crescem entre compactações: basta somar a cauda
+            if incluidos < n:
+                bits |= _bitmap(lista[incluidos:], n_slots)
+                self._cache[gram] = (n, bits)
+            return bits
+
+        bits = _bitmap(lista, n_slots)
+        # só compensa guardar listas densas (o bitmap custa n_slots / 8 bytes)
+        tamanho = n_slots // 8
+        if n * 32 >= n_slots and self.bytes_usados + tamanho <= self.max_bytes:
+            self._cache[gram] = (n, bits)
+            self._bytes_cache += tamanho
+        return bits
+
+    def aquecer(self) -> None:
+        """Monta os bitmaps de tamanho antes da primeira consulta."""
+        with self._lock:
+            for campo in ("nome", "doc"):
+                self._planos_tamanho(campo, len(self._ids))
+
+    def _planos_tamanho(self, campo: str, n_slots: int) -> List[int]:
+        """Qtd. de trigramas de cada slot em planos de bits (cache incremental)."""
+        tamanhos = self._tam_doc if campo == "doc" else self._tam_nome
+        incluidos, planos = self._cache_tam.get(campo, (0, []))
+        if incluidos < n_slots:
+            planos = list(planos)
+            antes = len(planos)
+            for bit in range(max(self._max_tam[campo], 1).bit_length()):
+                novos = _bitmap(
+                    (s for s in range(incluidos, n_slots) if tamanhos[s] >> bit & 1), n_slots
+                )
+                if bit < antes:
+                    planos[bit] |= novos
+                else:
+                    planos.append(novos)
+            self._bytes_cache += (len(planos) - antes) * (n_slots // 8)
+            self._cache_tam[campo] = (n_slots, planos)
+        return planos
+
+    def buscar(
+        self, texto: str, limit: int = 10, min_cobertura: float = 0.5
+    ) -> List[Tuple[int, float]]:
+        """Retorna [(cliente_id, score)] do mais para o menos parecido.
+
+        `score` é a fração dos trigramas da consulta presentes no cliente; no
+        empate vêm primeiro os nomes com menos trigramas (maior coeficiente
+        de Dice) e depois os mais recentes. Consultas só com dígitos olham o
+        documento; as demais, o nome.
+        """
+        normalizado = normalizar(texto)
+        if not normalizado or limit <= 0:
+            return []
+        campo = "doc" if normalizado.replace(" ", "").isdigit() else "nome"
+        if campo == "doc":
+            grams = trigramas_documento(normalizado)
+        else:
+            grams = trigramas_nome(normalizado, parcial=True)
+        if not grams:
+            return []
+
+        with self._lock:
+            n_slots = len(self._ids)
+            planos: List[int] = []
+            for gram in grams:
+                _somar(planos, self._bits_trigrama(gram, n_slots))
+            planos_tam = self._planos_tamanho(campo, n_slots)
+            max_tam = self._max_tam[campo]
+            ids = self._ids
+
+        nq = len(grams)
+        minimo = max(1, -int(-nq * min_cobertura // 1))
+        todos = (1 << n_slots) - 1
+        resultado: List[Tuple[int, float]] = []
+        acima = 0
+        for comuns in range(nq, minimo - 1, -1):
+            nivel = _maior_ou_igual(planos, comuns, todos)
+            exatos = nivel & ~acima
+            acima = nivel
+            # no mesmo nível, menos trigramas = maior Dice; depois, slot mais novo
+            for tam in range(comuns, max_tam + 1):
+                if not exatos:
+                    break
+                mesmo_tam = exatos & _igual(planos_tam, tam, todos)
+                if not mesmo_tam:
+                    continue
+                exatos &= ~mesmo_tam
+                while mesmo_tam and len(resultado) < limit:
+                    slot = mesmo_tam.bit_length() - 1
+                    mesmo_tam ^= 1 << slot
+                    if ids[slot]:
+                        resultado.append((ids[slot], round(comuns / nq, 3)))
+                if len(resultado) >= limit:
+                    return resultado
+        return resultado
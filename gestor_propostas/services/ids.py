@@ -0,0 +1,91 @@
+import os
+import sqlite3
+import threading
+from typing import Dict, Tuple
+
+from .storage import BUSY_TIMEOUT_MS, StorageManager
+
+
+class IdAllocator:
+    """Distribui ids de clientes, propostas e templates reservados em blocos.
+
+    O próximo id livre de cada tabela fica em `id_blocos` (migração 6). Cada
+    processo reserva `bloco` ids de uma vez numa transação curta e os entrega
+    da memória, então criar um objeto não custa uma ida ao banco e dois
+    workers nunca recebem o mesmo id. A reserva também respeita MAX(id) da
+    tabela, para não colidir com linhas gravadas com id explícito.
+
+    Depois de um fork, ou se o banco (DB_PATH) mudar, os blocos em mãos são
+    descartados: o processo filho reserva os seus.
+    """
+
+    TABELAS = ("clientes", "propostas", "templates")
+
+    def __init__(self, storage=StorageManager, bloco: int = 64):
+        self.storage = storage
+        self.bloco = bloco
+        self._lock = threading.Lock()
+        self._dono: Tuple[int, str] = (0, "")
+        # tabela -> (próximo id a entregar, fim exclusivo do bloco)
+        self._faixas: Dict[str, Tuple[int, int]] = {}
+
+    def __call__(self, tabela: str) -> int:
+        return self.proximo(tabela)
+
+    def proximo(self, tabela: str) -> int:
+        if tabela not in self.TABELAS:
+            raise ValueError(f"Tabela sem alocador de ids: {tabela}")
+        dono = (os.getpid(), self.storage.DB_PATH)
+        with self._lock:
+            if dono != self._dono:
+                self._dono, self._faixas = dono, {}
+            atual, fim = self._faixas.get(tabela, (0, 0))
+            if atual < fim:
+                self._faixas[tabela] = (atual + 1, fim)
+                return atual
+
+        # A reserva fica fora do lock: ela pode esperar pelo lock de escrita
+        # do SQLite, que talvez esteja com uma thread que também quer um id.
+        atual, fim = self._reservar(tabela)
+        with self._lock:
+            if dono == self._dono:
+                em_uso, fim_em_uso = self._faixas.get(tabela, (0, 0))
+                # se outra thread publicou um bloco nesse meio-tempo, o resto
+                # deste fica sem uso: ids só precisam ser únicos
+                if em_uso >= fim_em_uso:
+                    self._faixas[tabela] = (atual + 1, fim)
+        return atual
+
+    def _reservar(self, tabela: str) -> Tuple[int, int]:
+        conn = self.storage._get_conn()
+        if conn.in_transaction:
+            # a thread já tem o lock de escrita: uma conexão separada ficaria
+            # esperando por ela mesma. Reserva só um id, que volta junto com
+            # a transação em caso de rollback.
+            return self._reservar_em(conn, tabela, 1)
+
+        conn = sqlite3.connect(
+            self.storage.DB_PATH, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None
+        )
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                faixa = self._reservar_em(conn, tabela, self.bloco)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return faixa
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _reservar_em(conn: sqlite3.Connection, tabela: str, quantidade: int) -> Tuple[int, int]:
+        maior = conn.execute(f"SELECT MAX(id) FROM {tabela}").fetchone()[0] or 0
+        # UPDATE e SELECT na mesma transação (RETURNING exigiria SQLite 3.35+)
+        conn.execute(
+            "UPDATE id_blocos SET proximo = MAX(proximo, ?) + ? WHERE tabela = ?",
+            (maior + 1, quantidade, tabela),
+        )
+        fim = conn.execute("SELECT proximo FROM id_blocos WHERE tabela = ?", (tabela,)).fetchone()[0]
+        return fim - quantidade, fim
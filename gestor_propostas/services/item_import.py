@@ -0,0 +1,61 @@
+"""Leitura de itens em massa: texto colado (CSV/TSV) ou planilha .xlsx.
+
+As funções só separam as células, linha a linha, sem montar a entrada
+inteira em memória; a validação (quantidade, valor) fica com quem chama.
+Colunas esperadas, nesta ordem: descrição, quantidade, valor unitário.
+"""
+import csv
+from itertools import chain
+from typing import IO, Iterator, List, Tuple
+
+# (número da linha na entrada, [descrição, quantidade, valor unitário])
+Linha = Tuple[int, List[str]]
+
+COLUNAS = 3
+
+
+def _delimitador(primeira: str) -> str:
+    # ";" antes de ",": planilhas em pt-BR usam vírgula como separador decimal
+    for delimitador in ("\t", ";"):
+        if delimitador in primeira:
+            return delimitador
+    return ","
+
+
+def _celulas(valores) -> List[str]:
+    celulas = [_texto(valor) for valor in valores[:COLUNAS]]
+    return celulas + [""] * (COLUNAS - len(celulas))
+
+
+def _texto(valor) -> str:
+    if valor is None:
+        return ""
+    if isinstance(valor, float) and valor.is_integer():
+        # células numéricas do Excel: 3.0 -> "3", para valer como quantidade
+        return str(int(valor))
+    return str(valor).strip()
+
+
+def linhas_texto(fluxo: IO[str]) -> Iterator[Linha]:
+    """Linhas de um texto CSV/TSV; o separador é deduzido da primeira linha."""
+    primeira = fluxo.readline()
+    if not primeira:
+        return
+    leitor = csv.reader(chain([primeira], fluxo), delimiter=_delimitador(primeira))
+    for numero, valores in enumerate(leitor, start=1):
+        if any(valor.strip() for valor in valores):
+            yield numero, _celulas(valores)
+
+
+def linhas_xlsx(arquivo) -> Iterator[Linha]:
+    """Linhas da primeira aba de uma planilha .xlsx (modo somente leitura)."""
+    # openpyxl só é importado quando há planilha para ler
+    from openpyxl import load_workbook
+
+    pasta = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        for numero, valores in enumerate(pasta.worksheets[0].iter_rows(values_only=True), start=1):
+            if any(valor not in (None, "") for valor in valores):
+                yield numero, _celulas(list(valores))
+    finally:
+        pasta.close()
@@ -0,0 +1,759 @@
+import logging
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Backfill:
+    """Preenchimento de dados feito em lotes, fora da migração de schema.
+
+    `processar(conn, id_inicio, id_fim)` deve tratar as linhas de `tabela` com
+    id_inicio < id <= id_fim. Cada lote roda em sua própria transação e o
+    progresso fica em `schema_backfill`, então o processo pode ser
+    interrompido e retomado sem bloquear a aplicação por muito tempo.
+    """
+
+    nome: str
+    tabela: str
+    processar: Callable[[sqlite3.Connection, int, int], None]
+
+
+@dataclass
+class Migration:
+    versao: int
+    descricao: str
+    sql: Sequence[str] = ()
+    aplicar: Optional[Callable[[sqlite3.Connection], None]] = None
+    backfills: Sequence[Backfill] = field(default_factory=tuple)
+
+
+def _has_column(conn: sqlite3.Connection, table: str, column: str) -> bool:
+    return any(row[1] == column for row in conn.execute(f"PRAGMA table_info({table})"))
+
+
+def _v1_schema_base(conn: sqlite3.Connection) -> None:
+    # Clientes
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS clientes (
+            id INTEGER PRIMARY KEY,
+            nome TEXT NOT NULL,
+            documento TEXT,
+            contato TEXT
+        )
+        """
+    )
+
+    # Propostas
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS propostas (
+            id INTEGER PRIMARY KEY,
+            cliente_id INTEGER NOT NULL,
+            titulo TEXT NOT NULL,
+            data_criacao TEXT NOT NULL,
+            status TEXT NOT NULL,
+            validade TEXT,
+            responsavel TEXT,
+            condicoes_pagamento TEXT,
+            template_id INTEGER,
+            tipo_desconto TEXT,
+            desconto_percentual REAL,
+            desconto_valor REAL,
+            FOREIGN KEY (cliente_id) REFERENCES clientes(id)
+        )
+        """
+    )
+
+    # Itens
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS itens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            proposta_id INTEGER NOT NULL,
+            descricao TEXT NOT NULL,
+            quantidade INTEGER NOT NULL,
+            valor_unitario REAL NOT NULL,
+            FOREIGN KEY (proposta_id) REFERENCES propostas(id)
+        )
+        """
+    )
+
+    # Templates
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS templates (
+            id INTEGER PRIMARY KEY,
+            nome TEXT NOT NULL,
+            titulo_padrao TEXT,
+            responsavel_padrao TEXT,
+            condicoes_pagamento_padrao TEXT,
+            intro_texto TEXT,
+            termos TEXT,
+            rodape TEXT,
+            cor_primaria TEXT,
+            usar_logo INTEGER,
+            logo_path TEXT
+        )
+        """
+    )
+
+    # bancos criados antes dos templates não tinham a coluna
+    if not _has_column(conn, "propostas", "template_id"):
+        conn.execute("ALTER TABLE propostas ADD COLUMN template_id INTEGER")
+
+
+# ---- v3: busca full-text (FTS5) ---- #
+
+FTS_TOKENIZE = "unicode61 remove_diacritics 2"
+
+# documento indexado como digitado e só com dígitos ("123.456" -> "123456")
+_DOC_FTS = (
+    "COALESCE({c}.documento, '') || ' ' || "
+    "REPLACE(REPLACE(REPLACE(REPLACE(COALESCE({c}.documento, ''), '.', ''), '-', ''), '/', ''), ' ', '')"
+)
+
+_PROPOSTA_FTS_SELECT = (
+    "SELECT p.id, p.titulo, c.nome, " + _DOC_FTS.format(c="c") + ", c.contato "
+    "FROM propostas p JOIN clientes c ON c.id = p.cliente_id"
+)
+# Dentro dos triggers não dá para usar INSERT OR REPLACE: a política de
+# conflito do comando externo (ex.: o UPSERT do StorageManager) prevalece.
+# Por isso os triggers removem a linha antiga antes de inserir.
+_PROPOSTA_FTS_INSERT = (
+    "INSERT INTO propostas_fts (rowid, titulo, cliente_nome, cliente_documento, cliente_contato) "
+)
+_CLIENTE_FTS_INSERT = "INSERT INTO clientes_fts (rowid, nome, documento, contato) "
+_ITEM_FTS_INSERT = "INSERT INTO itens_fts (rowid, descricao, proposta_id) "
+
+FTS_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS propostas_fts USING fts5(
+        titulo, cliente_nome, cliente_documento, cliente_contato,
+        tokenize = '{FTS_TOKENIZE}', prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS clientes_fts USING fts5(
+        nome, documento, contato,
+        tokenize = '{FTS_TOKENIZE}', prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS itens_fts USING fts5(
+        descricao, proposta_id UNINDEXED,
+        tokenize = '{FTS_TOKENIZE}', prefix = '2 3'
+    )
+    """,
+    # propostas
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_fts_ins AFTER INSERT ON propostas BEGIN
+        DELETE FROM propostas_fts WHERE rowid = new.id;
+        {_PROPOSTA_FTS_INSERT} {_PROPOSTA_FTS_SELECT} WHERE p.id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_fts_upd AFTER UPDATE OF titulo, cliente_id ON propostas
+    WHEN new.titulo IS NOT old.titulo OR new.cliente_id IS NOT old.cliente_id BEGIN
+        DELETE FROM propostas_fts WHERE rowid = new.id;
+        {_PROPOSTA_FTS_INSERT} {_PROPOSTA_FTS_SELECT} WHERE p.id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_fts_del AFTER DELETE ON propostas BEGIN
+        DELETE FROM propostas_fts WHERE rowid = old.id;
+    END
+    """,
+    # clientes (renomear um cliente reindexa as propostas dele)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_ins AFTER INSERT ON clientes BEGIN
+        DELETE FROM clientes_fts WHERE rowid = new.id;
+        {_CLIENTE_FTS_INSERT} VALUES (new.id, new.nome, {_DOC_FTS.format(c="new")}, new.contato);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_upd AFTER UPDATE OF nome, documento, contato ON clientes
+    WHEN new.nome IS NOT old.nome OR new.documento IS NOT old.documento OR new.contato IS NOT old.contato BEGIN
+        DELETE FROM clientes_fts WHERE rowid = new.id;
+        {_CLIENTE_FTS_INSERT} VALUES (new.id, new.nome, {_DOC_FTS.format(c="new")}, new.contato);
+        DELETE FROM propostas_fts WHERE rowid IN (SELECT id FROM propostas WHERE cliente_id = new.id);
+        {_PROPOSTA_FTS_INSERT} {_PROPOSTA_FTS_SELECT} WHERE p.cliente_id = new.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_clientes_fts_del AFTER DELETE ON clientes BEGIN
+        DELETE FROM clientes_fts WHERE rowid = old.id;
+    END
+    """,
+    # itens
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_itens_fts_ins AFTER INSERT ON itens BEGIN
+        DELETE FROM itens_fts WHERE rowid = new.id;
+        {_ITEM_FTS_INSERT} VALUES (new.id, new.descricao, new.proposta_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_itens_fts_upd AFTER UPDATE OF descricao, proposta_id ON itens
+    WHEN new.descricao IS NOT old.descricao OR new.proposta_id IS NOT old.proposta_id BEGIN
+        DELETE FROM itens_fts WHERE rowid = new.id;
+        {_ITEM_FTS_INSERT} VALUES (new.id, new.descricao, new.proposta_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS trg_itens_fts_del AFTER DELETE ON itens BEGIN
+        DELETE FROM itens_fts WHERE rowid = old.id;
+    END
+    """,
+)
+
+
+def _ou_substituir(insert: str) -> str:
+    # fora de triggers o OR REPLACE funciona e deixa o backfill idempotente
+    return insert.replace("INSERT INTO", "INSERT OR REPLACE INTO", 1)
+
+
+def _backfill_propostas_fts(conn: sqlite3.Connection, inicio: int, fim: int) -> None:
+    conn.execute(
+        f"{_ou_substituir(_PROPOSTA_FTS_INSERT)} "
+        f"{_PROPOSTA_FTS_SELECT} WHERE p.id > ? AND p.id <= ?",
+        (inicio, fim),
+    )
+
+
+def _backfill_clientes_fts(conn: sqlite3.Connection, inicio: int, fim: int) -> None:
+    conn.execute(
+        f"{_ou_substituir(_CLIENTE_FTS_INSERT)} SELECT c.id, c.nome, {_DOC_FTS.format(c='c')}, c.contato "
+        "FROM clientes c WHERE c.id > ? AND c.id <= ?",
+        (inicio, fim),
+    )
+
+
+def _backfill_itens_fts(conn: sqlite3.Connection, inicio: int, fim: int) -> None:
+    conn.execute(
+        f"{_ou_substituir(_ITEM_FTS_INSERT)} SELECT id, descricao, proposta_id FROM itens WHERE id > ? AND id <= ?",
+        (inicio, fim),
+    )
+
+
+
+# ---- v4: subtotal/desconto/total denormalizados em propostas ---- #
+
+# Mesma regra de Proposta.calcular_desconto/calcular_total: desconto % sobre o
+# subtotal ou valor fixo; total com piso 0.
+_DESCONTO_SQL = (
+    "CASE tipo_desconto "
+    "WHEN '%' THEN {subtotal} * COALESCE(desconto_percentual, 0) / 100.0 "
+    "WHEN 'R' THEN COALESCE(desconto_valor, 0) "
+    "ELSE 0 END"
+)
+
+
+def _totais(subtotal: str = "subtotal") -> str:
+    """SET de desconto e total a partir de `subtotal` (uma expressão SQL).
+
+    No SET, as colunas ainda têm o valor antigo: para gravar o subtotal no
+    mesmo UPDATE, passe a expressão do subtotal novo.
+    """
+    desconto = _DESCONTO_SQL.format(subtotal=f"({subtotal})")
+    return f"desconto = {desconto}, total = MAX(0, ({subtotal}) - ({desconto}))"
+
+
+def _somar_item(delta: str, proposta_id: str, extra: str = "", condicao: str = "") -> str:
+    # aplica só a diferença do item: O(1) por linha, em vez de somar todos os itens
+    novo = f"subtotal + {delta}"
+    filtro = f" AND {condicao}" if condicao else ""
+    return f"UPDATE propostas SET subtotal = {novo}, {_totais(novo)}{extra} WHERE id = {proposta_id}{filtro};"
+
+
+def _triggers_totais_itens(extra: str = "") -> List[str]:
+    """Triggers de itens que ajustam subtotal/desconto/total da proposta.
+
+    `extra` entra no SET de cada UPDATE (a migração 10 usa para a versão).
+    """
+    novo = "new.quantidade * new.valor_unitario"
+    antigo = "old.quantidade * old.valor_unitario"
+    mesma = "new.proposta_id = old.proposta_id"
+    # item que continua na mesma proposta: um UPDATE só; item movido: um em cada
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_itens_totais_ins AFTER INSERT ON itens BEGIN
+            {_somar_item(novo, "new.proposta_id", extra)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_itens_totais_upd
+        AFTER UPDATE OF quantidade, valor_unitario, proposta_id ON itens
+        WHEN new.quantidade IS NOT old.quantidade OR new.valor_unitario IS NOT old.valor_unitario
+            OR new.proposta_id IS NOT old.proposta_id BEGIN
+            {_somar_item(f"{novo} - {antigo}", "new.proposta_id", extra, mesma)}
+            {_somar_item(f"-{antigo}", "old.proposta_id", extra, f"NOT {mesma}")}
+            {_somar_item(novo, "new.proposta_id", extra, f"NOT {mesma}")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_itens_totais_del AFTER DELETE ON itens BEGIN
+            {_somar_item(f"-{antigo}", "old.proposta_id", extra)}
+        END
+        """,
+    ]
+
+
+TOTAIS_SQL = (
+    # (status, total) atende o dashboard (SUM por status) e a ordenação por valor
+    "CREATE INDEX IF NOT EXISTS idx_propostas_status_total ON propostas(status, total)",
+    "CREATE INDEX IF NOT EXISTS idx_propostas_total ON propostas(total)",
+    *_triggers_totais_itens(),
+    # proposta nova: soma uma vez os itens que já existirem com o id dela
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_totais_ins AFTER INSERT ON propostas BEGIN
+        UPDATE propostas SET subtotal = (
+            SELECT COALESCE(SUM(quantidade * valor_unitario), 0) FROM itens WHERE proposta_id = new.id
+        ) WHERE id = new.id;
+        UPDATE propostas SET {_totais()} WHERE id = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_totais_desconto
+    AFTER UPDATE OF tipo_desconto, desconto_percentual, desconto_valor ON propostas
+    WHEN new.tipo_desconto IS NOT old.tipo_desconto
+        OR new.desconto_percentual IS NOT old.desconto_percentual
+        OR new.desconto_valor IS NOT old.desconto_valor BEGIN
+        UPDATE propostas SET {_totais()} WHERE id = new.id;
+    END
+    """,
+)
+
+
+def _v4_totais(conn: sqlite3.Connection) -> None:
+    for coluna in ("subtotal", "desconto", "total"):
+        if not _has_column(conn, "propostas", coluna):
+            conn.execute(f"ALTER TABLE propostas ADD COLUMN {coluna} REAL NOT NULL DEFAULT 0")
+    for comando in TOTAIS_SQL:
+        conn.execute(comando)
+
+
+def _backfill_totais(conn: sqlite3.Connection, inicio: int, fim: int) -> None:
+    conn.execute(
+        "UPDATE propostas SET subtotal = COALESCE(("
+        "SELECT SUM(i.quantidade * i.valor_unitario) FROM itens i WHERE i.proposta_id = propostas.id"
+        "), 0) WHERE id > ? AND id <= ?",
+        (inicio, fim),
+    )
+    conn.execute(f"UPDATE propostas SET {_totais()} WHERE id > ? AND id <= ?", (inicio, fim))
+
+
+# ---- v5: métricas do dashboard mantidas por triggers ---- #
+
+# Uma linha por (status, mês de criação): quantidade e soma de `total`. Os
+# triggers aplicam só a diferença de cada gravação; a soma de `total` pode
+# vir de outro trigger (itens -> propostas.total), então a ordem entre eles
+# não importa. Linhas com qtd 0 ficam até a próxima reconstrução.
+_METRICAS_UPSERT = (
+    "INSERT INTO metricas_dashboard (status, mes, qtd, soma) VALUES ({status}, substr({data}, 1, 7), {qtd}, {soma}) "
+    "ON CONFLICT (status, mes) DO UPDATE SET qtd = qtd + excluded.qtd, soma = soma + excluded.soma;"
+)
+METRICAS_REBUILD_SQL = (
+    "DELETE FROM metricas_dashboard",
+    "INSERT INTO metricas_dashboard (status, mes, qtd, soma) "
+    "SELECT status, substr(data_criacao, 1, 7), COUNT(*), COALESCE(SUM(total), 0) "
+    "FROM propostas GROUP BY 1, 2",
+)
+
+
+def _metricas(linha: str, sinal: int) -> str:
+    return _METRICAS_UPSERT.format(
+        status=f"{linha}.status", data=f"{linha}.data_criacao", qtd=sinal, soma=f"{sinal} * {linha}.total"
+    )
+
+
+METRICAS_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS metricas_dashboard (
+        status TEXT NOT NULL,
+        mes TEXT NOT NULL,
+        qtd INTEGER NOT NULL DEFAULT 0,
+        soma REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (status, mes)
+    ) WITHOUT ROWID
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_metricas_ins AFTER INSERT ON propostas BEGIN
+        {_metricas("new", 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_metricas_upd
+    AFTER UPDATE OF status, data_criacao, total ON propostas
+    WHEN new.status IS NOT old.status OR new.data_criacao IS NOT old.data_criacao
+        OR new.total IS NOT old.total BEGIN
+        {_metricas("old", -1)}
+        {_metricas("new", 1)}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_propostas_metricas_del AFTER DELETE ON propostas BEGIN
+        {_metricas("old", -1)}
+    END
+    """,
+)
+
+
+def _v5_metricas(conn: sqlite3.Connection) -> None:
+    # a carga inicial é um GROUP BY só, na mesma transação dos triggers:
+    # um backfill em lotes contaria duas vezes o que os triggers já somaram
+    for comando in METRICAS_SQL + METRICAS_REBUILD_SQL:
+        conn.execute(comando)
+
+
+# ---- v6: blocos de ids reservados por processo (services/ids.py) ---- #
+
+def _v6_id_blocos(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS id_blocos (
+            tabela TEXT PRIMARY KEY,
+            proximo INTEGER NOT NULL
+        )
+        """
+    )
+    for tabela in ("clientes", "propostas", "templates"):
+        conn.execute(
+            f"INSERT OR IGNORE INTO id_blocos (tabela, proximo) SELECT ?, COALESCE(MAX(id), 0) + 1 FROM {tabela}",
+            (tabela,),
+        )
+
+
+# ---- v7: log de alterações para coerência entre workers (services/coherence.py) ---- #
+
+_LOG_ALTERACAO = "INSERT INTO alteracoes (tabela, registro_id) VALUES ('{tabela}', {id});"
+
+
+def _triggers_log(tabela: str, destino: str, coluna: str) -> List[str]:
+    """Triggers que registram em `alteracoes` cada gravação em `tabela`.
+
+    `destino`/`coluna` dizem qual registro recarregar: itens viram a proposta dona.
+    """
+    comandos = []
+    for evento, linha in (("INSERT", "new"), ("UPDATE", "new"), ("DELETE", "old")):
+        corpo = _LOG_ALTERACAO.format(tabela=destino, id=f"{linha}.{coluna}")
+        if evento == "UPDATE" and coluna != "id":
+            # um item que muda de proposta altera as duas
+            corpo += (
+                f" INSERT INTO alteracoes (tabela, registro_id) SELECT '{destino}', old.{coluna}"
+                f" WHERE old.{coluna} IS NOT new.{coluna};"
+            )
+        comandos.append(
+            f"CREATE TRIGGER IF NOT EXISTS trg_{tabela}_log_{evento.lower()} "
+            f"AFTER {evento} ON {tabela} BEGIN {corpo} END"
+        )
+    return comandos
+
+
+ALTERACOES_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS alteracoes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        tabela TEXT NOT NULL,
+        registro_id INTEGER NOT NULL
+    )
+    """,
+    *_triggers_log("clientes", "clientes", "id"),
+    *_triggers_log("templates", "templates", "id"),
+    *_triggers_log("propostas", "propostas", "id"),
+    *_triggers_log("itens", "propostas", "proposta_id"),
+)
+
+
+# ---- v9: progresso e mapa de ids das importações (services/bulk_import.py) ---- #
+
+IMPORTACOES_SQL = (
+    """
+    CREATE TABLE IF NOT EXISTS importacoes (
+        nome TEXT NOT NULL,
+        tipo TEXT NOT NULL,
+        linhas INTEGER NOT NULL DEFAULT 0,
+        concluida INTEGER NOT NULL DEFAULT 0,
+        atualizado_em TEXT,
+        PRIMARY KEY (nome, tipo)
+    )
+    """,
+    # id no sistema de origem -> id gravado aqui, para resolver as chaves estrangeiras
+    """
+    CREATE TABLE IF NOT EXISTS importacao_ids (
+        nome TEXT NOT NULL,
+        tipo TEXT NOT NULL,
+        origem TEXT NOT NULL,
+        id INTEGER NOT NULL,
+        PRIMARY KEY (nome, tipo, origem)
+    ) WITHOUT ROWID
+    """,
+)
+
+
+# ---- v10: versão e data de alteração por registro (cache HTTP em ui.py) ---- #
+
+_AGORA_UTC = "strftime('%Y-%m-%d %H:%M:%S', 'now')"
+_SOMAR_VERSAO = f", versao = versao + 1, atualizado_em = {_AGORA_UTC}"
+
+# colunas que não são dados do registro: a própria versão e os totais de
+# propostas, que mudam junto com os itens (e os itens já sobem a versão e
+# entram no log pelos seus triggers)
+_COLUNAS_DERIVADAS = {"id", "versao", "atualizado_em", "subtotal", "desconto", "total"}
+
+
+def _colunas_de_dados(conn: sqlite3.Connection, tabela: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({tabela})") if row[1] not in _COLUNAS_DERIVADAS]
+
+
+def _triggers_versao(tabela: str, colunas: Sequence[str]) -> List[str]:
+    """Triggers de `versao`/`atualizado_em` e do log de UPDATE de `tabela`.
+
+    Só um UPDATE que muda de fato alguma das `colunas` sobe a versão e entra
+    em `alteracoes`. O UPDATE da versão (e o que carimba `atualizado_em` no
+    INSERT) não toca nessas colunas, então não dispara nada de novo: um
+    registro novo fica na versão 1 com uma linha no log.
+    """
+    mudou = " OR ".join(f"new.{c} IS NOT old.{c}" for c in colunas)
+    lista = ", ".join(colunas)
+    return [
+        f"DROP TRIGGER IF EXISTS trg_{tabela}_log_update",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabela}_log_update AFTER UPDATE OF {lista} ON {tabela}
+        WHEN {mudou} BEGIN
+            {_LOG_ALTERACAO.format(tabela=tabela, id="new.id")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabela}_versao_ins AFTER INSERT ON {tabela} BEGIN
+            UPDATE {tabela} SET atualizado_em = {_AGORA_UTC} WHERE id = new.id;
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_{tabela}_versao_upd AFTER UPDATE OF {lista} ON {tabela}
+        WHEN new.versao = old.versao AND ({mudou}) BEGIN
+            UPDATE {tabela} SET versao = old.versao + 1, atualizado_em = {_AGORA_UTC} WHERE id = new.id;
+        END
+        """,
+    ]
+
+
+def _v10_versoes(conn: sqlite3.Connection) -> None:
+    # registros antigos ficam sem atualizado_em até a primeira alteração.
+    # As listas de colunas são lidas agora: uma migração que acrescente
+    # colunas a estas tabelas precisa recriar os triggers.
+    for tabela in ("clientes", "propostas", "templates"):
+        if not _has_column(conn, tabela, "versao"):
+            conn.execute(f"ALTER TABLE {tabela} ADD COLUMN versao INTEGER NOT NULL DEFAULT 1")
+        if not _has_column(conn, tabela, "atualizado_em"):
+            conn.execute(f"ALTER TABLE {tabela} ADD COLUMN atualizado_em TEXT")
+        for comando in _triggers_versao(tabela, _colunas_de_dados(conn, tabela)):
+            conn.execute(comando)
+    # itens sobem a versão da proposta no mesmo UPDATE que ajusta os totais
+    for evento in ("ins", "upd", "del"):
+        conn.execute(f"DROP TRIGGER IF EXISTS trg_itens_totais_{evento}")
+    for comando in _triggers_totais_itens(_SOMAR_VERSAO):
+        conn.execute(comando)
+    # mudança só de descrição não passa pelos totais
+    conn.execute(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_itens_versao_upd AFTER UPDATE OF descricao ON itens
+        WHEN new.descricao IS NOT old.descricao
+            AND new.quantidade IS old.quantidade AND new.valor_unitario IS old.valor_unitario
+            AND new.proposta_id IS old.proposta_id BEGIN
+            UPDATE propostas SET versao = versao + 1, atualizado_em = {_AGORA_UTC} WHERE id = new.proposta_id;
+        END
+        """
+    )
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "schema base", aplicar=_v1_schema_base),
+    Migration(
+        2,
+        "índices de itens e propostas",
+        sql=(
+            "CREATE INDEX IF NOT EXISTS idx_itens_proposta ON itens(proposta_id)",
+            "CREATE INDEX IF NOT EXISTS idx_propostas_cliente ON propostas(cliente_id)",
+            "CREATE INDEX IF NOT EXISTS idx_propostas_status ON propostas(status)",
+            # o rowid (id) já vai junto em cada entrada: serve para (data_criacao, id)
+            "CREATE INDEX IF NOT EXISTS idx_propostas_data_criacao ON propostas(data_criacao)",
+        ),
+    ),
+    Migration(
+        3,
+        "busca full-text (FTS5)",
+        sql=FTS_SQL,
+        backfills=(
+            Backfill("fts_clientes", "clientes", _backfill_clientes_fts),
+            Backfill("fts_propostas", "propostas", _backfill_propostas_fts),
+            Backfill("fts_itens", "itens", _backfill_itens_fts),
+        ),
+    ),
+    Migration(
+        4,
+        "subtotal, desconto e total em propostas",
+        aplicar=_v4_totais,
+        backfills=(Backfill("totais_propostas", "propostas", _backfill_totais),),
+    ),
+    Migration(5, "métricas do dashboard", aplicar=_v5_metricas),
+    Migration(6, "blocos de ids por processo", aplicar=_v6_id_blocos),
+    Migration(7, "log de alterações entre workers", sql=ALTERACOES_SQL),
+    Migration(
+        8,
+        "índice para paginação por status e data",
+        sql=(
+            # (status, data_criacao, id) para a listagem "recentes" filtrada por status;
+            # sem filtro, idx_propostas_data_criacao e idx_propostas_total já servem
+            "CREATE INDEX IF NOT EXISTS idx_propostas_status_data ON propostas(status, data_criacao)",
+        ),
+    ),
+    Migration(9, "progresso das importações em massa", sql=IMPORTACOES_SQL),
+    Migration(10, "versão e data de alteração de clientes, propostas e templates", aplicar=_v10_versoes),
+]
+
+
+class MigrationRunner:
+    """Aplica as migrações pendentes e executa backfills retomáveis.
+
+    `storage` é o StorageManager (ou qualquer objeto com `transacao()`).
+    """
+
+    def __init__(self, storage, migrations: Sequence[Migration] = MIGRATIONS):
+        self.storage = storage
+        self.migrations = sorted(migrations, key=lambda m: m.versao)
+
+    def _preparar(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                versao INTEGER PRIMARY KEY,
+                descricao TEXT NOT NULL,
+                aplicada_em TEXT NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS schema_backfill (
+                nome TEXT PRIMARY KEY,
+                versao INTEGER NOT NULL,
+                ultimo_id INTEGER NOT NULL DEFAULT 0,
+                concluido INTEGER NOT NULL DEFAULT 0,
+                atualizado_em TEXT
+            )
+            """
+        )
+
+    @staticmethod
+    def _agora() -> str:
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def versao_atual(self) -> int:
+        with self.storage.transacao() as conn:
+            self._preparar(conn)
+            return conn.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()[0]
+
+    def pendentes(self) -> List[Migration]:
+        atual = self.versao_atual()
+        return [m for m in self.migrations if m.versao > atual]
+
+    def migrar(self, alvo: Optional[int] = None) -> List[int]:
+        """Aplica, uma transação por versão, as migrações até `alvo`."""
+        aplicadas = []
+        for migration in self.pendentes():
+            if alvo is not None and migration.versao > alvo:
+                break
+            with self.storage.transacao() as conn:
+                # outro worker pode ter aplicado a versão desde pendentes();
+                # o BEGIN IMMEDIATE da transação serializa esta releitura
+                atual = conn.execute("SELECT COALESCE(MAX(versao), 0) FROM schema_version").fetchone()[0]
+                if migration.versao <= atual:
+                    continue
+                for comando in migration.sql:
+                    conn.execute(comando)
+                if migration.aplicar:
+                    migration.aplicar(conn)
+                for backfill in migration.backfills:
+                    conn.execute(
+                        "INSERT OR IGNORE INTO schema_backfill (nome, versao, atualizado_em) VALUES (?, ?, ?)",
+                        (backfill.nome, migration.versao, self._agora()),
+                    )
+                conn.execute(
+                    "INSERT INTO schema_version (versao, descricao, aplicada_em) VALUES (?, ?, ?)",
+                    (migration.versao, migration.descricao, self._agora()),
+                )
+            logger.info("Migração %s aplicada: %s", migration.versao, migration.descricao)
+            aplicadas.append(migration.versao)
+        return aplicadas
+
+    def _backfills(self) -> Dict[str, Backfill]:
+        return {b.nome: b for m in self.migrations for b in m.backfills}
+
+    def executar_backfills(self, lote: int = 1000, max_lotes: Optional[int] = None) -> Dict[str, int]:
+        """Processa backfills pendentes; devolve quantos lotes rodaram por backfill."""
+        registrados = self._backfills()
+        with self.storage.transacao() as conn:
+            self._preparar(conn)
+            pendentes = conn.execute(
+                "SELECT nome, ultimo_id FROM schema_backfill WHERE concluido = 0 ORDER BY versao, nome"
+            ).fetchall()
+
+        resultado: Dict[str, int] = {}
+        for nome, ultimo_id in pendentes:
+            backfill = registrados.get(nome)
+            if backfill is None:
+                logger.warning("Backfill desconhecido ignorado: %s", nome)
+                continue
+
+            lotes = 0
+            while max_lotes is None or lotes < max_lotes:
+                with self.storage.transacao() as conn:
+                    # relê o progresso: outro worker pode estar no mesmo backfill
+                    ultimo_id, concluido = conn.execute(
+                        "SELECT ultimo_id, concluido FROM schema_backfill WHERE nome = ?", (nome,)
+                    ).fetchone()
+                    if concluido:
+                        break
+                    fim = conn.execute(
+                        f"SELECT MAX(id) FROM (SELECT id FROM {backfill.tabela} "
+                        "WHERE id > ? ORDER BY id LIMIT ?)",
+                        (ultimo_id, lote),
+                    ).fetchone()[0]
+                    if fim is None:
+                        conn.execute(
+                            "UPDATE schema_backfill SET concluido = 1, atualizado_em = ? WHERE nome = ?",
+                            (self._agora(), nome),
+                        )
+                        logger.info("Backfill %s concluído.", nome)
+                        break
+                    backfill.processar(conn, ultimo_id, fim)
+                    conn.execute(
+                        "UPDATE schema_backfill SET ultimo_id = ?, atualizado_em = ? WHERE nome = ?",
+                        (fim, self._agora(), nome),
+                    )
+                ultimo_id = fim
+                lotes += 1
+            resultado[nome] = lotes
+        return resultado
+
+    def status(self) -> Dict[str, object]:
+        with self.storage.transacao() as conn:
+            self._preparar(conn)
+            aplicadas = conn.execute(
+                "SELECT versao, descricao, aplicada_em FROM schema_version ORDER BY versao"
+            ).fetchall()
+            backfills = conn.execute(
+                "SELECT nome, ultimo_id, concluido FROM schema_backfill ORDER BY versao, nome"
+            ).fetchall()
+        atual = aplicadas[-1][0] if aplicadas else 0
+        return {
+            "versao_atual": atual,
+            "versao_mais_recente": self.migrations[-1].versao if self.migrations else 0,
+            "aplicadas": aplicadas,
+            "pendentes": [m.versao for m in self.migrations if m.versao > atual],
+            "backfills": backfills,
+        }
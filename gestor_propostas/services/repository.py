@@ -0,0 +1,878 @@
+import base64
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from ..models import GestorPropostas, Cliente, Proposta, TemplateProposta
+from .aggregates import AggregateEngine
+from .coherence import Alteracoes, ChangeFeed
+from .fuzzy import TrigramIndex
+from .search import SearchIndex, montar_consulta_fts
+from .storage import StorageManager
+from .unit_of_work import UnitOfWork
+
+logger = logging.getLogger(__name__)
+
+# (colunas da ordenação, decrescente)
+Chave = Tuple[Tuple[str, ...], bool]
+
+
+@dataclass
+class Pagina:
+    registros: list
+    # cursores para os métodos paginar_* (apos=/antes=); None = não há
+    proximo: Optional[str] = None
+    anterior: Optional[str] = None
+
+
+class IdentityMap:
+    """Cache LRU limitado que garante uma instância por (tipo, id)."""
+
+    def __init__(self, capacidade: int = 0):
+        self.capacidade = max(0, capacidade)
+        self._dados: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave: Hashable):
+        if not self.capacidade:
+            return None
+        with self._lock:
+            obj = self._dados.get(chave)
+            if obj is not None:
+                self._dados.move_to_end(chave)
+            return obj
+
+    def put(self, chave: Hashable, obj) -> None:
+        if not self.capacidade:
+            return
+        with self._lock:
+            self._dados[chave] = obj
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.capacidade:
+                self._dados.popitem(last=False)
+
+    def discard(self, chave: Hashable) -> None:
+        with self._lock:
+            self._dados.pop(chave, None)
+
+    def values(self) -> List[object]:
+        with self._lock:
+            return list(self._dados.values())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+    def __len__(self) -> int:
+        return len(self._dados)
+
+
+class Repository:
+    """API de leitura/escrita usada pelas views.
+
+    Filtros, paginação e agregados rodam no SQLite. Quando `gestor` é
+    informado (carregar_tudo habilitado), ele serve como mapa de identidade;
+    caso contrário os objetos hidratados ficam no IdentityMap limitado.
+    """
+
+    def __init__(
+        self,
+        gestor: Optional[GestorPropostas] = None,
+        cache_size: int = 0,
+        fuzzy_max_bytes: int = 128 * 1024 * 1024,
+        compacto: bool = False,
+        paralelo: bool = False,
+    ):
+        self.gestor = gestor
+        # itens das propostas do gestor em ItensColunares (ver carregar_tudo)
+        self.compacto = compacto
+        # carga inicial com uma conexão de leitura por tabela
+        self.paralelo = paralelo
+        self.cache = IdentityMap(cache_size)
+        self._local = threading.local()
+        self.indice_clientes = TrigramIndex(max_bytes=fuzzy_max_bytes)
+        self._indice_pronto = threading.Event()
+        self._indice_lock = threading.Lock()
+        self._indice_thread: Optional[threading.Thread] = None
+        self.agregados = AggregateEngine()
+        # (status, q) -> (sequência do log de alterações, total) das buscas
+        self._contagens = IdentityMap(256)
+        self.alteracoes = ChangeFeed()
+        self.alteracoes.posicionar()
+
+    # ---- sessão (unit of work) ---- #
+
+    def abrir_sessao(self) -> UnitOfWork:
+        uow = UnitOfWork()
+        self._local.uow = uow
+        return uow
+
+    def fechar_sessao(self, commit: bool = True) -> None:
+        uow = getattr(self._local, "uow", None)
+        self._local.uow = None
+        if uow is None:
+            return
+        if commit:
+            try:
+                uow.commit()
+            except Exception:
+                # a transação foi desfeita: a memória não pode ficar à frente do banco
+                self._descartar(uow)
+                raise
+        elif uow.pendente:
+            self._descartar(uow)
+
+    def _descartar(self, uow: UnitOfWork) -> None:
+        # objetos em memória podem ter alterações que não foram gravadas:
+        # os registros da sessão voltam ao que está no banco
+        alterados = uow.alterados()
+        uow.rollback()
+        self.cache.clear()
+        self._aplicar_alteracoes(alterados)
+
+    @contextmanager
+    def _escrita(self) -> Iterator[UnitOfWork]:
+        # dentro de uma sessão as alterações esperam o commit da sessão;
+        # fora dela cada chamada grava imediatamente
+        uow = getattr(self._local, "uow", None)
+        if uow is not None:
+            yield uow
+        else:
+            with UnitOfWork() as uow:
+                yield uow
+
+    # ---- mapa de identidade ---- #
+
+    def _em_memoria(self, tipo: str, oid: int):
+        if self.gestor is not None:
+            if tipo == "cliente":
+                return self.gestor.obter_cliente_por_id(oid)
+            if tipo == "proposta":
+                return self.gestor.obter_proposta_por_id(oid)
+            return self.gestor.obter_template_por_id(oid)
+        return self.cache.get((tipo, oid))
+
+    def _registrar(self, tipo: str, obj) -> None:
+        if self.gestor is None:
+            self.cache.put((tipo, obj.id), obj)
+
+    # ---- coerência entre processos ---- #
+
+    def sincronizar(self) -> None:
+        """Traz para a memória o que outros processos gravaram desde a última chamada.
+
+        Chamado no início de cada requisição; sem gravações externas custa
+        só um `PRAGMA data_version`.
+        """
+        alteracoes = self.alteracoes.novas()
+        if alteracoes is None:
+            logger.warning("Log de alterações podado além do último lido; recarregando tudo.")
+            self.recarregar()
+        elif alteracoes:
+            self._aplicar_alteracoes(alteracoes)
+
+    def recarregar(self) -> None:
+        self.cache.clear()
+        if self.gestor is not None:
+            StorageManager.carregar_tudo(self.gestor, compacto=self.compacto, paralelo=self.paralelo)
+        if self._indice_pronto.is_set():
+            with self._indice_lock:
+                self.indice_clientes.limpar()
+                self._carregar_indice_clientes()
+
+    def carregar_gestor(self, gestor: GestorPropostas, em_segundo_plano: bool = False) -> None:
+        """Carrega o banco inteiro em `gestor` e passa a usá-lo como mapa de identidade.
+
+        Em segundo plano, as leituras seguem pelo SQLite (e pelo IdentityMap)
+        até a carga terminar; o que for gravado nesse meio-tempo, por este ou
+        por outros processos, é reaplicado a partir do log de alterações.
+        """
+        if em_segundo_plano:
+            threading.Thread(
+                target=self.carregar_gestor, args=(gestor,), name="carga-gestor", daemon=True
+            ).start()
+            return
+
+        inicio = time.perf_counter()
+        # log próprio: o do repositório continua sendo consumido pelas requisições
+        durante_carga = ChangeFeed()
+        durante_carga.posicionar()
+        StorageManager.carregar_tudo(gestor, compacto=self.compacto, paralelo=self.paralelo)
+        self.gestor = gestor
+        self.cache.clear()
+        # inclui o que foi gravado até a troca acima; reaplicar é idempotente
+        pendentes = durante_carga.novas()
+        if pendentes is None:
+            self.recarregar()
+        elif pendentes:
+            self._aplicar_alteracoes(pendentes)
+        logger.info(f"Gestor carregado em {time.perf_counter() - inicio:.1f}s.")
+
+    def _aplicar_alteracoes(self, alteracoes: Alteracoes) -> None:
+        conn = StorageManager._get_conn()
+        clientes = sorted(alteracoes.get("clientes", ()))
+        templates = sorted(alteracoes.get("templates", ()))
+        propostas = sorted(alteracoes.get("propostas", ()))
+        for tipo, ids in (("cliente", clientes), ("template", templates), ("proposta", propostas)):
+            for oid in ids:
+                self.cache.discard((tipo, oid))
+
+        if self.gestor is not None:
+            with self.gestor.lote():
+                self._recarregar_no_gestor(conn, clientes, templates, propostas)
+
+        if clientes and self._indice_pronto.is_set():
+            encontrados = set()
+            for cliente_id, nome, documento in self._linhas(
+                conn, "SELECT id, nome, documento FROM clientes WHERE id IN ({})", clientes
+            ):
+                self.indice_clientes.adicionar(cliente_id, nome, documento or "")
+                encontrados.add(cliente_id)
+            for cliente_id in set(clientes) - encontrados:
+                self.indice_clientes.remover(cliente_id)
+
+    @staticmethod
+    def _linhas(conn, sql: str, ids: List[int]) -> Iterator[tuple]:
+        # em lotes, abaixo do limite de parâmetros do SQLite
+        for inicio in range(0, len(ids), 900):
+            lote = ids[inicio:inicio + 900]
+            yield from conn.execute(sql.format(", ".join("?" for _ in lote)), lote)
+
+    def _recarregar_no_gestor(self, conn, clientes, templates, propostas) -> None:
+        gestor = self.gestor
+        # dentro do lote o gestor ainda mostra a versão anterior
+        novos_clientes: Dict[int, Cliente] = {}
+        # clientes e templates são atualizados no lugar: propostas os referenciam
+        for row in self._linhas(
+            conn, f"SELECT {StorageManager.CLIENTE_COLS} FROM clientes WHERE id IN ({{}})", clientes
+        ):
+            novo = StorageManager.cliente_from_row(row)
+            atual = gestor.obter_cliente_por_id(novo.id)
+            if atual is None:
+                novos_clientes[novo.id] = gestor.registrar_cliente(novo)
+            else:
+                for campo in Cliente.__slots__:
+                    setattr(atual, campo, getattr(novo, campo))
+
+        vistos = set()
+        for row in self._linhas(
+            conn, f"SELECT {StorageManager.TEMPLATE_COLS} FROM templates WHERE id IN ({{}})", templates
+        ):
+            novo = StorageManager.template_from_row(row)
+            vistos.add(novo.id)
+            atual = gestor.obter_template_por_id(novo.id)
+            if atual is None:
+                gestor.registrar_template(novo)
+            else:
+                for campo in TemplateProposta.__slots__:
+                    setattr(atual, campo, getattr(novo, campo))
+        for template_id in set(templates) - vistos:
+            gestor.remover_template(template_id)
+
+        # propostas são trocadas por objetos novos, com os itens relidos
+        n = len(StorageManager.PROPOSTA_COLS.split(","))
+        novas: Dict[int, Proposta] = {}
+        for row in self._linhas(conn, f"{self._select_propostas()} WHERE p.id IN ({{}})", propostas):
+            cliente = (
+                novos_clientes.get(row[n])
+                or gestor.obter_cliente_por_id(row[n])
+                or StorageManager.cliente_from_row(row[n:])
+            )
+            proposta = StorageManager.proposta_from_row(row[:n], cliente)
+            novas[proposta.id] = proposta
+        StorageManager.carregar_itens(conn, novas, compacto=self.compacto)
+        for proposta_id in propostas:
+            gestor.remover_proposta(proposta_id)
+        gestor.registrar_propostas(novas.values())
+
+    def _hidratar_cliente(self, row) -> Cliente:
+        cliente = self._em_memoria("cliente", row[0])
+        if cliente is None:
+            cliente = StorageManager.cliente_from_row(row)
+            self._registrar("cliente", cliente)
+        return cliente
+
+    def _hidratar_template(self, row) -> TemplateProposta:
+        template = self._em_memoria("template", row[0])
+        if template is None:
+            template = StorageManager.template_from_row(row)
+            self._registrar("template", template)
+        return template
+
+    def _hidratar_propostas(self, conn, rows) -> List[Proposta]:
+        """rows = colunas de PROPOSTA_COLS seguidas de CLIENTE_COLS."""
+        n = len(StorageManager.PROPOSTA_COLS.split(","))
+        resultado: List[Proposta] = []
+        novas: Dict[int, Proposta] = {}
+
+        for row in rows:
+            proposta = self._em_memoria("proposta", row[0])
+            if proposta is None:
+                cliente = self._hidratar_cliente(row[n:])
+                proposta = StorageManager.proposta_from_row(row[:n], cliente)
+                novas[proposta.id] = proposta
+            resultado.append(proposta)
+
+        if novas:
+            StorageManager.carregar_itens(conn, novas)
+            for proposta in novas.values():
+                self._registrar("proposta", proposta)
+        return resultado
+
+    def _obter_varios(self, tipo: str, ids: Iterable[int], buscar: Callable[[List[int]], Iterable]) -> list:
+        """Objetos dos ids informados, na mesma ordem; os que faltam na memória vêm de `buscar`."""
+        ids = list(dict.fromkeys(ids))
+        encontrados = {}
+        faltando = []
+        for oid in ids:
+            obj = self._em_memoria(tipo, oid)
+            if obj is None:
+                faltando.append(oid)
+            else:
+                encontrados[oid] = obj
+        if faltando:
+            encontrados.update((obj.id, obj) for obj in buscar(faltando))
+        return [encontrados[oid] for oid in ids if oid in encontrados]
+
+    def _paginar_por_id(self, tabela: str, colunas: str, hidratar, limit: int, apos: Optional[str]) -> Pagina:
+        chave: Chave = ((f"{tabela}.id",), False)
+        valores = self._ler_cursor(apos, chave) if apos else None
+        rows = StorageManager._get_conn().execute(
+            f"SELECT {colunas} FROM {tabela} WHERE id > ? ORDER BY id LIMIT ?",
+            (valores[0] if valores else 0, limit + 1),
+        ).fetchall()
+        pagina = Pagina([hidratar(row) for row in rows[:limit]])
+        if len(rows) > limit:
+            pagina.proximo = self._cursor(chave, (rows[limit - 1][0],))
+        return pagina
+
+    @staticmethod
+    def _cols(alias: str, cols: str) -> str:
+        return ", ".join(f"{alias}.{c.strip()}" for c in cols.split(","))
+
+    def _colunas_propostas(self) -> str:
+        return (
+            f"{self._cols('p', StorageManager.PROPOSTA_COLS)}, "
+            f"{self._cols('c', StorageManager.CLIENTE_COLS)}"
+        )
+
+    def _select_propostas(self) -> str:
+        return (
+            f"SELECT {self._colunas_propostas()} "
+            "FROM propostas p JOIN clientes c ON c.id = p.cliente_id"
+        )
+
+    # ---- clientes ---- #
+
+    def obter_cliente(self, cliente_id: int) -> Optional[Cliente]:
+        cliente = self._em_memoria("cliente", cliente_id)
+        if cliente is not None:
+            return cliente
+        row = StorageManager._get_conn().execute(
+            f"SELECT {StorageManager.CLIENTE_COLS} FROM clientes WHERE id = ?",
+            (cliente_id,),
+        ).fetchone()
+        return self._hidratar_cliente(row) if row else None
+
+    def listar_clientes(self, limit: Optional[int] = None) -> List[Cliente]:
+        sql = f"SELECT {StorageManager.CLIENTE_COLS} FROM clientes ORDER BY id"
+        params: list = []
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        cur = StorageManager._get_conn().execute(sql, params)
+        return [self._hidratar_cliente(row) for row in cur]
+
+    def obter_clientes(self, ids: Iterable[int]) -> List[Cliente]:
+        conn = StorageManager._get_conn()
+        sql = f"SELECT {StorageManager.CLIENTE_COLS} FROM clientes WHERE id IN ({{}})"
+        return self._obter_varios(
+            "cliente", ids, lambda faltando: map(self._hidratar_cliente, self._linhas(conn, sql, faltando))
+        )
+
+    def paginar_clientes(self, limit: int = 50, apos: Optional[str] = None) -> Pagina:
+        """Clientes em ordem de id, a partir do cursor `apos` (só avança)."""
+        return self._paginar_por_id("clientes", StorageManager.CLIENTE_COLS, self._hidratar_cliente, limit, apos)
+
+    def contar_clientes(self) -> int:
+        return StorageManager._get_conn().execute("SELECT COUNT(*) FROM clientes").fetchone()[0]
+
+    def criar_cliente(self, nome: str, documento: str = "", contato: str = "") -> Cliente:
+        if self.gestor is not None:
+            cliente = self.gestor.criar_cliente(nome, documento, contato)
+        else:
+            cliente = Cliente(nome, documento, contato)
+        with self._escrita() as uow:
+            uow.salvar_cliente(cliente)
+        self._registrar("cliente", cliente)
+        if self._indice_pronto.is_set():
+            self.indice_clientes.adicionar(cliente.id, cliente.nome, cliente.documento)
+        return cliente
+
+    # ---- busca aproximada de clientes (typeahead) ---- #
+
+    def construir_indice_clientes(self, em_segundo_plano: bool = False) -> None:
+        """Carrega o índice de trigramas a partir do banco.
+
+        Em segundo plano, as sugestões usam a busca FTS até o índice ficar pronto.
+        """
+        if em_segundo_plano:
+            self._indice_thread = threading.Thread(
+                target=self.construir_indice_clientes, name="indice-clientes", daemon=True
+            )
+            self._indice_thread.start()
+            return
+
+        with self._indice_lock:
+            self._carregar_indice_clientes()
+            self.indice_clientes.aquecer()
+        self._indice_pronto.set()
+        logger.info(
+            f"Índice de clientes pronto: {len(self.indice_clientes)} clientes, "
+            f"{self.indice_clientes.bytes_usados / 1024 / 1024:.1f} MiB."
+        )
+        if self.indice_clientes.excedido:
+            logger.warning("Índice de clientes excedeu o orçamento de memória; usando busca FTS.")
+
+    def _carregar_indice_clientes(self) -> None:
+        # só clientes ainda não indexados (inclusive os criados por outros processos)
+        indice = self.indice_clientes
+        cur = StorageManager._get_conn().execute(
+            "SELECT id, nome, documento FROM clientes WHERE id > ? ORDER BY id",
+            (indice.ultimo_id,),
+        )
+        while True:
+            rows = cur.fetchmany(5000)
+            if not rows or indice.carregar(rows) < len(rows):
+                break
+
+    def sugerir_clientes(self, q: str, limit: int = 10) -> List[Tuple[Cliente, float]]:
+        """Clientes parecidos com `q` (sem acento e tolerante a erros), com score 0..1."""
+        if not self._indice_pronto.is_set() and self._indice_thread is None:
+            self.construir_indice_clientes()
+
+        indice = self.indice_clientes
+        if self._indice_pronto.is_set() and not indice.excedido:
+            if self._indice_lock.acquire(blocking=False):
+                try:
+                    self._carregar_indice_clientes()
+                finally:
+                    self._indice_lock.release()
+            encontrados = indice.buscar(q, limit)
+        else:
+            encontrados = [(cliente_id, 1.0) for cliente_id, _ in SearchIndex.buscar_clientes(q, limit)]
+
+        resultado = []
+        for cliente_id, score in encontrados:
+            cliente = self.obter_cliente(cliente_id)
+            if cliente is not None:
+                resultado.append((cliente, score))
+        return resultado
+
+    # ---- templates ---- #
+
+    def obter_template(self, template_id: int) -> Optional[TemplateProposta]:
+        template = self._em_memoria("template", template_id)
+        if template is not None:
+            return template
+        row = StorageManager._get_conn().execute(
+            f"SELECT {StorageManager.TEMPLATE_COLS} FROM templates WHERE id = ?",
+            (template_id,),
+        ).fetchone()
+        return self._hidratar_template(row) if row else None
+
+    def listar_templates(self) -> List[TemplateProposta]:
+        cur = StorageManager._get_conn().execute(
+            f"SELECT {StorageManager.TEMPLATE_COLS} FROM templates ORDER BY id"
+        )
+        return [self._hidratar_template(row) for row in cur]
+
+    def obter_templates(self, ids: Iterable[int]) -> List[TemplateProposta]:
+        conn = StorageManager._get_conn()
+        sql = f"SELECT {StorageManager.TEMPLATE_COLS} FROM templates WHERE id IN ({{}})"
+        return self._obter_varios(
+            "template", ids, lambda faltando: map(self._hidratar_template, self._linhas(conn, sql, faltando))
+        )
+
+    def paginar_templates(self, limit: int = 50, apos: Optional[str] = None) -> Pagina:
+        return self._paginar_por_id(
+            "templates", StorageManager.TEMPLATE_COLS, self._hidratar_template, limit, apos
+        )
+
+    def criar_template(self, **campos) -> TemplateProposta:
+        if self.gestor is not None:
+            template = self.gestor.criar_template(**campos)
+        else:
+            template = TemplateProposta(**campos)
+        with self._escrita() as uow:
+            uow.salvar_template(template)
+        self._registrar("template", template)
+        return template
+
+    def salvar_template(self, template: TemplateProposta) -> None:
+        with self._escrita() as uow:
+            uow.salvar_template(template)
+
+    def excluir_template(self, template_id: int) -> None:
+        with self._escrita() as uow:
+            uow.excluir_template(template_id)
+
+        if self.gestor is not None:
+            self.gestor.remover_template(template_id)
+        else:
+            self.cache.discard(("template", template_id))
+            for obj in self.cache.values():
+                if isinstance(obj, Proposta) and obj.template_id == template_id:
+                    obj.template_id = None
+
+    # ---- propostas ---- #
+
+    def obter_proposta(self, proposta_id: int) -> Optional[Proposta]:
+        proposta = self._em_memoria("proposta", proposta_id)
+        if proposta is not None:
+            return proposta
+        conn = StorageManager._get_conn()
+        rows = conn.execute(
+            f"{self._select_propostas()} WHERE p.id = ?", (proposta_id,)
+        ).fetchall()
+        propostas = self._hidratar_propostas(conn, rows)
+        return propostas[0] if propostas else None
+
+    def obter_propostas(self, ids: Iterable[int]) -> List[Proposta]:
+        """Várias propostas numa consulta por lote (itens inclusive), na ordem dos ids."""
+        conn = StorageManager._get_conn()
+        sql = f"{self._select_propostas()} WHERE p.id IN ({{}})"
+        return self._obter_varios(
+            "proposta", ids, lambda faltando: self._hidratar_propostas(conn, list(self._linhas(conn, sql, faltando)))
+        )
+
+    # ordenações aceitas em listar_propostas: nome -> (colunas da chave, decrescente).
+    # A chave termina sempre em p.id, então é única e serve de cursor (keyset).
+    ORDENS: Dict[str, Chave] = {
+        "recentes": (("p.data_criacao", "p.id"), True),
+        "valor": (("p.total", "p.id"), True),
+        "valor_asc": (("p.total", "p.id"), False),
+    }
+    ORDEM_PADRAO: Chave = (("p.id",), False)
+    ORDEM_RELEVANCIA: Chave = (("h.rank", "p.id"), False)
+
+    @classmethod
+    def _consulta(
+        cls, status: Optional[str], q: Optional[str], ordenar: Optional[str] = None
+    ) -> Tuple[str, str, List[str], list, Chave]:
+        """Monta (WITH, FROM, condições, params, chave de ordenação) para listar/contar propostas.
+
+        Com `q`, as propostas vêm da busca FTS5 e são ordenadas por relevância,
+        a menos que `ordenar` peça outra ordem (ver ORDENS).
+        """
+        prefixo, params, chave = "", [], cls.ORDEM_PADRAO
+        origem = "FROM propostas p JOIN clientes c ON c.id = p.cliente_id"
+        condicoes: List[str] = []
+        if montar_consulta_fts(q):
+            cte, params = SearchIndex.hits_propostas(q)
+            prefixo = f"WITH {cte} "
+            origem = (
+                "FROM hits h JOIN propostas p ON p.id = h.proposta_id "
+                "JOIN clientes c ON c.id = p.cliente_id"
+            )
+            chave = cls.ORDEM_RELEVANCIA
+        if status:
+            condicoes.append("p.status = ?")
+            params.append(status.lower())
+        chave = cls.ORDENS.get(ordenar or "", chave)
+        return prefixo, origem, condicoes, params, chave
+
+    @staticmethod
+    def _where(condicoes: List[str]) -> str:
+        return f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    @staticmethod
+    def _order_by(chave: Chave, inverter: bool = False) -> str:
+        colunas, decrescente = chave
+        sufixo = " DESC" if decrescente != inverter else ""
+        return ", ".join(coluna + sufixo for coluna in colunas)
+
+    def listar_propostas(
+        self,
+        status: Optional[str] = None,
+        q: Optional[str] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        ordenar: Optional[str] = None,
+    ) -> List[Proposta]:
+        prefixo, origem, condicoes, params, chave = self._consulta(status, q, ordenar)
+        sql = (
+            f"{prefixo}SELECT {self._colunas_propostas()} {origem}{self._where(condicoes)} "
+            f"ORDER BY {self._order_by(chave)}"
+        )
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([limit, offset])
+        conn = StorageManager._get_conn()
+        return self._hidratar_propostas(conn, conn.execute(sql, params).fetchall())
+
+    @staticmethod
+    def _cursor(chave: Chave, valores) -> str:
+        dados = json.dumps([",".join(chave[0]), chave[1], list(valores)], separators=(",", ":"))
+        return base64.urlsafe_b64encode(dados.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _ler_cursor(cursor: str, chave: Chave) -> Optional[list]:
+        """Valores da chave guardados no cursor; None se ele for de outra ordenação ou inválido."""
+        try:
+            dados = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            colunas, decrescente, valores = json.loads(dados)
+        except (ValueError, TypeError):
+            return None
+        if colunas != ",".join(chave[0]) or decrescente != chave[1]:
+            return None
+        # o cursor vem da URL: só aceita valores que o SQLite consegue vincular
+        if not isinstance(valores, list) or len(valores) != len(chave[0]):
+            return None
+        if not all(v is None or isinstance(v, (str, int, float)) for v in valores):
+            return None
+        return valores
+
+    def paginar_propostas(
+        self,
+        status: Optional[str] = None,
+        q: Optional[str] = None,
+        ordenar: Optional[str] = None,
+        limit: int = 20,
+        apos: Optional[str] = None,
+        antes: Optional[str] = None,
+    ) -> Pagina:
+        """Uma página de propostas a partir de um cursor (keyset), sem OFFSET.
+
+        `apos`/`antes` são os cursores `proximo`/`anterior` de uma página já
+        lida; o SQLite continua do ponto da chave de ordenação pelo índice,
+        então a página 5000 custa o mesmo que a primeira. Cursor inválido ou
+        de outra ordenação volta para a primeira página.
+        """
+        prefixo, origem, condicoes, params, chave = self._consulta(status, q, ordenar)
+        colunas = chave[0]
+        voltando = not apos and bool(antes)
+        valores = self._ler_cursor(apos or antes, chave) if (apos or antes) else None
+        if valores is None:
+            voltando = False
+        else:
+            # depois do cursor na ordem pedida; antes dele, percorrendo ao contrário
+            operador = "<" if chave[1] != voltando else ">"
+            condicoes.append(f"({', '.join(colunas)}) {operador} ({', '.join('?' for _ in colunas)})")
+            params.extend(valores)
+
+        sql = (
+            f"{prefixo}SELECT {self._colunas_propostas()}, {', '.join(colunas)} {origem}"
+            f"{self._where(condicoes)} ORDER BY {self._order_by(chave, inverter=voltando)} LIMIT ?"
+        )
+        params.append(limit + 1)
+        conn = StorageManager._get_conn()
+        rows = conn.execute(sql, params).fetchall()
+        tem_mais = len(rows) > limit
+        rows = rows[:limit]
+        if voltando:
+            rows.reverse()
+
+        n = len(colunas)
+        pagina = Pagina(self._hidratar_propostas(conn, [row[:-n] for row in rows]))
+        if rows:
+            primeiro, ultimo = self._cursor(chave, rows[0][-n:]), self._cursor(chave, rows[-1][-n:])
+            if voltando:
+                pagina.proximo, pagina.anterior = ultimo, primeiro if tem_mais else None
+            else:
+                pagina.proximo, pagina.anterior = ultimo if tem_mais else None, primeiro if valores else None
+        return pagina
+
+    def contar_propostas(self, status: Optional[str] = None, q: Optional[str] = None) -> int:
+        if not montar_consulta_fts(q):
+            # sem busca, a contagem sai de metricas_dashboard (uma linha por status e mês)
+            return self.agregados.contar(status.lower() if status else None)
+
+        # com busca, COUNT(*) sobre os hits fica em cache até a próxima gravação
+        conn = StorageManager._get_conn()
+        versao = self.alteracoes.ultima_sequencia(conn)
+        em_cache = self._contagens.get((status or "", q))
+        if em_cache is not None and em_cache[0] == versao:
+            return em_cache[1]
+        prefixo, origem, condicoes, params, _ = self._consulta(status, q)
+        total = conn.execute(f"{prefixo}SELECT COUNT(*) {origem}{self._where(condicoes)}", params).fetchone()[0]
+        self._contagens.put((status or "", q), (versao, total))
+        return total
+
+    def buscar_clientes(self, q: str, limit: int = 20) -> List[Cliente]:
+        ids = [cliente_id for cliente_id, _ in SearchIndex.buscar_clientes(q, limit)]
+        clientes = [self.obter_cliente(cliente_id) for cliente_id in ids]
+        return [c for c in clientes if c is not None]
+
+    def listar_status(self) -> List[str]:
+        cur = StorageManager._get_conn().execute("SELECT DISTINCT status FROM propostas")
+        return sorted((row[0] for row in cur), key=str.lower)
+
+    def resumo_dashboard(self) -> Dict[str, object]:
+        # métricas mantidas por triggers em metricas_dashboard (migração 5)
+        resumo = self.agregados.resumo()
+        resumo["total_clientes"] = self.contar_clientes()
+        return resumo
+
+    # ---- versões para cache HTTP (migração 10) ---- #
+
+    def versao_proposta(self, proposta_id: int) -> Optional[Tuple[str, Optional[datetime]]]:
+        """(versões da proposta, do cliente e do template; última alteração em UTC).
+
+        Lido do banco, não da memória: leia antes de montar a resposta, para
+        que o conteúdo nunca seja mais antigo que a versão anunciada.
+        """
+        row = StorageManager._get_conn().execute(
+            """
+            SELECT p.versao, c.versao, t.versao,
+                   MAX(COALESCE(p.atualizado_em, ''), COALESCE(c.atualizado_em, ''),
+                       COALESCE(t.atualizado_em, ''))
+            FROM propostas p
+            JOIN clientes c ON c.id = p.cliente_id
+            LEFT JOIN templates t ON t.id = p.template_id
+            WHERE p.id = ?
+            """,
+            (proposta_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        alterada = datetime.fromisoformat(row[3]).replace(tzinfo=timezone.utc) if row[3] else None
+        return f"{row[0]}.{row[1]}.{row[2] or 0}", alterada
+
+    def versao_templates(self) -> str:
+        # soma das versões muda a cada edição; quantidade e maior id, a cada inclusão/remoção
+        row = StorageManager._get_conn().execute(
+            "SELECT COUNT(*), COALESCE(MAX(id), 0), COALESCE(SUM(versao), 0) FROM templates"
+        ).fetchone()
+        return ".".join(map(str, row))
+
+    def versao_dados(self) -> int:
+        """Muda a cada gravação em qualquer tabela, deste ou de outro processo."""
+        return self.alteracoes.ultima_sequencia()
+
+    def linhas_relatorio(self) -> Iterator[list]:
+        """Linhas da planilha de propostas direto do SQLite, sem carregar itens.
+
+        Mesmas colunas de ExcelReportGenerator._linha, com os totais gravados
+        pelos triggers em vez de calculados pelos itens.
+        """
+        cur = StorageManager._get_conn().execute(
+            """
+            SELECT p.id, p.titulo, c.nome, c.documento, c.contato, p.status,
+                   p.data_criacao, p.responsavel, p.validade, p.condicoes_pagamento,
+                   p.subtotal, p.total
+            FROM propostas p JOIN clientes c ON c.id = p.cliente_id
+            ORDER BY p.id
+            """
+        )
+        for row in cur:
+            data_criacao = StorageManager._parse_data_criacao(row[6])
+            validade = StorageManager._parse_validade(row[8])
+            subtotal, total = row[10] or 0.0, row[11] or 0.0
+            yield [
+                row[0],
+                row[1],
+                row[2],
+                row[3],
+                row[4],
+                row[5],
+                data_criacao.strftime("%d/%m/%Y %H:%M"),
+                row[7] or "",
+                validade.strftime("%d/%m/%Y") if validade else "",
+                row[9] or "",
+                float(subtotal),
+                float(subtotal - total),
+                float(total),
+            ]
+
+    def criar_proposta(self, cliente: Cliente, titulo: str = "", **campos) -> Proposta:
+        if self.gestor is not None:
+            proposta = self.gestor.criar_proposta(cliente, titulo, **campos)
+        else:
+            proposta = Proposta(cliente, titulo, **campos)
+        with self._escrita() as uow:
+            uow.salvar_proposta(proposta, itens=True)
+        self._registrar("proposta", proposta)
+        return proposta
+
+    def salvar_proposta(self, proposta: Proposta, itens: bool = False) -> None:
+        with self._escrita() as uow:
+            uow.salvar_proposta(proposta, itens=itens)
+        if self.gestor is not None:
+            self.gestor.reindexar_proposta(proposta)
+
+    def excluir_proposta(self, proposta_id: int) -> None:
+        if self.gestor is not None:
+            self.gestor.remover_proposta(proposta_id)
+        else:
+            self.cache.discard(("proposta", proposta_id))
+        with self._escrita() as uow:
+            uow.excluir_proposta(proposta_id)
+
+    def aplicar_em_lote(self, acao: str, ids: Iterable[int]) -> Dict[int, str]:
+        """Muda o status de várias propostas (`acao` em Proposta.STATUS_VALIDOS)
+        ou as exclui (`acao="excluir"`) numa única transação.
+
+        Devolve, na ordem dos ids, "ok", "inalterada" (já estava no status)
+        ou "nao_encontrada"; os índices do gestor são atualizados uma vez só.
+        Grava na hora, mesmo dentro de uma sessão: o resultado devolvido é o
+        que está no banco.
+        """
+        acao = acao.strip().lower()
+        if acao != "excluir" and acao not in Proposta.STATUS_VALIDOS:
+            raise ValueError(f"Ação inválida: {acao}")
+        ids = list(dict.fromkeys(ids))
+        if acao == "excluir":
+            return self._excluir_em_lote(ids)
+
+        propostas = {p.id: p for p in self.obter_propostas(ids)}
+        resultados: Dict[int, str] = {}
+        anteriores: Dict[int, str] = {}
+        for pid in ids:
+            proposta = propostas.get(pid)
+            if proposta is None:
+                resultados[pid] = "nao_encontrada"
+            elif proposta.status == acao:
+                resultados[pid] = "inalterada"
+            else:
+                anteriores[pid] = proposta.status
+                proposta.alterar_status(acao)
+                resultados[pid] = "ok"
+
+        alteradas = [propostas[pid] for pid in anteriores]
+        try:
+            with UnitOfWork() as uow:
+                for proposta in alteradas:
+                    uow.salvar_proposta(proposta)
+        except Exception:
+            # os objetos podem ser os mesmos que o gestor/cache servem
+            for proposta in alteradas:
+                proposta.status = anteriores[proposta.id]
+            raise
+        if self.gestor is not None and alteradas:
+            with self.gestor.lote():
+                for proposta in alteradas:
+                    self.gestor.reindexar_proposta(proposta)
+        return resultados
+
+    def _excluir_em_lote(self, ids: List[int]) -> Dict[int, str]:
+        conn = StorageManager._get_conn()
+        existentes = {row[0] for row in self._linhas(conn, "SELECT id FROM propostas WHERE id IN ({})", ids)}
+        with UnitOfWork() as uow:
+            for pid in existentes:
+                uow.excluir_proposta(pid)
+        if self.gestor is not None:
+            with self.gestor.lote():
+                for pid in existentes:
+                    if self.gestor.obter_proposta_por_id(pid) is not None:
+                        self.gestor.remover_proposta(pid)
+        else:
+            for pid in existentes:
+                self.cache.discard(("proposta", pid))
+        return {pid: "ok" if pid in existentes else "nao_encontrada" for pid in ids}
@@ -0,0 +1,100 @@
+import re
+from typing import List, Optional, Tuple
+
+from .storage import StorageManager
+
+# pesos do bm25 por coluna de propostas_fts: titulo, cliente_nome, documento, contato
+PESOS_PROPOSTAS = (10.0, 5.0, 2.0, 1.0)
+PESOS_CLIENTES = (10.0, 3.0, 1.0)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def montar_consulta_fts(texto: Optional[str]) -> Optional[str]:
+    """Converte o texto digitado em uma consulta FTS5 segura.
+
+    Cada palavra vira um termo entre aspas com busca por prefixo, e todos os
+    termos precisam aparecer ("joao sit" -> '"joao"* "sit"*').
+    """
+    if not texto:
+        return None
+    tokens = _TOKEN_RE.findall(texto)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class SearchIndex:
+    """Consultas sobre os índices FTS5 criados na migração 3."""
+
+    @staticmethod
+    def hits_propostas(texto: str) -> Tuple[str, list]:
+        """CTE `hits(proposta_id, rank)` com as propostas que casam com `texto`.
+
+        Casa título/dados do cliente (propostas_fts), descrição de itens
+        (itens_fts) e, para buscas numéricas, o próprio id. Menor rank = melhor.
+        """
+        consulta = montar_consulta_fts(texto)
+        pesos = ", ".join(str(p) for p in PESOS_PROPOSTAS)
+        partes = [
+            f"SELECT rowid AS proposta_id, bm25(propostas_fts, {pesos}) AS rank "
+            "FROM propostas_fts WHERE propostas_fts MATCH ?",
+            "SELECT CAST(proposta_id AS INTEGER), bm25(itens_fts) "
+            "FROM itens_fts WHERE itens_fts MATCH ?",
+        ]
+        params: list = [consulta, consulta]
+        if texto.strip().isdigit():
+            partes.append("SELECT id, -1e9 FROM propostas WHERE id = ?")
+            params.append(int(texto.strip()))
+
+        sql = (
+            "hits AS (SELECT proposta_id, MIN(rank) AS rank FROM ("
+            + " UNION ALL ".join(partes)
+            + ") GROUP BY proposta_id)"
+        )
+        return sql, params
+
+    @classmethod
+    def buscar_propostas(
+        cls, texto: str, status: Optional[str] = None, limit: int = 20, offset: int = 0
+    ) -> List[Tuple[int, float]]:
+        if not montar_consulta_fts(texto):
+            return []
+        cte, params = cls.hits_propostas(texto)
+        sql = f"WITH {cte} SELECT h.proposta_id, h.rank FROM hits h"
+        if status:
+            sql += " JOIN propostas p ON p.id = h.proposta_id WHERE p.status = ?"
+            params.append(status.lower())
+        sql += " ORDER BY h.rank, h.proposta_id LIMIT ? OFFSET ?"
+        params.extend([limit, offset])
+        return StorageManager._get_conn().execute(sql, params).fetchall()
+
+    @classmethod
+    def buscar_clientes(cls, texto: str, limit: int = 20) -> List[Tuple[int, float]]:
+        consulta = montar_consulta_fts(texto)
+        if not consulta:
+            return []
+        pesos = ", ".join(str(p) for p in PESOS_CLIENTES)
+        return StorageManager._get_conn().execute(
+            f"""
+            SELECT rowid, bm25(clientes_fts, {pesos}) AS rank
+            FROM clientes_fts
+            WHERE clientes_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (consulta, limit),
+        ).fetchall()
+
+    @classmethod
+    def reconstruir(cls) -> None:
+        """Recria o conteúdo dos índices a partir das tabelas (uso administrativo)."""
+        from .migrations import MIGRATIONS
+
+        backfills = [b for m in MIGRATIONS for b in m.backfills if b.nome.startswith("fts_")]
+        with StorageManager.transacao() as conn:
+            for tabela in ("propostas_fts", "clientes_fts", "itens_fts"):
+                conn.execute(f"DELETE FROM {tabela}")
+            for backfill in backfills:
+                max_id = conn.execute(f"SELECT MAX(id) FROM {backfill.tabela}").fetchone()[0] or 0
+                backfill.processar(conn, 0, max_id)
@@ -1,290 +1,363 @@
 import os
+import queue
 import sqlite3
-from datetime import datetime
-from typing import Dict
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
-from ..models import GestorPropostas, Cliente, Proposta, ItemProposta, TemplateProposta
+from ..models import GestorPropostas, Cliente, Proposta, ItemProposta, ItensColunares, TemplateProposta
+from .migrations import MigrationRunner
 
 BASE_DIR = os.path.dirname(__file__)
 ROOT_DIR = os.path.dirname(os.path.dirname(BASE_DIR))
 INSTANCE_DIR = os.path.join(ROOT_DIR, "instance")
 DEFAULT_DB_PATH = os.path.join(INSTANCE_DIR, "dealflow.db")
 
+# Perfis de PRAGMA aplicados a cada conexão aberta pelo pool.
+# cache_size negativo = KiB; mmap_size em bytes.
+PRAGMA_PROFILES: Dict[str, Dict[str, object]] = {
+    "safe": {
+        "synchronous": "FULL",
+        "cache_size": -2_000,
+        "mmap_size": 0,
+        "wal_autocheckpoint": 1000,
+    },
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -16_000,
+        "mmap_size": 64 * 1024 * 1024,
+        "wal_autocheckpoint": 1000,
+    },
+    "fast": {
+        "synchronous": "OFF",
+        "cache_size": -64_000,
+        "mmap_size": 256 * 1024 * 1024,
+        "wal_autocheckpoint": 4000,
+    },
+}
+DEFAULT_PROFILE = "balanced"
+BUSY_TIMEOUT_MS = 5000
+# linhas por fetchmany na carga inicial (e lotes em trânsito na carga paralela)
+LOTE_CARGA = 2000
+LOTES_EM_FILA = 8
+
+
+class ConnectionPool:
+    """Mantém uma conexão SQLite aberta por thread e por caminho de banco.
+
+    As conexões são descartadas (sem fechar) quando o processo é forkado,
+    já que um handle SQLite herdado do processo pai não pode ser reutilizado.
+    """
+
+    def __init__(self, profile: str = DEFAULT_PROFILE):
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._pid = os.getpid()
+        self._local = threading.local()
+        self._all: list = []
+
+    def _check_fork(self) -> None:
+        if os.getpid() != self._pid:
+            with self._lock:
+                if os.getpid() != self._pid:
+                    self._reset()
+
+    def _configure(self, conn: sqlite3.Connection) -> None:
+        pragmas = PRAGMA_PROFILES.get(self.profile, PRAGMA_PROFILES[DEFAULT_PROFILE])
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute(f"PRAGMA synchronous = {pragmas['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = {int(pragmas['cache_size'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(pragmas['mmap_size'])}")
+        conn.execute(f"PRAGMA wal_autocheckpoint = {int(pragmas['wal_autocheckpoint'])}")
+        conn.execute("PRAGMA foreign_keys = ON")
+
+    def get(self, path: str) -> sqlite3.Connection:
+        self._check_fork()
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+
+        conn = conns.get(path)
+        if conn is None:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            # check_same_thread=False só para permitir close_all() a partir
+            # de outra thread; o uso normal continua restrito à thread dona.
+            conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+            self._configure(conn)
+            conns[path] = conn
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def close_all(self) -> None:
+        self._check_fork()
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+
+class CheckpointManager:
+    """Executa checkpoints do WAL sob demanda ou periodicamente em background."""
+
+    MODES = ("PASSIVE", "FULL", "RESTART", "TRUNCATE")
+
+    def __init__(self, storage: "type[StorageManager]"):
+        self._storage = storage
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def checkpoint(self, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+        """Retorna (busy, páginas no WAL, páginas copiadas para o banco)."""
+        mode = mode.upper()
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de checkpoint inválido: {mode}")
+        conn = self._storage._get_conn()
+        row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+        return tuple(row) if row else (0, 0, 0)
+
+    def start(self, interval: float = 60.0) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(interval,), name="dealflow-wal-checkpoint", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.checkpoint("PASSIVE")
+            except sqlite3.Error:
+                pass
+
 
 class StorageManager:
     DB_PATH = os.environ.get("DEALFLOW_DB_PATH", DEFAULT_DB_PATH)
+    pool = ConnectionPool(os.environ.get("DEALFLOW_DB_PROFILE", DEFAULT_PROFILE))
 
     @classmethod
     def _ensure_db_dir(cls) -> None:
         os.makedirs(os.path.dirname(cls.DB_PATH), exist_ok=True)
 
     @classmethod
-    def _get_conn(cls):
-        cls._ensure_db_dir()
-        conn = sqlite3.connect(cls.DB_PATH)
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
+    def _get_conn(cls) -> sqlite3.Connection:
+        # conexão persistente da thread atual; `with conn:` faz commit/rollback
+        return cls.pool.get(cls.DB_PATH)
 
     @classmethod
-    def init_db(cls):
-        with cls._get_conn() as conn:
-            cur = conn.cursor()
+    def close_all(cls) -> None:
+        cls.pool.close_all()
 
-            # Clientes
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS clientes (
-                    id INTEGER PRIMARY KEY,
-                    nome TEXT NOT NULL,
-                    documento TEXT,
-                    contato TEXT
-                )
-                """
-            )
+    _tx_local = threading.local()
 
-            # Propostas
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS propostas (
-                    id INTEGER PRIMARY KEY,
-                    cliente_id INTEGER NOT NULL,
-                    titulo TEXT NOT NULL,
-                    data_criacao TEXT NOT NULL,
-                    status TEXT NOT NULL,
-                    validade TEXT,
-                    responsavel TEXT,
-                    condicoes_pagamento TEXT,
-                    template_id INTEGER,
-                    tipo_desconto TEXT,
-                    desconto_percentual REAL,
-                    desconto_valor REAL,
-                    FOREIGN KEY (cliente_id) REFERENCES clientes(id)
-                )
-                """
-            )
+    @staticmethod
+    def _begin_immediate(conn: sqlite3.Connection) -> None:
+        # reserva o lock de escrita já no início da transação
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
 
-            # Itens
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS itens (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    proposta_id INTEGER NOT NULL,
-                    descricao TEXT NOT NULL,
-                    quantidade INTEGER NOT NULL,
-                    valor_unitario REAL NOT NULL,
-                    FOREIGN KEY (proposta_id) REFERENCES propostas(id)
-                )
-                """
-            )
-
-            # Templates
-            cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS templates (
-                    id INTEGER PRIMARY KEY,
-                    nome TEXT NOT NULL,
-                    titulo_padrao TEXT,
-                    responsavel_padrao TEXT,
-                    condicoes_pagamento_padrao TEXT,
-                    intro_texto TEXT,
-                    termos TEXT,
-                    rodape TEXT,
-                    cor_primaria TEXT,
-                    usar_logo INTEGER,
-                    logo_path TEXT
-                )
-                """
-            )
+    @classmethod
+    @contextmanager
+    def transacao(cls) -> Iterator[sqlite3.Connection]:
+        """Transação de escrita reentrante na conexão da thread atual.
+
+        Blocos aninhados reaproveitam a transação externa; o commit (ou
+        rollback, em caso de exceção) só acontece ao sair do bloco mais
+        externo.
+        """
+        conn = cls._get_conn()
+        niveis = cls._tx_local.__dict__.setdefault("niveis", {})
+        nivel = niveis.get(cls.DB_PATH, 0)
+
+        niveis[cls.DB_PATH] = nivel + 1
+        try:
+            if nivel:
+                yield conn
+            else:
+                with conn:
+                    cls._begin_immediate(conn)
+                    yield conn
+        finally:
+            niveis[cls.DB_PATH] = nivel
 
-            if not cls._has_column(cur, "propostas", "template_id"):
-                cur.execute("ALTER TABLE propostas ADD COLUMN template_id INTEGER")
+    @classmethod
+    def checkpoint(cls, mode: str = "PASSIVE") -> Tuple[int, int, int]:
+        return cls.checkpoints.checkpoint(mode)
 
     @classmethod
-    def _has_column(cls, cur: sqlite3.Cursor, table: str, column: str) -> bool:
-        cur.execute(f"PRAGMA table_info({table})")
-        return any(row[1] == column for row in cur.fetchall())
+    def init_db(cls, backfills: bool = True):
+        """Aplica as migrações pendentes (ver services/migrations.py)."""
+        runner = MigrationRunner(cls)
+        runner.migrar()
+        if backfills:
+            runner.executar_backfills()
+
+    # =========================================================
+    #   CLIENTES
+    # =========================================================
+    UPSERT_CLIENTE_SQL = """
+        INSERT INTO clientes (id, nome, documento, contato)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            nome = excluded.nome,
+            documento = excluded.documento,
+            contato = excluded.contato
+    """
+
+    @staticmethod
+    def _cliente_params(cliente: Cliente) -> tuple:
+        return (cliente.id, cliente.nome, cliente.documento, cliente.contato)
 
     @classmethod
     def salvar_ou_atualizar_cliente(cls, cliente: Cliente):
-        with cls._get_conn() as conn:
-            cur = conn.cursor()
-
-            cur.execute("SELECT 1 FROM clientes WHERE id = ?", (cliente.id,))
-            existe = cur.fetchone() is not None
+        with cls.transacao() as conn:
+            conn.execute(cls.UPSERT_CLIENTE_SQL, cls._cliente_params(cliente))
 
-            if not existe:
-                cur.execute(
-                    """
-                    INSERT INTO clientes (id, nome, documento, contato)
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (cliente.id, cliente.nome, cliente.documento, cliente.contato),
-                )
-            else:
-                cur.execute(
-                    """
-                    UPDATE clientes
-                       SET nome = ?,
-                           documento = ?,
-                           contato = ?
-                     WHERE id = ?
-                    """,
-                    (cliente.nome, cliente.documento, cliente.contato, cliente.id),
-                )
+    @classmethod
+    def salvar_muitos_clientes(cls, clientes: Iterable[Cliente]):
+        with cls.transacao() as conn:
+            conn.executemany(cls.UPSERT_CLIENTE_SQL, map(cls._cliente_params, clientes))
 
     @classmethod
     def deletar_cliente(cls, cliente_id: int):
-        with cls._get_conn() as conn:
+        with cls.transacao() as conn:
             cur = conn.cursor()
             cur.execute("DELETE FROM clientes WHERE id = ?", (cliente_id,))
 
+    # =========================================================
+    #   PROPOSTAS
+    # =========================================================
+    UPSERT_PROPOSTA_SQL = """
+        INSERT INTO propostas (
+            id, cliente_id, titulo, data_criacao, status,
+            validade, responsavel, condicoes_pagamento,
+            template_id, tipo_desconto, desconto_percentual, desconto_valor
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            cliente_id = excluded.cliente_id,
+            titulo = excluded.titulo,
+            data_criacao = excluded.data_criacao,
+            status = excluded.status,
+            validade = excluded.validade,
+            responsavel = excluded.responsavel,
+            condicoes_pagamento = excluded.condicoes_pagamento,
+            template_id = excluded.template_id,
+            tipo_desconto = excluded.tipo_desconto,
+            desconto_percentual = excluded.desconto_percentual,
+            desconto_valor = excluded.desconto_valor
+    """
+
+    @staticmethod
+    def _proposta_params(proposta: Proposta) -> tuple:
+        return (
+            proposta.id,
+            proposta.cliente.id,
+            proposta.titulo,
+            proposta.data_criacao.strftime("%Y-%m-%d %H:%M:%S"),
+            proposta.status,
+            proposta.validade.strftime("%Y-%m-%d") if proposta.validade else None,
+            proposta.responsavel,
+            proposta.condicoes_pagamento,
+            proposta.template_id,
+            proposta.tipo_desconto,
+            proposta.desconto_percentual,
+            proposta.desconto_valor,
+        )
+
     @classmethod
     def salvar_ou_atualizar_proposta(cls, proposta: Proposta):
-        with cls._get_conn() as conn:
-            cur = conn.cursor()
-
-            cur.execute("SELECT 1 FROM propostas WHERE id = ?", (proposta.id,))
-            existe = cur.fetchone() is not None
+        with cls.transacao() as conn:
+            conn.execute(cls.UPSERT_PROPOSTA_SQL, cls._proposta_params(proposta))
 
-            data_criacao_str = proposta.data_criacao.strftime("%Y-%m-%d %H:%M:%S")
-            validade_str = proposta.validade.strftime("%Y-%m-%d") if proposta.validade else None
-
-            if not existe:
-                cur.execute(
-                    """
-                    INSERT INTO propostas (
-                        id, cliente_id, titulo, data_criacao, status,
-                        validade, responsavel, condicoes_pagamento,
-                        template_id, tipo_desconto, desconto_percentual, desconto_valor
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        proposta.id,
-                        proposta.cliente.id,
-                        proposta.titulo,
-                        data_criacao_str,
-                        proposta.status,
-                        validade_str,
-                        proposta.responsavel,
-                        proposta.condicoes_pagamento,
-                        proposta.template_id,
-                        proposta.tipo_desconto,
-                        proposta.desconto_percentual,
-                        proposta.desconto_valor,
-                    ),
-                )
-            else:
-                cur.execute(
-                    """
-                    UPDATE propostas
-                       SET cliente_id = ?,
-                           titulo = ?,
-                           data_criacao = ?,
-                           status = ?,
-                           validade = ?,
-                           responsavel = ?,
-                           condicoes_pagamento = ?,
-                           template_id = ?,
-                           tipo_desconto = ?,
-                           desconto_percentual = ?,
-                           desconto_valor = ?
-                     WHERE id = ?
-                    """,
-                    (
-                        proposta.cliente.id,
-                        proposta.titulo,
-                        data_criacao_str,
-                        proposta.status,
-                        validade_str,
-                        proposta.responsavel,
-                        proposta.condicoes_pagamento,
-                        proposta.template_id,
-                        proposta.tipo_desconto,
-                        proposta.desconto_percentual,
-                        proposta.desconto_valor,
-                        proposta.id,
-                    ),
-                )
+    @classmethod
+    def salvar_muitas_propostas(cls, propostas: Iterable[Proposta]):
+        with cls.transacao() as conn:
+            conn.executemany(cls.UPSERT_PROPOSTA_SQL, map(cls._proposta_params, propostas))
 
     @classmethod
     def deletar_proposta(cls, proposta_id: int):
-        with cls._get_conn() as conn:
+        with cls.transacao() as conn:
             cur = conn.cursor()
             cur.execute("DELETE FROM itens WHERE proposta_id = ?", (proposta_id,))
             cur.execute("DELETE FROM propostas WHERE id = ?", (proposta_id,))
 
+    @classmethod
+    def deletar_muitas_propostas(cls, proposta_ids: Iterable[int]):
+        ids = [(proposta_id,) for proposta_id in proposta_ids]
+        with cls.transacao() as conn:
+            conn.executemany("DELETE FROM itens WHERE proposta_id = ?", ids)
+            conn.executemany("DELETE FROM propostas WHERE id = ?", ids)
+
     # =========================================================
     #   TEMPLATES
     # =========================================================
+    UPSERT_TEMPLATE_SQL = """
+        INSERT INTO templates (
+            id, nome, titulo_padrao, responsavel_padrao,
+            condicoes_pagamento_padrao, intro_texto, termos,
+            rodape, cor_primaria, usar_logo, logo_path
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            nome = excluded.nome,
+            titulo_padrao = excluded.titulo_padrao,
+            responsavel_padrao = excluded.responsavel_padrao,
+            condicoes_pagamento_padrao = excluded.condicoes_pagamento_padrao,
+            intro_texto = excluded.intro_texto,
+            termos = excluded.termos,
+            rodape = excluded.rodape,
+            cor_primaria = excluded.cor_primaria,
+            usar_logo = excluded.usar_logo,
+            logo_path = excluded.logo_path
+    """
+
+    @staticmethod
+    def _template_params(template: TemplateProposta) -> tuple:
+        return (
+            template.id,
+            template.nome,
+            template.titulo_padrao,
+            template.responsavel_padrao,
+            template.condicoes_pagamento_padrao,
+            template.intro_texto,
+            template.termos,
+            template.rodape,
+            template.cor_primaria,
+            1 if template.usar_logo else 0,
+            template.logo_path,
+        )
+
     @classmethod
     def salvar_ou_atualizar_template(cls, template: TemplateProposta):
-        with cls._get_conn() as conn:
-            cur = conn.cursor()
-
-            cur.execute("SELECT 1 FROM templates WHERE id = ?", (template.id,))
-            existe = cur.fetchone() is not None
-
-            usar_logo = 1 if template.usar_logo else 0
+        with cls.transacao() as conn:
+            conn.execute(cls.UPSERT_TEMPLATE_SQL, cls._template_params(template))
 
-            if not existe:
-                cur.execute(
-                    """
-                    INSERT INTO templates (
-                        id, nome, titulo_padrao, responsavel_padrao,
-                        condicoes_pagamento_padrao, intro_texto, termos,
-                        rodape, cor_primaria, usar_logo, logo_path
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        template.id,
-                        template.nome,
-                        template.titulo_padrao,
-                        template.responsavel_padrao,
-                        template.condicoes_pagamento_padrao,
-                        template.intro_texto,
-                        template.termos,
-                        template.rodape,
-                        template.cor_primaria,
-                        usar_logo,
-                        template.logo_path,
-                    ),
-                )
-            else:
-                cur.execute(
-                    """
-                    UPDATE templates
-                       SET nome = ?,
-                           titulo_padrao = ?,
-                           responsavel_padrao = ?,
-                           condicoes_pagamento_padrao = ?,
-                           intro_texto = ?,
-                           termos = ?,
-                           rodape = ?,
-                           cor_primaria = ?,
-                           usar_logo = ?,
-                           logo_path = ?
-                     WHERE id = ?
-                    """,
-                    (
-                        template.nome,
-                        template.titulo_padrao,
-                        template.responsavel_padrao,
-                        template.condicoes_pagamento_padrao,
-                        template.intro_texto,
-                        template.termos,
-                        template.rodape,
-                        template.cor_primaria,
-                        usar_logo,
-                        template.logo_path,
-                        template.id,
-                    ),
-                )
+    @classmethod
+    def salvar_muitos_templates(cls, templates: Iterable[TemplateProposta]):
+        with cls.transacao() as conn:
+            conn.executemany(cls.UPSERT_TEMPLATE_SQL, map(cls._template_params, templates))
 
     @classmethod
     def deletar_template(cls, template_id: int):
-        with cls._get_conn() as conn:
+        with cls.transacao() as conn:
             cur = conn.cursor()
             cur.execute("DELETE FROM templates WHERE id = ?", (template_id,))
 
@@ -293,184 +366,363 @@ class StorageManager:
     # =========================================================
     @classmethod
     def sincronizar_itens_proposta(cls, proposta: Proposta):
-        with cls._get_conn() as conn:
-            cur = conn.cursor()
-
-            cur.execute("DELETE FROM itens WHERE proposta_id = ?", (proposta.id,))
+        """Grava só a diferença entre `proposta.itens` e as linhas salvas.
+
+        Itens sem id são inseridos (recebendo ids reservados em bloco),
+        itens alterados são atualizados e linhas ausentes da lista são
+        removidas. Tudo em uma única transação.
+        """
+        with cls.transacao() as conn:
+            salvos = {
+                row[0]: row[1:]
+                for row in conn.execute(
+                    "SELECT id, descricao, quantidade, valor_unitario FROM itens WHERE proposta_id = ?",
+                    (proposta.id,),
+                )
+            }
 
+            novos = []
+            alterados = []
+            presentes = set()
             for item in proposta.itens:
-                cur.execute(
+                valores = (item.descricao, item.quantidade, item.valor_unitario)
+                if item.id is None or item.id not in salvos:
+                    novos.append(item)
+                else:
+                    presentes.add(item.id)
+                    if salvos[item.id] != valores:
+                        alterados.append(valores + (item.id,))
+
+            removidos = [(item_id,) for item_id in salvos if item_id not in presentes]
+            if removidos:
+                conn.executemany("DELETE FROM itens WHERE id = ?", removidos)
+
+            if alterados:
+                conn.executemany(
                     """
-                    INSERT INTO itens (proposta_id, descricao, quantidade, valor_unitario)
-                    VALUES (?, ?, ?, ?)
+                    UPDATE itens
+                       SET descricao = ?,
+                           quantidade = ?,
+                           valor_unitario = ?
+                     WHERE id = ?
+                    """,
+                    alterados,
+                )
+
+            if novos:
+                # com o lock de escrita em mãos, reservamos um bloco de ids
+                # para usar executemany e ainda devolver o id a cada item
+                ultimo = conn.execute("SELECT MAX(id) FROM itens").fetchone()[0] or 0
+                seq = conn.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'itens'"
+                ).fetchone()
+                ultimo = max(ultimo, seq[0] if seq else 0)
+                for offset, item in enumerate(novos, start=1):
+                    item.id = ultimo + offset
+                conn.executemany(
+                    """
+                    INSERT INTO itens (id, proposta_id, descricao, quantidade, valor_unitario)
+                    VALUES (?, ?, ?, ?, ?)
                     """,
-                    (proposta.id, item.descricao, item.quantidade, item.valor_unitario),
+                    [
+                        (item.id, proposta.id, item.descricao, item.quantidade, item.valor_unitario)
+                        for item in novos
+                    ],
                 )
 
     @classmethod
-    def carregar_tudo(cls, gestor: GestorPropostas):
-        gestor.clientes.clear()
-        gestor.propostas.clear()
-        gestor.templates.clear()
+    def desvincular_template(cls, template_id: int):
+        with cls.transacao() as conn:
+            conn.execute(
+                "UPDATE propostas SET template_id = NULL WHERE template_id = ?",
+                (template_id,),
+            )
+
+    # =========================================================
+    #   MAPEAMENTO LINHA -> OBJETO
+    # =========================================================
+    CLIENTE_COLS = "id, nome, documento, contato"
+    TEMPLATE_COLS = (
+        "id, nome, titulo_padrao, responsavel_padrao, condicoes_pagamento_padrao, "
+        "intro_texto, termos, rodape, cor_primaria, usar_logo, logo_path"
+    )
+    PROPOSTA_COLS = (
+        "id, cliente_id, titulo, data_criacao, status, validade, responsavel, "
+        "condicoes_pagamento, template_id, tipo_desconto, desconto_percentual, desconto_valor"
+    )
+
+    @staticmethod
+    def _parse_data_criacao(valor: Optional[str]) -> datetime:
+        # fromisoformat é implementado em C; strptime custava metade da carga
+        try:
+            return datetime.fromisoformat(valor)
+        except (TypeError, ValueError):
+            return datetime.now()
+
+    @staticmethod
+    def _parse_validade(valor: Optional[str]):
+        if not valor:
+            return None
+        try:
+            return date.fromisoformat(valor)
+        except (TypeError, ValueError):
+            return None
+
+    @classmethod
+    def cliente_from_row(cls, row) -> Cliente:
+        cli_id, nome, documento, contato = row
+        return Cliente(nome, documento or "", contato or "", id=cli_id)
 
-        with cls._get_conn() as conn:
-            cur = conn.cursor()
+    @classmethod
+    def template_from_row(cls, row) -> TemplateProposta:
+        (
+            t_id,
+            nome,
+            titulo_padrao,
+            responsavel_padrao,
+            condicoes_pagamento_padrao,
+            intro_texto,
+            termos,
+            rodape,
+            cor_primaria,
+            usar_logo,
+            logo_path,
+        ) = row
+
+        return TemplateProposta(
+            nome=nome,
+            titulo_padrao=titulo_padrao or "",
+            responsavel_padrao=responsavel_padrao or "",
+            condicoes_pagamento_padrao=condicoes_pagamento_padrao or "",
+            intro_texto=intro_texto or "",
+            termos=termos or "",
+            rodape=rodape or "",
+            cor_primaria=cor_primaria or "#1f4e79",
+            usar_logo=bool(usar_logo),
+            logo_path=logo_path or "static/img/dealflow_logo.png",
+            id=t_id,
+        )
+
+    @classmethod
+    def proposta_from_row(cls, row, cliente: Cliente) -> Proposta:
+        (
+            p_id,
+            _cliente_id,
+            titulo,
+            data_criacao_str,
+            status,
+            validade_str,
+            responsavel,
+            condicoes_pagamento,
+            template_id,
+            tipo_desconto,
+            desconto_percentual,
+            desconto_valor,
+        ) = row
+
+        prop = Proposta(
+            cliente=cliente,
+            titulo=titulo,
+            validade=None,
+            responsavel=responsavel or "",
+            condicoes_pagamento=condicoes_pagamento or "",
+            template_id=template_id,
+            id=p_id,
+        )
+        prop.data_criacao = cls._parse_data_criacao(data_criacao_str)
+        prop.status = status
+        prop.validade = cls._parse_validade(validade_str)
+        prop.tipo_desconto = tipo_desconto
+        prop.desconto_percentual = desconto_percentual or 0.0
+        prop.desconto_valor = desconto_valor or 0.0
+        return prop
 
-            # ---- Clientes
-            cur.execute("SELECT id, nome, documento, contato FROM clientes ORDER BY id")
-            rows_clientes = cur.fetchall()
-
-            mapa_clientes: Dict[int, Cliente] = {}
-            max_cliente_id = 0
-
-            for row in rows_clientes:
-                cli_id, nome, documento, contato = row
-                cliente = Cliente(nome, documento or "", contato or "")
-                cliente.id = cli_id
-                mapa_clientes[cli_id] = cliente
-                gestor.clientes.append(cliente)
-                max_cliente_id = max(max_cliente_id, cli_id)
-
-            if max_cliente_id > 0:
-                Cliente._contador_id = max_cliente_id + 1
-
-            # ---- Templates
-            cur.execute(
-                """
-                SELECT
-                    id, nome, titulo_padrao, responsavel_padrao,
-                    condicoes_pagamento_padrao, intro_texto, termos,
-                    rodape, cor_primaria, usar_logo, logo_path
-                FROM templates
+    @classmethod
+    def carregar_itens(
+        cls, conn: sqlite3.Connection, propostas: Dict[int, Proposta], compacto: bool = False
+    ) -> None:
+        """Preenche `itens` das propostas informadas com uma consulta por lote.
+
+        Com `compacto`, os itens ficam em ItensColunares (arrays) em vez de um
+        ItemProposta por linha.
+        """
+        colunas: Dict[int, ItensColunares] = {}
+        ids = list(propostas)
+        # limite de variáveis do SQLite (999 em versões antigas)
+        for inicio in range(0, len(ids), 900):
+            lote = ids[inicio:inicio + 900]
+            marcadores = ", ".join("?" for _ in lote)
+            cur = conn.execute(
+                f"""
+                SELECT id, proposta_id, descricao, quantidade, valor_unitario
+                FROM itens
+                WHERE proposta_id IN ({marcadores})
                 ORDER BY id
-                """
+                """,
+                lote,
             )
-            rows_templates = cur.fetchall()
-
-            max_template_id = 0
-            for row in rows_templates:
-                (
-                    t_id,
-                    nome,
-                    titulo_padrao,
-                    responsavel_padrao,
-                    condicoes_pagamento_padrao,
-                    intro_texto,
-                    termos,
-                    rodape,
-                    cor_primaria,
-                    usar_logo,
-                    logo_path,
-                ) = row
-
-                template = TemplateProposta(
-                    nome=nome,
-                    titulo_padrao=titulo_padrao or "",
-                    responsavel_padrao=responsavel_padrao or "",
-                    condicoes_pagamento_padrao=condicoes_pagamento_padrao or "",
-                    intro_texto=intro_texto or "",
-                    termos=termos or "",
-                    rodape=rodape or "",
-                    cor_primaria=cor_primaria or "#1f4e79",
-                    usar_logo=bool(usar_logo),
-                    logo_path=logo_path or "static/img/dealflow_logo.png",
-                )
-                template.id = t_id
-                gestor.templates.append(template)
-                max_template_id = max(max_template_id, t_id)
-
-            if max_template_id > 0:
-                TemplateProposta._contador_id = max_template_id + 1
-
-            cur.execute(
-                """
-                SELECT
-                    id, cliente_id, titulo, data_criacao, status,
-                    validade, responsavel, condicoes_pagamento, template_id,
-                    tipo_desconto, desconto_percentual, desconto_valor
-                FROM propostas
-                ORDER BY id
-                """
+            for row in cur:
+                cls._anexar_item(propostas[row[1]], row, colunas if compacto else None)
+
+    @staticmethod
+    def _anexar_item(proposta: Proposta, row, colunas: Optional[Dict[int, ItensColunares]]) -> None:
+        """row = (id, proposta_id, descricao, quantidade, valor_unitario)."""
+        item_id, _proposta_id, descricao, quantidade, valor_unitario = row
+        if colunas is None:
+            proposta.itens.append(
+                ItemProposta(descricao, int(quantidade), float(valor_unitario), id=item_id)
             )
-            rows_propostas = cur.fetchall()
-
-            mapa_propostas: Dict[int, Proposta] = {}
-            max_proposta_id = 0
-
-            for row in rows_propostas:
-                (
-                    p_id,
-                    cliente_id,
-                    titulo,
-                    data_criacao_str,
-                    status,
-                    validade_str,
-                    responsavel,
-                    condicoes_pagamento,
-                    template_id,
-                    tipo_desconto,
-                    desconto_percentual,
-                    desconto_valor,
-                ) = row
-
-                cliente = mapa_clientes.get(cliente_id)
-                if not cliente:
-                    continue
+            return
+        destino = colunas.get(proposta.id)
+        if destino is None:
+            destino = colunas[proposta.id] = ItensColunares()
+            proposta.usar_itens_colunares(destino)
+        destino.adicionar(descricao, int(quantidade), float(valor_unitario), id=item_id)
 
-                prop = Proposta(
-                    cliente=cliente,
-                    titulo=titulo,
-                    validade=None,
-                    responsavel=responsavel or "",
-                    condicoes_pagamento=condicoes_pagamento or "",
-                    template_id=template_id,
-                )
+    @classmethod
+    def sincronizar_contadores(cls) -> None:
+        """Garante que os contadores de id dos modelos fiquem acima do maior id salvo."""
+        with cls._get_conn() as conn:
+            for modelo, tabela in (
+                (Cliente, "clientes"),
+                (Proposta, "propostas"),
+                (TemplateProposta, "templates"),
+            ):
+                max_id = conn.execute(f"SELECT MAX(id) FROM {tabela}").fetchone()[0] or 0
+                modelo._contador_id = max(modelo._contador_id, max_id + 1)
+
+    ITENS_CARGA_SQL = "SELECT id, proposta_id, descricao, quantidade, valor_unitario FROM itens ORDER BY id"
+
+    @staticmethod
+    def _em_lotes(conn: sqlite3.Connection, sql: str) -> Iterator[tuple]:
+        # fetchmany em vez de fetchall: só um lote de tuplas vive por vez
+        cur = conn.execute(sql)
+        while True:
+            linhas = cur.fetchmany(LOTE_CARGA)
+            if not linhas:
+                return
+            yield from linhas
 
-                prop.id = p_id
+    @classmethod
+    @contextmanager
+    def _fluxos_carga(
+        cls, conn: sqlite3.Connection, consultas: List[str], paralelo: bool
+    ) -> Iterator[List[Iterator[tuple]]]:
+        """Um iterador de linhas por consulta.
+
+        Com `paralelo`, cada consulta é lida numa thread com conexão própria,
+        somente leitura. Os lotes passam por filas limitadas (LOTES_EM_FILA),
+        então as tabelas seguintes vão sendo lidas enquanto a anterior vira
+        objetos, sem acumular uma tabela inteira em memória.
+        """
+        if not paralelo:
+            yield [cls._em_lotes(conn, sql) for sql in consultas]
+            return
+
+        parar = threading.Event()
+
+        def colocar(fila: "queue.Queue", valor) -> None:
+            # a carga pode ser abandonada no meio (exceção); aí ninguém mais lê a fila
+            while not parar.is_set():
                 try:
-                    prop.data_criacao = datetime.strptime(
-                        data_criacao_str, "%Y-%m-%d %H:%M:%S"
-                    )
-                except Exception:
-                    prop.data_criacao = datetime.now()
-
-                prop.status = status
-                if validade_str:
-                    try:
-                        prop.validade = datetime.strptime(
-                            validade_str, "%Y-%m-%d"
-                        ).date()
-                    except Exception:
-                        prop.validade = None
-
-                prop.tipo_desconto = tipo_desconto
-                prop.desconto_percentual = desconto_percentual or 0.0
-                prop.desconto_valor = desconto_valor or 0.0
-
-                gestor.propostas.append(prop)
-                mapa_propostas[p_id] = prop
-                max_proposta_id = max(max_proposta_id, p_id)
-
-            if max_proposta_id > 0:
-                Proposta._contador_id = max_proposta_id + 1
-
-            cur.execute(
-                """
-                SELECT proposta_id, descricao, quantidade, valor_unitario
-                FROM itens
-                ORDER BY id
-                """
-            )
-            rows_itens = cur.fetchall()
-
-            for row in rows_itens:
-                proposta_id, descricao, quantidade, valor_unitario = row
-                prop = mapa_propostas.get(proposta_id)
-                if not prop:
+                    fila.put(valor, timeout=0.1)
+                    return
+                except queue.Full:
                     continue
-                item = ItemProposta(
-                    descricao=descricao,
-                    quantidade=int(quantidade),
-                    valor_unitario=float(valor_unitario),
+
+        def produzir(sql: str, fila: "queue.Queue") -> None:
+            try:
+                leitura = sqlite3.connect(
+                    f"file:{cls.DB_PATH}?mode=ro", uri=True, timeout=BUSY_TIMEOUT_MS / 1000
                 )
-                prop.itens.append(item)
+                try:
+                    cur = leitura.execute(sql)
+                    while not parar.is_set():
+                        linhas = cur.fetchmany(LOTE_CARGA)
+                        colocar(fila, linhas)
+                        if not linhas:
+                            return
+                finally:
+                    leitura.close()
+            except BaseException as exc:
+                colocar(fila, exc)
+
+        def consumir(fila: "queue.Queue") -> Iterator[tuple]:
+            while True:
+                linhas = fila.get()
+                if isinstance(linhas, BaseException):
+                    raise linhas
+                if not linhas:
+                    return
+                yield from linhas
+
+        fluxos = []
+        for sql in consultas:
+            fila: "queue.Queue" = queue.Queue(maxsize=LOTES_EM_FILA)
+            threading.Thread(
+                target=produzir, args=(sql, fila), name="dealflow-carga", daemon=True
+            ).start()
+            fluxos.append(consumir(fila))
+        try:
+            yield fluxos
+        finally:
+            parar.set()
+
+    @classmethod
+    def carregar_tudo(cls, gestor: GestorPropostas, compacto: bool = False, paralelo: bool = False):
+        """Recarrega o gestor com todas as linhas do banco.
+
+        As linhas são lidas em lotes (fetchmany) e viram objetos à medida que
+        chegam. Com `paralelo`, cada tabela é lida por uma conexão própria em
+        outra thread. As leituras então não compartilham o mesmo snapshot:
+        uma proposta gravada entre duas delas pode ficar de fora (cliente
+        ainda não lido), mas entra pelo log de alterações, que o repositório
+        posiciona antes da carga.
+        """
+        consultas = [
+            f"SELECT {cls.CLIENTE_COLS} FROM clientes ORDER BY id",
+            f"SELECT {cls.TEMPLATE_COLS} FROM templates ORDER BY id",
+            f"SELECT {cls.PROPOSTA_COLS} FROM propostas ORDER BY id",
+            cls.ITENS_CARGA_SQL,
+        ]
+
+        # os leitores continuam vendo a versão anterior até o fim da carga
+        with gestor.lote():
+            gestor.limpar()
+
+            with cls._get_conn() as conn, cls._fluxos_carga(conn, consultas, paralelo) as fluxos:
+                clientes, templates, propostas, itens = fluxos
+
+                # ---- Clientes
+                mapa_clientes: Dict[int, Cliente] = {}
+                for row in clientes:
+                    cliente = cls.cliente_from_row(row)
+                    mapa_clientes[cliente.id] = cliente
+                gestor.registrar_clientes(mapa_clientes.values())
+
+                # ---- Templates
+                for row in templates:
+                    gestor.registrar_template(cls.template_from_row(row))
+
+                # ---- Propostas
+                mapa_propostas: Dict[int, Proposta] = {}
+                for row in propostas:
+                    cliente = mapa_clientes.get(row[1])
+                    if not cliente:
+                        continue
+                    prop = cls.proposta_from_row(row, cliente)
+                    mapa_propostas[prop.id] = prop
+                gestor.registrar_propostas(mapa_propostas.values())
+
+                # ---- Itens
+                colunas: Optional[Dict[int, ItensColunares]] = {} if compacto else None
+                for row in itens:
+                    prop = mapa_propostas.get(row[1])
+                    if not prop:
+                        continue
+                    cls._anexar_item(prop, row, colunas)
+
+        cls.sincronizar_contadores()
+
+
+StorageManager.checkpoints = CheckpointManager(StorageManager)
@@ -0,0 +1,108 @@
+from typing import Dict, Set
+
+from ..models import Cliente, Proposta, TemplateProposta
+from .storage import StorageManager
+
+
+class UnitOfWork:
+    """Acumula as alterações de uma requisição e grava tudo em uma transação.
+
+    Uso:
+        with UnitOfWork() as uow:
+            uow.salvar_proposta(proposta, itens=True)
+            uow.excluir_template(3)
+        # commit ao sair do bloco; exceção descarta as alterações pendentes
+    """
+
+    def __init__(self):
+        self._clientes: Dict[int, Cliente] = {}
+        self._templates: Dict[int, TemplateProposta] = {}
+        self._propostas: Dict[int, Proposta] = {}
+        self._itens: Dict[int, Proposta] = {}
+        self._propostas_removidas: Set[int] = set()
+        self._templates_removidos: Set[int] = set()
+
+    def __enter__(self) -> "UnitOfWork":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    @property
+    def pendente(self) -> bool:
+        return any(
+            (
+                self._clientes,
+                self._templates,
+                self._propostas,
+                self._itens,
+                self._propostas_removidas,
+                self._templates_removidos,
+            )
+        )
+
+    def alterados(self) -> Dict[str, Set[int]]:
+        """Ids pendentes por tabela, no formato do log de alterações."""
+        return {
+            "clientes": set(self._clientes),
+            "templates": set(self._templates) | self._templates_removidos,
+            "propostas": set(self._propostas) | set(self._itens) | self._propostas_removidas,
+        }
+
+    # ---- registro de alterações ---- #
+
+    def salvar_cliente(self, cliente: Cliente) -> None:
+        self._clientes[cliente.id] = cliente
+
+    def salvar_template(self, template: TemplateProposta) -> None:
+        self._templates[template.id] = template
+        self._templates_removidos.discard(template.id)
+
+    def excluir_template(self, template_id: int) -> None:
+        self._templates.pop(template_id, None)
+        self._templates_removidos.add(template_id)
+
+    def salvar_proposta(self, proposta: Proposta, itens: bool = False) -> None:
+        self._propostas[proposta.id] = proposta
+        if itens:
+            self._itens[proposta.id] = proposta
+
+    def excluir_proposta(self, proposta_id: int) -> None:
+        self._propostas.pop(proposta_id, None)
+        self._itens.pop(proposta_id, None)
+        self._propostas_removidas.add(proposta_id)
+
+    # ---- gravação ---- #
+
+    def commit(self) -> None:
+        if not self.pendente:
+            return
+
+        # ordem respeita as chaves estrangeiras: pais antes dos filhos na
+        # gravação, filhos antes dos pais na remoção
+        with StorageManager.transacao():
+            StorageManager.salvar_muitos_clientes(self._clientes.values())
+            StorageManager.salvar_muitos_templates(self._templates.values())
+            StorageManager.salvar_muitas_propostas(self._propostas.values())
+            for proposta in self._itens.values():
+                StorageManager.sincronizar_itens_proposta(proposta)
+            StorageManager.deletar_muitas_propostas(self._propostas_removidas)
+            for template_id in self._templates_removidos:
+                StorageManager.desvincular_template(template_id)
+                StorageManager.deletar_template(template_id)
+
+        self._limpar()
+
+    def rollback(self) -> None:
+        self._limpar()
+
+    def _limpar(self) -> None:
+        self._clientes.clear()
+        self._templates.clear()
+        self._propostas.clear()
+        self._itens.clear()
+        self._propostas_removidas.clear()
+        self._templates_removidos.clear()
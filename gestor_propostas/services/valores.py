@@ -0,0 +1,21 @@
+from typing import Optional
+
+
+def parse_money(value) -> Optional[float]:
+    """Valor em reais digitado em formato brasileiro ou com ponto decimal.
+
+    Aceita "R$ 1.234,56", "1234,56" e "1234.56"; None para texto vazio ou inválido.
+    """
+    if value is None:
+        return None
+    cleaned = str(value).strip().replace("R$", "").replace(" ", "")
+    if not cleaned:
+        return None
+    if "," in cleaned and "." in cleaned:
+        cleaned = cleaned.replace(".", "").replace(",", ".")
+    else:
+        cleaned = cleaned.replace(",", ".")
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
@@ -1,5 +1,7 @@
 from datetime import datetime
 from functools import wraps
+import hashlib
+import io
 import logging
 import os
 
@@ -13,19 +15,43 @@ from flask import (
     session,
     send_file,
     after_this_request,
+    current_app,
+    jsonify,
+    make_response,
 )
+from werkzeug.http import is_resource_modified
 
 from .models import ItemProposta
-from .services.storage import StorageManager
-from .services.excel_report import ExcelReportGenerator
-from .services.pdf_report import PdfReportGenerator
+from .services.item_import import linhas_texto, linhas_xlsx
+from .services.search import montar_consulta_fts
+from .services.valores import parse_money
 from .auth import AuthManager
-from . import gestor  # instância global criada em __init__.py
 
 
 bp = Blueprint("ui", __name__)
 logger = logging.getLogger(__name__)
 
+# instância global criada por inicializar() em __init__.py; resolvida ao
+# registrar o blueprint para que importar este módulo não abra o banco
+repositorio = None
+
+SELETOR_CLIENTES_LIMITE = 50
+# propostas por requisição em /propostas/lote
+LOTE_MAXIMO = 1000
+# linhas por importação em /propostas/<pid>/itens
+ITENS_IMPORTACAO_MAXIMO = 10000
+# erros listados quando uma importação é recusada
+ITENS_IMPORTACAO_ERROS = 10
+# ação em lote -> particípio usado nas mensagens
+ACOES_LOTE = {
+    "aceita": "aprovada(s)",
+    "enviada": "marcada(s) como enviada(s)",
+    "recusada": "marcada(s) como recusada(s)",
+    "cancelada": "cancelada(s)",
+    "rascunho": "de volta a rascunho",
+    "excluir": "excluída(s)",
+}
+
 
 # ========= helpers ========= #
 
@@ -36,20 +62,35 @@ def _parse_int(value, default=None):
         return default
 
 
-def _parse_money(value: str):
-    if value is None:
-        return None
-    cleaned = value.strip().replace("R$", "").replace(" ", "")
-    if not cleaned:
+def _etag(*partes) -> str:
+    return hashlib.sha1("|".join(map(str, partes)).encode("utf-8")).hexdigest()
+
+
+def _janela_csrf() -> int:
+    # a página guardada traz um token CSRF: a ETag muda na metade da validade
+    # dele, então uma página revalidada nunca tem token vencido
+    limite = current_app.config.get("WTF_CSRF_TIME_LIMIT", 3600)
+    return int(datetime.now().timestamp() // (limite / 2)) if limite else 0
+
+
+def _com_cache(resposta, etag: str, alterada=None):
+    resposta.set_etag(etag)
+    # None remove o Last-Modified que send_file tira do arquivo temporário
+    resposta.last_modified = alterada
+    # o navegador guarda, mas pergunta ao servidor antes de cada uso
+    resposta.headers["Cache-Control"] = "private, no-cache"
+    return resposta
+
+
+def _nao_modificada(etag: str, alterada=None):
+    """304 quando o cliente já tem esta versão (If-None-Match/If-Modified-Since); senão None."""
+    # mensagens pendentes (ex.: erro de um POST que redirecionou para cá)
+    # só aparecem numa página nova
+    if session.get("_flashes"):
         return None
-    if "," in cleaned and "." in cleaned:
-        cleaned = cleaned.replace(".", "").replace(",", ".")
-    else:
-        cleaned = cleaned.replace(",", ".")
-    try:
-        return float(cleaned)
-    except ValueError:
+    if is_resource_modified(request.environ, etag=etag, last_modified=alterada):
         return None
+    return _com_cache(make_response("", 304), etag, alterada)
 
 
 def login_required(view_func):
@@ -62,6 +103,32 @@ def login_required(view_func):
     return wrapper
 
 
+@bp.record_once
+def _resolver_repositorio(_state):
+    global repositorio
+    if repositorio is None:
+        from . import repositorio
+
+
+@bp.before_request
+def _abrir_sessao():
+    # gravações de outros workers desde a última requisição
+    repositorio.sincronizar()
+    repositorio.abrir_sessao()
+
+
+@bp.after_request
+def _gravar_sessao(response):
+    # todas as escritas da requisição vão para o banco em uma transação
+    repositorio.fechar_sessao(commit=True)
+    return response
+
+
+@bp.teardown_request
+def _descartar_sessao(exc):
+    repositorio.fechar_sessao(commit=False)
+
+
 @bp.context_processor
 def inject_user():
     """Disponibiliza o usuário logado no template como 'usuario_logado'."""
@@ -141,37 +208,14 @@ def index():
     q = request.args.get("q", "").strip().lower()
     status = request.args.get("status", "").strip().lower()
 
-    todas_propostas = gestor.listar_propostas()
-    propostas = todas_propostas
-
-    if status:
-        propostas = [p for p in propostas if p.status == status]
-
-    if q:
-        propostas = [
-            p for p in propostas
-            if q in p.titulo.lower() or (p.cliente and q in p.cliente.nome.lower())
-        ]
-
-    statuses = sorted({p.status for p in todas_propostas}, key=str.lower)
-    total_propostas = len(todas_propostas)
-    total_clientes = len(gestor.listar_clientes())
-    propostas_aceitas = [p for p in todas_propostas if p.status == "aceita"]
-    qtd_aceitas = len(propostas_aceitas)
-    valor_total_aceitas = sum(p.calcular_total() for p in propostas_aceitas)
-
-    # Dados para gráficos
-    from collections import Counter, defaultdict
-    status_counts = Counter(p.status for p in todas_propostas)
-    status_data = [{"status": k, "count": v} for k, v in status_counts.items()]
-
-    # Valor arrecadado por mês (para propostas aceitas)
-    arrecadacao_por_mes = defaultdict(float)
-    for p in propostas_aceitas:
-        if p.data_criacao:
-            mes_ano = p.data_criacao.strftime("%Y-%m")
-            arrecadacao_por_mes[mes_ano] += p.calcular_total()
-    arrecadacao_mes_data = [{"mes": k, "valor": v} for k, v in sorted(arrecadacao_por_mes.items())]
+    # só as 5 primeiras aparecem em "Últimas propostas"
+    propostas = repositorio.listar_propostas(status=status, q=q, limit=5)
+    statuses = repositorio.listar_status()
+
+    # KPIs e dados para gráficos, agregados no banco
+    resumo = repositorio.resumo_dashboard()
+    status_data = [{"status": k, "count": v} for k, v in resumo["status_counts"]]
+    arrecadacao_mes_data = [{"mes": k, "valor": v} for k, v in resumo["arrecadacao_por_mes"]]
 
     return render_template(
         "index.html",
@@ -179,10 +223,10 @@ def index():
         filtro_q=q,
         filtro_status=status,
         statuses=statuses,
-        total_propostas=total_propostas,
-        total_clientes=total_clientes,
-        qtd_aceitas=qtd_aceitas,
-        valor_total_aceitas=valor_total_aceitas,
+        total_propostas=resumo["total_propostas"],
+        total_clientes=resumo["total_clientes"],
+        qtd_aceitas=resumo["qtd_aceitas"],
+        valor_total_aceitas=resumo["valor_total_aceitas"],
         status_data=status_data,
         arrecadacao_mes_data=arrecadacao_mes_data,
     )
@@ -193,7 +237,20 @@ def index():
 @bp.route("/propostas/<int:pid>")
 @login_required
 def proposta_detalhe(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    # versões lidas antes do conteúdo (ver Repository.versao_proposta)
+    versao = repositorio.versao_proposta(pid)
+    etag = None
+    if versao is not None:
+        etag = _etag(
+            "detalhe", pid, versao[0], repositorio.versao_templates(), session.get("username"), _janela_csrf()
+        )
+        resposta = _nao_modificada(etag)
+        if resposta is not None:
+            return resposta
+        # a memória pode estar atrás do banco: nada mais antigo que a versão lida
+        repositorio.sincronizar()
+
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
@@ -202,26 +259,31 @@ def proposta_detalhe(pid: int):
         flash("Cliente da proposta não encontrado.", "error")
         return redirect(url_for("ui.index"))
 
-    templates = gestor.listar_templates()
+    templates = repositorio.listar_templates()
     template_selecionado = (
-        gestor.obter_template_por_id(proposta.template_id)
+        repositorio.obter_template(proposta.template_id)
         if proposta.template_id
         else None
     )
 
-    return render_template(
-        "proposta_detalhe.html",
-        proposta=proposta,
-        templates=templates,
-        template_selecionado=template_selecionado,
+    resposta = make_response(
+        render_template(
+            "proposta_detalhe.html",
+            proposta=proposta,
+            templates=templates,
+            template_selecionado=template_selecionado,
+        )
     )
+    return _com_cache(resposta, etag) if etag else resposta
 
 
 @bp.route("/propostas/nova", methods=["GET", "POST"])
 @login_required
 def nova_proposta():
-    clientes = gestor.listar_clientes()
-    templates = gestor.listar_templates()
+    # o seletor mostra os primeiros clientes; os demais chegam pela busca
+    # em /clientes/sugestoes
+    clientes = repositorio.listar_clientes(limit=SELETOR_CLIENTES_LIMITE)
+    templates = repositorio.listar_templates()
 
     if not clientes:
         flash("Cadastre ao menos um cliente antes de criar uma proposta.", "info")
@@ -238,7 +300,7 @@ def nova_proposta():
         num_parcelas = request.form.get("num_parcelas", "").strip()
         pagamento_obs = request.form.get("pagamento_obs", "").strip()
 
-        cliente = next((c for c in clientes if c.id == cliente_id), None)
+        cliente = repositorio.obter_cliente(cliente_id)
         if not cliente:
             flash("Cliente inválido.", "error")
             return redirect(url_for("ui.nova_proposta"))
@@ -260,7 +322,7 @@ def nova_proposta():
             cond_parts.append(f"Obs: {pagamento_obs}")
         cond_pag = " | ".join(cond_parts)
 
-        template = gestor.obter_template_por_id(template_id) if template_id else None
+        template = repositorio.obter_template(template_id) if template_id else None
         if template:
             if not titulo and template.titulo_padrao:
                 titulo = template.titulo_padrao
@@ -269,7 +331,7 @@ def nova_proposta():
             if not cond_pag and template.condicoes_pagamento_padrao:
                 cond_pag = template.condicoes_pagamento_padrao
 
-        prop = gestor.criar_proposta(
+        prop = repositorio.criar_proposta(
             cliente,
             titulo,
             validade=validade,
@@ -278,9 +340,6 @@ def nova_proposta():
             template_id=template.id if template else None,
         )
 
-        StorageManager.salvar_ou_atualizar_proposta(prop)
-        StorageManager.sincronizar_itens_proposta(prop)
-
         logger.info(f"Proposta #{prop.id} criada por usuário '{session.get('username')}' para cliente '{cliente.nome}'.")
         flash(f"Proposta #{prop.id} criada com sucesso!", "success")
         return redirect(url_for("ui.proposta_detalhe", pid=prop.id))
@@ -295,7 +354,7 @@ def nova_proposta():
 @bp.route("/propostas/<int:pid>/add_item", methods=["POST"])
 @login_required
 def add_item(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
@@ -309,7 +368,7 @@ def add_item(pid: int):
         return redirect(url_for("ui.proposta_detalhe", pid=pid))
 
     qtd = _parse_int(qtd_str)
-    valor = _parse_money(valor_str)
+    valor = parse_money(valor_str)
 
     if qtd is None or qtd <= 0:
         flash("Quantidade deve ser um número inteiro maior que zero.", "error")
@@ -322,17 +381,92 @@ def add_item(pid: int):
     item = ItemProposta(desc, qtd, valor)
     proposta.adicionar_item(item)
 
-    StorageManager.sincronizar_itens_proposta(proposta)
-    StorageManager.salvar_ou_atualizar_proposta(proposta)
+    repositorio.salvar_proposta(proposta, itens=True)
 
     flash("Item adicionado com sucesso!", "success")
     return redirect(url_for("ui.proposta_detalhe", pid=pid))
 
 
+def _validar_itens(linhas):
+    """(itens, erros) das linhas importadas; a primeira pode ser um cabeçalho."""
+    itens, erros = [], []
+    for numero, (desc, qtd_str, valor_str) in linhas:
+        qtd = _parse_int(qtd_str)
+        valor = parse_money(valor_str)
+        if not itens and not erros and qtd is None and valor is None:
+            continue  # cabeçalho
+        if len(itens) + len(erros) >= ITENS_IMPORTACAO_MAXIMO:
+            erros.append(f"No máximo {ITENS_IMPORTACAO_MAXIMO} itens por importação.")
+            break
+        if not desc:
+            erros.append(f"Linha {numero}: descrição é obrigatória.")
+        elif qtd is None or qtd <= 0:
+            erros.append(f"Linha {numero}: quantidade deve ser um número inteiro maior que zero.")
+        elif valor is None or valor < 0:
+            erros.append(f"Linha {numero}: valor unitário inválido.")
+        else:
+            itens.append(ItemProposta(desc, qtd, valor))
+    return itens, erros
+
+
+@bp.route("/propostas/<int:pid>/itens", methods=["POST"])
+@login_required
+def importar_itens(pid: int):
+    """Vários itens de uma vez: texto colado (CSV/TSV) ou arquivo .csv/.tsv/.xlsx.
+
+    Colunas: descrição, quantidade, valor unitário. Se alguma linha for
+    inválida nada é gravado; senão todas entram numa única transação.
+    """
+    proposta = repositorio.obter_proposta(pid)
+    if not proposta:
+        flash("Proposta não encontrada.", "error")
+        return redirect(url_for("ui.index"))
+
+    arquivo = request.files.get("arquivo")
+    texto = request.form.get("itens_texto", "")
+    if arquivo and arquivo.filename:
+        if arquivo.filename.lower().endswith(".xlsx"):
+            linhas = linhas_xlsx(arquivo.stream)
+        else:
+            linhas = linhas_texto(io.TextIOWrapper(arquivo.stream, encoding="utf-8-sig", newline=""))
+    elif texto.strip():
+        linhas = linhas_texto(io.StringIO(texto, newline=""))
+    else:
+        flash("Cole os itens ou envie um arquivo.", "error")
+        return redirect(url_for("ui.proposta_detalhe", pid=pid))
+
+    try:
+        itens, erros = _validar_itens(linhas)
+    except Exception:
+        logger.exception(f"Falha ao ler itens importados na proposta #{pid}.")
+        flash("Não foi possível ler o arquivo (use CSV/TSV em UTF-8 ou .xlsx).", "error")
+        return redirect(url_for("ui.proposta_detalhe", pid=pid))
+
+    if erros:
+        restantes = len(erros) - ITENS_IMPORTACAO_ERROS
+        for erro in erros[:ITENS_IMPORTACAO_ERROS]:
+            flash(erro, "error")
+        if restantes > 0:
+            flash(f"... e mais {restantes} erro(s). Nenhum item foi importado.", "error")
+        else:
+            flash("Nenhum item foi importado.", "error")
+        return redirect(url_for("ui.proposta_detalhe", pid=pid))
+    if not itens:
+        flash("Nenhum item encontrado para importar.", "info")
+        return redirect(url_for("ui.proposta_detalhe", pid=pid))
+
+    proposta.itens.extend(itens)
+    # uma sincronização só: os novos itens entram com um executemany
+    repositorio.salvar_proposta(proposta, itens=True)
+
+    flash(f"{len(itens)} item(ns) importado(s) com sucesso!", "success")
+    return redirect(url_for("ui.proposta_detalhe", pid=pid))
+
+
 @bp.route("/propostas/<int:pid>/desconto", methods=["POST"])
 @login_required
 def aplicar_desconto(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
@@ -346,7 +480,7 @@ def aplicar_desconto(pid: int):
         proposta.desconto_valor = 0.0
         msg = "Desconto removido."
     else:
-        valor = _parse_money(valor_str)
+        valor = parse_money(valor_str)
         if valor is None:
             flash("Informe um valor numérico para desconto.", "error")
             return redirect(url_for("ui.proposta_detalhe", pid=pid))
@@ -366,7 +500,7 @@ def aplicar_desconto(pid: int):
         else:
             msg = "Tipo de desconto inválido."
 
-    StorageManager.salvar_ou_atualizar_proposta(proposta)
+    repositorio.salvar_proposta(proposta)
     flash(msg, "success")
     return redirect(url_for("ui.proposta_detalhe", pid=pid))
 
@@ -374,7 +508,7 @@ def aplicar_desconto(pid: int):
 @bp.route("/propostas/<int:pid>/pagamento", methods=["POST"])
 @login_required
 def atualizar_pagamento(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
@@ -393,7 +527,7 @@ def atualizar_pagamento(pid: int):
     cond_pag = " | ".join(cond_parts)
 
     proposta.condicoes_pagamento = cond_pag
-    StorageManager.salvar_ou_atualizar_proposta(proposta)
+    repositorio.salvar_proposta(proposta)
 
     flash("Condições de pagamento atualizadas.", "success")
     return redirect(url_for("ui.proposta_detalhe", pid=pid))
@@ -402,14 +536,14 @@ def atualizar_pagamento(pid: int):
 @bp.route("/propostas/<int:pid>/template", methods=["POST"])
 @login_required
 def atualizar_template(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
 
     template_id = _parse_int(request.form.get("template_id"))
     if template_id:
-        template = gestor.obter_template_por_id(template_id)
+        template = repositorio.obter_template(template_id)
         if not template:
             flash("Template invalido.", "error")
             return redirect(url_for("ui.proposta_detalhe", pid=pid))
@@ -419,31 +553,19 @@ def atualizar_template(pid: int):
         proposta.template_id = None
         flash("Template removido.", "success")
 
-    StorageManager.salvar_ou_atualizar_proposta(proposta)
+    repositorio.salvar_proposta(proposta)
     return redirect(url_for("ui.proposta_detalhe", pid=pid))
 
 
 @bp.route("/propostas/<int:pid>/excluir", methods=["POST"])
 @login_required
 def excluir_proposta(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
 
-    gestor.propostas = [p for p in gestor.propostas if p.id != pid]
-
-    try:
-        if hasattr(StorageManager, "excluir_proposta"):
-            StorageManager.excluir_proposta(pid)
-        else:
-            StorageManager.deletar_proposta(pid)
-    except Exception:
-        flash(
-            "Erro ao excluir no banco, mas proposta foi removida da lista atual.",
-            "error",
-        )
-
+    repositorio.excluir_proposta(pid)
     flash(f"Proposta #{pid} excluída com sucesso.", "success")
     return redirect(url_for("ui.index"))
 
@@ -451,7 +573,7 @@ def excluir_proposta(pid: int):
 @bp.route("/propostas/<int:pid>/aprovar", methods=["POST"])
 @login_required
 def aprovar_proposta(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
@@ -461,7 +583,7 @@ def aprovar_proposta(pid: int):
         return redirect(url_for("ui.index"))
 
     proposta.alterar_status("aceita")
-    StorageManager.salvar_ou_atualizar_proposta(proposta)
+    repositorio.salvar_proposta(proposta)
 
     logger.info(f"Proposta #{pid} aprovada por usuário '{session.get('username')}'.")
     flash(f"Proposta #{pid} aprovada com sucesso!", "success")
@@ -471,7 +593,7 @@ def aprovar_proposta(pid: int):
 @bp.route("/propostas/<int:pid>/enviar", methods=["POST"])
 @login_required
 def enviar_proposta(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
@@ -481,39 +603,118 @@ def enviar_proposta(pid: int):
         return redirect(url_for("ui.index"))
 
     proposta.alterar_status("enviada")
-    StorageManager.salvar_ou_atualizar_proposta(proposta)
+    repositorio.salvar_proposta(proposta)
 
     logger.info(f"Proposta #{pid} marcada como enviada por usuário '{session.get('username')}'.")
     flash(f"Proposta #{pid} marcada como enviada!", "success")
     return redirect(url_for("ui.index"))
 
 
+@bp.route("/propostas/lote", methods=["POST"])
+@login_required
+def propostas_em_lote():
+    """Muda o status ou exclui várias propostas de uma vez.
+
+    Aceita o formulário da listagem (campos `acao` e `ids`) ou JSON
+    `{"acao": ..., "ids": [...]}`; com JSON responde o resultado de cada id.
+    """
+    dados = request.get_json(silent=True)
+    if dados is not None:
+        acao = str(dados.get("acao", "")).strip().lower()
+        valores = dados.get("ids") or []
+    else:
+        acao = request.form.get("acao", "").strip().lower()
+        valores = request.form.getlist("ids")
+    ids = [pid for pid in (_parse_int(v) for v in valores) if pid is not None]
+
+    erro = None
+    if acao not in ACOES_LOTE:
+        erro = "Ação em lote inválida."
+    elif not ids:
+        erro = "Selecione ao menos uma proposta."
+    elif len(ids) > LOTE_MAXIMO:
+        erro = f"No máximo {LOTE_MAXIMO} propostas por vez."
+
+    voltar = url_for(
+        "ui.listar_propostas",
+        q=request.form.get("q") or None,
+        status=request.form.get("status") or None,
+        ordenar=request.form.get("ordenar") or None,
+    )
+    if erro:
+        if dados is not None:
+            return jsonify({"erro": erro}), 400
+        flash(erro, "error")
+        return redirect(voltar)
+
+    resultados = repositorio.aplicar_em_lote(acao, ids)
+    ok = [pid for pid, resultado in resultados.items() if resultado == "ok"]
+    logger.info(f"Ação em lote '{acao}' em {len(ok)} proposta(s) por usuário '{session.get('username')}'.")
+
+    if dados is not None:
+        return jsonify(
+            {
+                "acao": acao,
+                "resultados": [{"id": pid, "resultado": resultado} for pid, resultado in resultados.items()],
+            }
+        )
+
+    flash(f"{len(ok)} proposta(s) {ACOES_LOTE[acao]}.", "success" if ok else "info")
+    inalteradas = sum(1 for resultado in resultados.values() if resultado == "inalterada")
+    if inalteradas:
+        flash(f"{inalteradas} proposta(s) já estavam com status {acao}.", "info")
+    ausentes = [f"#{pid}" for pid, resultado in resultados.items() if resultado == "nao_encontrada"]
+    if ausentes:
+        flash(f"Não encontradas: {', '.join(ausentes)}.", "error")
+    return redirect(voltar)
+
+
 @bp.route("/propostas/excel")
 @login_required
 def download_excel():
-    if not gestor.listar_propostas():
+    if not repositorio.contar_propostas():
         flash("Não há propostas para exportar.", "info")
         return redirect(url_for("ui.index"))
 
-    caminho = ExcelReportGenerator.gerar_excel(gestor)
-    return send_file(caminho, as_attachment=True)
+    # a planilha lê do banco: qualquer gravação depois desta versão só a deixa mais nova
+    etag = _etag("excel", repositorio.versao_dados())
+    resposta = _nao_modificada(etag)
+    if resposta is not None:
+        return resposta
+
+    # openpyxl e reportlab são importados só no primeiro uso
+    from .services.excel_report import ExcelReportGenerator
+
+    caminho = ExcelReportGenerator.gerar_excel(repositorio.linhas_relatorio())
+    # sem Range: cada geração tem bytes diferentes (datas do arquivo)
+    return _com_cache(send_file(caminho, as_attachment=True, conditional=False, etag=False), etag)
 
 
 @bp.route("/propostas/<int:pid>/pdf")
 @login_required
 def download_pdf(pid: int):
-    proposta = next((p for p in gestor.propostas if p.id == pid), None)
+    versao = repositorio.versao_proposta(pid)
+    if versao is not None:
+        etag, alterada = _etag("pdf", pid, versao[0]), versao[1]
+        resposta = _nao_modificada(etag, alterada)
+        if resposta is not None:
+            return resposta
+        repositorio.sincronizar()
+
+    proposta = repositorio.obter_proposta(pid)
     if not proposta:
         flash("Proposta não encontrada.", "error")
         return redirect(url_for("ui.index"))
 
     from tempfile import NamedTemporaryFile
 
+    from .services.pdf_report import PdfReportGenerator
+
     tmp = NamedTemporaryFile(delete=False, suffix=f"_proposta_{proposta.id}.pdf")
     tmp.close()
 
     template = (
-        gestor.obter_template_por_id(proposta.template_id)
+        repositorio.obter_template(proposta.template_id)
         if proposta.template_id
         else None
     )
@@ -527,53 +728,109 @@ def download_pdf(pid: int):
             logger.warning("Falha ao remover PDF temporário: %s", tmp.name)
         return response
 
-    return send_file(
+    resposta = send_file(
         tmp.name,
         as_attachment=True,
         download_name=f"proposta_{proposta.id}.pdf",
+        conditional=False,
+        etag=False,
     )
+    return _com_cache(resposta, etag, alterada) if versao is not None else resposta
 
 
 # ========= propostas ========= #
 
+def _pagina_propostas(por_pagina: int):
+    """Filtros e cursores da query string -> (filtros, Pagina de propostas)."""
+    filtros = {
+        "q": request.args.get("q", "").strip().lower(),
+        "status": request.args.get("status", "").strip(),
+        "ordenar": request.args.get("ordenar", "").strip(),
+    }
+    pagina = repositorio.paginar_propostas(
+        limit=por_pagina,
+        apos=request.args.get("apos") or None,
+        antes=request.args.get("antes") or None,
+        **filtros,
+    )
+    return filtros, pagina
+
+
 @bp.route("/propostas", endpoint="listar_propostas")
 @login_required
 def propostas_lista():
-    q = request.args.get("q", "").strip().lower()
-    status = request.args.get("status", "").strip()
-    page = request.args.get("page", 1, type=int)
-    per_page = 10
-
-    todas_propostas = gestor.listar_propostas()
-    propostas = todas_propostas
+    # paginação por cursor (apos/antes), sem OFFSET
+    filtros, pagina = _pagina_propostas(por_pagina=10)
 
-    if status:
-        propostas = [p for p in propostas if p.status == status.lower()]
+    return render_template(
+        "propostas.html",
+        propostas=pagina.registros,
+        filtro_q=filtros["q"],
+        filtro_status=filtros["status"],
+        filtro_ordenar=filtros["ordenar"],
+        statuses=repositorio.listar_status(),
+        proximo=pagina.proximo,
+        anterior=pagina.anterior,
+        total_propostas=repositorio.contar_propostas(status=filtros["status"], q=filtros["q"]),
+    )
 
-    if q:
-        propostas = [
-            p for p in propostas
-            if q in p.titulo.lower() or (p.cliente and q in p.cliente.nome.lower()) or q in str(p.id)
-        ]
 
-    # paginação
-    total_propostas_filtradas = len(propostas)
-    start = (page - 1) * per_page
-    end = start + per_page
-    propostas_paginadas = propostas[start:end]
-    total_pages = (total_propostas_filtradas + per_page - 1) // per_page
+@bp.route("/propostas.json")
+@login_required
+def propostas_json():
+    limite = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    filtros, pagina = _pagina_propostas(por_pagina=limite)
+
+    return jsonify(
+        {
+            "propostas": [
+                {
+                    "id": p.id,
+                    "titulo": p.titulo,
+                    "cliente": p.cliente.nome,
+                    "status": p.status,
+                    "data_criacao": p.data_criacao.strftime("%Y-%m-%d %H:%M:%S"),
+                    "total": p.calcular_total(),
+                    "url": url_for("ui.proposta_detalhe", pid=p.id),
+                }
+                for p in pagina.registros
+            ],
+            "proximo": pagina.proximo,
+            "anterior": pagina.anterior,
+            "total": repositorio.contar_propostas(status=filtros["status"], q=filtros["q"]),
+        }
+    )
 
-    statuses = sorted({p.status for p in todas_propostas}, key=str.lower)
 
-    return render_template(
-        "propostas.html",
-        propostas=propostas_paginadas,
-        filtro_q=q,
-        filtro_status=status,
-        statuses=statuses,
-        current_page=page,
-        total_pages=total_pages,
-        total_propostas=total_propostas_filtradas,
+@bp.route("/busca")
+@login_required
+def busca():
+    q = request.args.get("q", "").strip()
+    status = request.args.get("status", "").strip().lower()
+    limite = min(max(request.args.get("limit", 10, type=int), 1), 50)
+
+    tem_termos = montar_consulta_fts(q) is not None
+    propostas = repositorio.listar_propostas(status=status, q=q, limit=limite) if tem_termos else []
+    clientes = repositorio.buscar_clientes(q, limit=limite) if tem_termos else []
+
+    return jsonify(
+        {
+            "q": q,
+            "propostas": [
+                {
+                    "id": p.id,
+                    "titulo": p.titulo,
+                    "cliente": p.cliente.nome,
+                    "status": p.status,
+                    "url": url_for("ui.proposta_detalhe", pid=p.id),
+                }
+                for p in propostas
+            ],
+            "clientes": [
+                {"id": c.id, "nome": c.nome, "documento": c.documento, "contato": c.contato}
+                for c in clientes
+            ],
+        }
     )
 
 
@@ -582,7 +839,7 @@ def propostas_lista():
 @bp.route("/templates")
 @login_required
 def templates_lista():
-    return render_template("templates.html", templates=gestor.listar_templates())
+    return render_template("templates.html", templates=repositorio.listar_templates())
 
 
 @bp.route("/templates/novo", methods=["GET", "POST"])
@@ -594,7 +851,7 @@ def novo_template():
             flash("Nome do template e obrigatorio.", "error")
             return redirect(url_for("ui.novo_template"))
 
-        template = gestor.criar_template(
+        repositorio.criar_template(
             nome=nome,
             titulo_padrao=request.form.get("titulo_padrao", "").strip(),
             responsavel_padrao=request.form.get("responsavel_padrao", "").strip(),
@@ -607,7 +864,6 @@ def novo_template():
             logo_path=request.form.get("logo_path", "").strip() or "static/img/dealflow_logo.png",
         )
 
-        StorageManager.salvar_ou_atualizar_template(template)
         flash("Template criado com sucesso.", "success")
         return redirect(url_for("ui.templates_lista"))
 
@@ -617,7 +873,7 @@ def novo_template():
 @bp.route("/templates/<int:tid>/editar", methods=["GET", "POST"])
 @login_required
 def editar_template(tid: int):
-    template = gestor.obter_template_por_id(tid)
+    template = repositorio.obter_template(tid)
     if not template:
         flash("Template nao encontrado.", "error")
         return redirect(url_for("ui.templates_lista"))
@@ -639,7 +895,7 @@ def editar_template(tid: int):
         template.usar_logo = request.form.get("usar_logo") == "1"
         template.logo_path = request.form.get("logo_path", "").strip() or "static/img/dealflow_logo.png"
 
-        StorageManager.salvar_ou_atualizar_template(template)
+        repositorio.salvar_template(template)
         flash("Template atualizado.", "success")
         return redirect(url_for("ui.templates_lista"))
 
@@ -649,18 +905,12 @@ def editar_template(tid: int):
 @bp.route("/templates/<int:tid>/excluir", methods=["POST"])
 @login_required
 def excluir_template(tid: int):
-    template = gestor.obter_template_por_id(tid)
+    template = repositorio.obter_template(tid)
     if not template:
         flash("Template nao encontrado.", "error")
         return redirect(url_for("ui.templates_lista"))
 
-    for proposta in gestor.propostas:
-        if proposta.template_id == tid:
-            proposta.template_id = None
-            StorageManager.salvar_ou_atualizar_proposta(proposta)
-
-    gestor.templates = [t for t in gestor.templates if t.id != tid]
-    StorageManager.deletar_template(tid)
+    repositorio.excluir_template(tid)
 
     flash("Template excluido.", "success")
     return redirect(url_for("ui.templates_lista"))
@@ -671,7 +921,7 @@ def excluir_template(tid: int):
 @bp.route("/clientes")
 @login_required
 def clientes():
-    return render_template("clientes.html", clientes=gestor.listar_clientes())
+    return render_template("clientes.html", clientes=repositorio.listar_clientes())
 
 
 @bp.route("/clientes/novo", methods=["GET", "POST"])
@@ -686,10 +936,26 @@ def novo_cliente():
             flash("Nome do cliente é obrigatório.", "error")
             return redirect(url_for("ui.novo_cliente"))
 
-        cliente = gestor.criar_cliente(nome, documento, contato)
-        StorageManager.salvar_ou_atualizar_cliente(cliente)
+        cliente = repositorio.criar_cliente(nome, documento, contato)
 
         flash(f"Cliente '{cliente.nome}' criado com sucesso!", "success")
         return redirect(url_for("ui.clientes"))
 
     return render_template("novo_cliente.html")
+
+
+@bp.route("/clientes/sugestoes")
+@login_required
+def sugestoes_clientes():
+    q = request.args.get("q", "").strip()
+    limite = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    sugestoes = repositorio.sugerir_clientes(q, limit=limite) if q else []
+    return jsonify(
+        {
+            "q": q,
+            "clientes": [
+                {"id": c.id, "nome": c.nome, "documento": c.documento, "score": score}
+                for c, score in sugestoes
+            ],
+        }
+    )
@@ -0,0 +1,72 @@
+"""Benchmark do índice de trigramas de clientes (busca aproximada).
+
+Mede tempo de construção, memória contabilizada pelo índice (e a real, via
+tracemalloc) e a latência das consultas de typeahead.
+
+Uso:
+    python scripts/bench_fuzzy.py --n 500000 --max-mib 128
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_propostas.services.fuzzy import TrigramIndex  # noqa: E402
+
+NOMES = "João José Maria Ana Antônio Francisco Paulo Carlos Luís Márcia Conceição Sebastião Débora".split()
+SOBRENOMES = "Silva Santos Oliveira Souza Rodrigues Ferreira Alves Pereira Lima Gomes Araújo Ribeiro Assunção".split()
+EMPRESAS = "Comércio Associação Serviços Tecnologia Construções Transportes Distribuidora".split()
+
+
+def _clientes(n: int):
+    rnd = random.Random(42)
+    for i in range(1, n + 1):
+        if i % 3 == 0:
+            nome = f"{rnd.choice(EMPRESAS)} {rnd.choice(SOBRENOMES)} Ltda {i % 997}"
+        else:
+            nome = f"{rnd.choice(NOMES)} {rnd.choice(SOBRENOMES)} {rnd.choice(SOBRENOMES)}"
+        yield i, nome, f"{rnd.randrange(10**11):011d}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark do índice de trigramas")
+    parser.add_argument("--n", type=int, default=500_000, help="Quantidade de clientes")
+    parser.add_argument("--max-mib", type=int, default=128, help="Orçamento do índice em MiB")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    indice = TrigramIndex(max_bytes=args.max_mib * 1024 * 1024)
+    inicio = time.perf_counter()
+    indexados = indice.carregar(_clientes(args.n))
+    indice.aquecer()
+    duracao = time.perf_counter() - inicio
+    real = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{indexados}/{args.n} clientes indexados em {duracao:.1f}s")
+    print(
+        f"memória: {indice.bytes_usados / 2**20:.1f} MiB contabilizados, "
+        f"{real / 2**20:.1f} MiB alocados (orçamento {args.max_mib} MiB)"
+    )
+    if indice.excedido:
+        print("orçamento excedido: o restante dos clientes usaria a busca FTS")
+
+    for termo in ("joao silva", "jo", "asociacao sousa", "marcia alvez", "conceicao", "12345"):
+        inicio = time.perf_counter()
+        indice.buscar(termo, limit=10)
+        frio = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            resultado = indice.buscar(termo, limit=10)
+        ms = (time.perf_counter() - inicio) * 1000 / args.repeticoes
+        melhor = resultado[0][1] if resultado else 0.0
+        print(f"  {termo!r:20} {frio:8.2f} ms (1a) {ms:8.2f} ms/consulta  score top {melhor:.2f}")
+
+
+if __name__ == "__main__":
+    main()
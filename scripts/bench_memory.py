@@ -0,0 +1,131 @@
+"""Benchmark de memória da representação dos itens de proposta.
+
+Cada modo roda em um subprocesso próprio e informa o RSS acima do processo
+vazio (/proc/self/statm; fora do Linux, o pico via ru_maxrss):
+
+- legado:  objetos com __dict__ (como eram os modelos antes do __slots__)
+- slots:   ItemProposta com __slots__ em Proposta.itens
+- colunar: ItensColunares (arrays), como em carregar_tudo(compacto=True)
+
+Uso:
+    python scripts/bench_memory.py --itens 1000000
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PALAVRAS = (
+    "site app consultoria licença servidor hospedagem manutenção suporte treinamento "
+    "integração migração auditoria projeto implantação desenvolvimento relatório"
+).split()
+ITENS_POR_PROPOSTA = 10
+
+
+class _PropostaLegada:
+    def __init__(self, cliente, id):
+        self.id = id
+        self.cliente = cliente
+        self.titulo = f"Proposta {id}"
+        self.data_criacao = None
+        self.status = "rascunho"
+        self.itens = []
+        self.validade = None
+        self.responsavel = ""
+        self.condicoes_pagamento = ""
+        self.template_id = None
+        self.tipo_desconto = None
+        self.desconto_percentual = 0.0
+        self.desconto_valor = 0.0
+
+    def calcular_subtotal(self):
+        return sum(item.quantidade * item.valor_unitario for item in self.itens)
+
+
+class _ItemLegado:
+    def __init__(self, descricao, quantidade, valor_unitario, id=None):
+        self.id = id
+        self.descricao = descricao
+        self.quantidade = quantidade
+        self.valor_unitario = valor_unitario
+
+
+def _linhas(n: int):
+    rnd = random.Random(42)
+    for i in range(1, n + 1):
+        # strings novas a cada linha, como vêm do sqlite3
+        descricao = " ".join((rnd.choice(PALAVRAS), rnd.choice(PALAVRAS)))
+        yield i, (i - 1) // ITENS_POR_PROPOSTA + 1, descricao, rnd.randint(1, 10), rnd.randint(100, 99999) / 100
+
+
+def _rss_kib() -> int:
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except OSError:
+        pass
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _executar(modo: str, n: int) -> None:
+    from gestor_propostas.models import Cliente, ItemProposta, ItensColunares, Proposta
+
+    base = _rss_kib()
+    cliente = Cliente("ACME", id=1)
+    propostas = {}
+    colunas = {}
+    for item_id, proposta_id, descricao, quantidade, valor in _linhas(n):
+        proposta = propostas.get(proposta_id)
+        if proposta is None:
+            classe = _PropostaLegada if modo == "legado" else Proposta
+            proposta = propostas[proposta_id] = classe(cliente, id=proposta_id)
+        if modo == "legado":
+            proposta.itens.append(_ItemLegado(descricao, quantidade, valor, id=item_id))
+        elif modo == "slots":
+            proposta.itens.append(ItemProposta(descricao, quantidade, valor, id=item_id))
+        else:
+            destino = colunas.get(proposta_id)
+            if destino is None:
+                destino = colunas[proposta_id] = ItensColunares()
+                proposta.usar_itens_colunares(destino)
+            destino.adicionar(descricao, quantidade, valor, id=item_id)
+    del colunas
+    total = sum(p.calcular_subtotal() for p in propostas.values())
+    print(f"{modo} {_rss_kib() - base} {total:.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de memória dos itens")
+    parser.add_argument("--itens", type=int, default=1_000_000)
+    parser.add_argument("--modo", choices=("legado", "slots", "colunar"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        _executar(args.modo, args.itens)
+        return
+
+    print(f"{args.itens} itens, {ITENS_POR_PROPOSTA} por proposta")
+    referencia = None
+    for modo in ("legado", "slots", "colunar"):
+        saida = subprocess.run(
+            [sys.executable, __file__, "--itens", str(args.itens), "--modo", modo],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        kib = int(saida[1])
+        referencia = referencia or kib
+        print(
+            f"  {modo:8} {kib / 1024:8.1f} MiB  {kib * 1024 / args.itens:6.0f} B/item  "
+            f"({kib / referencia:.0%} do legado)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Benchmark da listagem de propostas: LIMIT/OFFSET x cursor (keyset), e contagem.
+
+Uso:
+    python scripts/bench_pagination.py --n 1000000 --pagina 5000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_propostas.services.repository import Repository  # noqa: E402
+from gestor_propostas.services.storage import StorageManager  # noqa: E402
+
+STATUS = ("rascunho", "enviada", "aceita", "recusada")
+
+
+def _popular(n: int) -> None:
+    rnd = random.Random(42)
+    with StorageManager.transacao() as conn:
+        conn.execute("INSERT INTO clientes (id, nome) VALUES (1, 'Cliente')")
+        conn.executemany(
+            "INSERT INTO propostas (id, cliente_id, titulo, data_criacao, status) VALUES (?, 1, ?, ?, ?)",
+            (
+                (
+                    i,
+                    f"Proposta {i}",
+                    f"20{rnd.randint(20, 24)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} 00:00:00",
+                    rnd.choice(STATUS),
+                )
+                for i in range(1, n + 1)
+            ),
+        )
+
+
+def _medir(func, repeticoes: int) -> float:
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        func()
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da paginação de propostas")
+    parser.add_argument("--n", type=int, default=100_000, help="Quantidade de propostas")
+    parser.add_argument("--pagina", type=int, default=5000, help="Página medida (10 por página)")
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    por_pagina = 10
+    with tempfile.TemporaryDirectory() as tmp:
+        StorageManager.DB_PATH = os.path.join(tmp, "paginacao.db")
+        StorageManager.init_db()
+        inicio = time.perf_counter()
+        _popular(args.n)
+        print(f"{args.n} propostas gravadas em {time.perf_counter() - inicio:.1f}s")
+
+        repo = Repository()
+        conn = StorageManager._get_conn()
+        offset = (args.pagina - 1) * por_pagina
+        for status in ("", "aceita"):
+            for ordenar in ("", "recentes"):
+                # cursor que aponta para a página pedida (chave da última linha da anterior)
+                _, origem, condicoes, params, chave = repo._consulta(status, None, ordenar)
+                linha = conn.execute(
+                    f"SELECT {', '.join(chave[0])} {origem}{repo._where(condicoes)} "
+                    f"ORDER BY {repo._order_by(chave)} LIMIT 1 OFFSET ?",
+                    params + [offset - 1],
+                ).fetchone()
+                if linha is None:
+                    continue
+                cursor = repo._cursor(chave, linha)
+                filtros = {"status": status, "ordenar": ordenar, "limit": por_pagina}
+
+                primeira = _medir(lambda: repo.listar_propostas(**filtros), args.repeticoes)
+                com_offset = _medir(lambda: repo.listar_propostas(offset=offset, **filtros), args.repeticoes)
+                com_cursor = _medir(lambda: repo.paginar_propostas(apos=cursor, **filtros), args.repeticoes)
+                print(
+                    f"  {status or 'todas'}/{ordenar or 'id':10} página 1 {primeira:7.2f} ms  "
+                    f"página {args.pagina}: OFFSET {com_offset:7.2f} ms  cursor {com_cursor:7.2f} ms"
+                )
+
+        contagem = _medir(lambda: conn.execute("SELECT COUNT(*) FROM propostas").fetchone(), args.repeticoes)
+        print(f"  COUNT(*)             {contagem:7.2f} ms")
+        print(f"  contar_propostas()   {_medir(repo.contar_propostas, args.repeticoes):7.2f} ms")
+        StorageManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark da busca full-text (FTS5) de propostas.
+
+Uso:
+    python scripts/bench_search.py --n 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_propostas.services.search import SearchIndex  # noqa: E402
+from gestor_propostas.services.storage import StorageManager  # noqa: E402
+
+PALAVRAS = (
+    "site app consultoria licença servidor hospedagem manutenção suporte treinamento "
+    "integração migração auditoria projeto implantação desenvolvimento associação"
+).split()
+NOMES = "João Maria Ana Pedro Lucas Júlia Carla Mário Sônia Luís".split()
+
+
+def _popular(n: int) -> None:
+    rnd = random.Random(42)
+    n_clientes = max(1, n // 10)
+    with StorageManager.transacao() as conn:
+        conn.executemany(
+            "INSERT INTO clientes (id, nome, documento, contato) VALUES (?, ?, ?, ?)",
+            (
+                (i, f"{rnd.choice(NOMES)} {rnd.choice(NOMES)} {i}", f"{i:011d}", f"c{i}@example.com")
+                for i in range(1, n_clientes + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO propostas (id, cliente_id, titulo, data_criacao, status) VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    i,
+                    rnd.randint(1, n_clientes),
+                    " ".join(rnd.sample(PALAVRAS, 3)),
+                    "2024-01-01 00:00:00",
+                    rnd.choice(("rascunho", "enviada", "aceita")),
+                )
+                for i in range(1, n + 1)
+            ),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da busca FTS5")
+    parser.add_argument("--n", type=int, default=100_000, help="Quantidade de propostas")
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        StorageManager.DB_PATH = os.path.join(tmp, "busca.db")
+        StorageManager.init_db()
+
+        inicio = time.perf_counter()
+        _popular(args.n)
+        print(f"{args.n} propostas indexadas em {time.perf_counter() - inicio:.1f}s")
+
+        for termo in ("joao", "associacao 12", "hospedagem suporte", "1234"):
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                SearchIndex.buscar_propostas(termo, limit=10)
+            ms = (time.perf_counter() - inicio) * 1000 / args.repeticoes
+            print(f"  {termo!r:24} {ms:8.2f} ms/consulta (top 10)")
+
+        StorageManager.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Benchmark da carga inicial (StorageManager.carregar_tudo): tempo e pico de memória.
+
+Cada modo roda em processos separados: um mede o tempo, outro mede com
+tracemalloc a memória Python no fim da carga e o pico durante ela (o RSS
+mistura as páginas do banco mapeadas por mmap). Com --db o banco é
+reaproveitado entre execuções (e criado na primeira), o que poupa o tempo
+de popular 1M de propostas.
+
+Uso:
+    python scripts/bench_startup.py --n 100000
+    python scripts/bench_startup.py --n 1000000 --db /tmp/startup_1m.db
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_propostas.models import GestorPropostas  # noqa: E402
+from gestor_propostas.services.storage import StorageManager  # noqa: E402
+
+STATUS = ("rascunho", "enviada", "aceita", "recusada")
+PALAVRAS = ("licença", "suporte", "consultoria", "implantação", "treinamento", "hardware")
+MODOS = ("sequencial", "paralelo", "compacto")
+
+
+def _popular(n: int, itens_por_proposta: int) -> None:
+    rnd = random.Random(42)
+    n_clientes = max(1, n // 10)
+    with StorageManager.transacao() as conn:
+        conn.executemany(
+            "INSERT INTO clientes (id, nome, documento, contato) VALUES (?, ?, ?, ?)",
+            ((i, f"Cliente {i}", f"{i:014d}", f"cliente{i}@example.com") for i in range(1, n_clientes + 1)),
+        )
+        conn.executemany(
+            """
+            INSERT INTO propostas (id, cliente_id, titulo, data_criacao, status, validade, responsavel)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    i,
+                    rnd.randint(1, n_clientes),
+                    f"Proposta {i}",
+                    f"20{rnd.randint(20, 24)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d} "
+                    f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:00",
+                    rnd.choice(STATUS),
+                    f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+                    "Ana",
+                )
+                for i in range(1, n + 1)
+            ),
+        )
+        conn.executemany(
+            "INSERT INTO itens (proposta_id, descricao, quantidade, valor_unitario) VALUES (?, ?, ?, ?)",
+            (
+                (i, rnd.choice(PALAVRAS), rnd.randint(1, 10), rnd.randint(100, 99999) / 100)
+                for i in range(1, n + 1)
+                for _ in range(itens_por_proposta)
+            ),
+        )
+
+
+def _executar(modo: str, memoria: bool) -> None:
+    gestor = GestorPropostas()
+    if memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    StorageManager.carregar_tudo(gestor, compacto=modo == "compacto", paralelo=modo == "paralelo")
+    segundos = time.perf_counter() - inicio
+    final, pico = tracemalloc.get_traced_memory() if memoria else (0, 0)
+    itens = sum(len(p.itens) for p in gestor.listar_propostas())
+    print(f"{modo} {segundos:.3f} {final} {pico} {itens}")
+
+
+def _rodar(caminho: str, modo: str, memoria: bool) -> list:
+    comando = [sys.executable, __file__, "--db", caminho, "--modo", modo]
+    if memoria:
+        comando.append("--memoria")
+    return subprocess.run(comando, capture_output=True, text=True, check=True).stdout.split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark da carga inicial")
+    parser.add_argument("--n", type=int, default=100_000, help="Quantidade de propostas")
+    parser.add_argument("--itens", type=int, default=3, help="Itens por proposta")
+    parser.add_argument("--db", help="Banco a reaproveitar (criado se não existir)")
+    parser.add_argument("--modos", default=",".join(MODOS))
+    parser.add_argument("--modo", choices=MODOS, help=argparse.SUPPRESS)
+    parser.add_argument("--memoria", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.modo:
+        StorageManager.DB_PATH = args.db
+        _executar(args.modo, args.memoria)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        caminho = args.db or os.path.join(tmp, "startup.db")
+        if not os.path.exists(caminho):
+            StorageManager.DB_PATH = caminho
+            StorageManager.init_db()
+            inicio = time.perf_counter()
+            _popular(args.n, args.itens)
+            StorageManager.checkpoint("TRUNCATE")
+            StorageManager.close_all()
+            print(f"{args.n} propostas gravadas em {time.perf_counter() - inicio:.1f}s")
+
+        for modo in args.modos.split(","):
+            segundos = float(_rodar(caminho, modo, False)[1])
+            _, _, final, pico, itens = _rodar(caminho, modo, True)
+            final, pico = int(final) / 2**20, int(pico) / 2**20
+            print(
+                f"  {modo:10} {segundos:7.2f} s  final {final:8.1f} MiB  "
+                f"pico {pico:8.1f} MiB  ({pico / final:.2f}x)  {itens} itens"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark de escrita do StorageManager: conexão por operação x pool WAL.
+
+Uso:
+    python scripts/bench_storage.py --n 2000 --profile balanced
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_propostas.models import Cliente  # noqa: E402
+from gestor_propostas.services.storage import ConnectionPool, StorageManager  # noqa: E402
+
+
+@contextmanager
+def _db_temporario(nome: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        antigo = StorageManager.DB_PATH
+        StorageManager.DB_PATH = os.path.join(tmp, nome)
+        try:
+            yield
+        finally:
+            StorageManager.close_all()
+            StorageManager.DB_PATH = antigo
+
+
+def _legacy_conn():
+    # comportamento antigo: nova conexão (journal de rollback) a cada chamada
+    StorageManager._ensure_db_dir()
+    conn = sqlite3.connect(StorageManager.DB_PATH)
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+def _medir(n: int) -> float:
+    StorageManager.init_db()
+    clientes = [Cliente(f"Cliente {i}", f"{i:011d}", "contato@example.com") for i in range(n)]
+    inicio = time.perf_counter()
+    for cliente in clientes:
+        StorageManager.salvar_ou_atualizar_cliente(cliente)
+    return n / (time.perf_counter() - inicio)
+
+
+def _medir_lote(n: int) -> float:
+    StorageManager.init_db()
+    clientes = [Cliente(f"Cliente {i}", f"{i:011d}", "contato@example.com") for i in range(n)]
+    inicio = time.perf_counter()
+    StorageManager.salvar_muitos_clientes(clientes)
+    return n / (time.perf_counter() - inicio)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de escritas no SQLite")
+    parser.add_argument("--n", type=int, default=2000, help="Quantidade de escritas")
+    parser.add_argument(
+        "--profile", default="balanced", help="Perfil de PRAGMA do pool (safe, balanced, fast)"
+    )
+    args = parser.parse_args()
+
+    original_get_conn = StorageManager.__dict__["_get_conn"]
+    original_pool = StorageManager.pool
+
+    with _db_temporario("legacy.db"):
+        StorageManager._get_conn = classmethod(lambda cls: _legacy_conn())
+        try:
+            antes = _medir(args.n)
+        finally:
+            StorageManager._get_conn = original_get_conn
+
+    with _db_temporario("pool.db"):
+        StorageManager.pool = ConnectionPool(args.profile)
+        try:
+            depois = _medir(args.n)
+        finally:
+            StorageManager.pool = original_pool
+
+    with _db_temporario("lote.db"):
+        StorageManager.pool = ConnectionPool(args.profile)
+        try:
+            lote = _medir_lote(args.n)
+        finally:
+            StorageManager.pool = original_pool
+
+    print(f"escritas: {args.n}")
+    print(f"antes  (conexão por escrita): {antes:10.0f} writes/s")
+    print(f"depois (pool WAL, {args.profile}): {depois:10.0f} writes/s")
+    print(f"lote   (salvar_muitos_clientes):  {lote:10.0f} writes/s")
+    print(f"ganho: {depois / antes:.1f}x (pool), {lote / antes:.1f}x (lote)")
+
+
+if __name__ == "__main__":
+    main()
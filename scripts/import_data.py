@@ -0,0 +1,86 @@
+"""Importa clientes, propostas e itens de arquivos CSV ou JSONL (ver services/bulk_import.py).
+
+Uso:
+    python scripts/import_data.py --clientes clientes.csv --propostas propostas.jsonl --itens itens.csv
+    python scripts/import_data.py --nome legado-2019 --lote 5000 --propostas propostas.jsonl --rejeitados rejeitados.jsonl
+
+Cada lote é gravado numa transação com o seu checkpoint: se a importação
+parar no meio, rode o mesmo comando (mesmo --nome) para continuar de onde parou.
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gestor_propostas.services.bulk_import import TIPOS, BulkImporter  # noqa: E402
+from gestor_propostas.services.storage import StorageManager  # noqa: E402
+
+# rejeições mostradas no terminal quando não há --rejeitados
+REJEICOES_NA_TELA = 20
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importação em massa de clientes, propostas e itens")
+    for tipo in TIPOS:
+        parser.add_argument(f"--{tipo}", metavar="ARQUIVO", help=f"Arquivo .csv ou .jsonl de {tipo}")
+    parser.add_argument("--nome", default="importacao", help="Identifica a importação para retomar depois")
+    parser.add_argument("--lote", type=int, default=1000, help="Registros por lote (e por transação)")
+    parser.add_argument("--db", help="Banco a usar (padrão: DEALFLOW_DB_PATH ou instance/dealflow.db)")
+    parser.add_argument("--rejeitados", metavar="ARQUIVO", help="Grava os registros recusados em JSONL")
+    args = parser.parse_args()
+
+    arquivos = [(tipo, getattr(args, tipo)) for tipo in TIPOS if getattr(args, tipo)]
+    if not arquivos:
+        parser.error("informe ao menos um de --clientes, --propostas ou --itens")
+
+    if args.db:
+        StorageManager.DB_PATH = args.db
+    StorageManager.init_db()
+
+    saida_rejeitados = open(args.rejeitados, "a", encoding="utf-8") if args.rejeitados else None
+    mostrados = 0
+
+    def rejeitado(tipo: str, numero: int, motivo: str) -> None:
+        nonlocal mostrados
+        if saida_rejeitados is not None:
+            saida_rejeitados.write(json.dumps({"tipo": tipo, "registro": numero, "motivo": motivo}) + "\n")
+        elif mostrados < REJEICOES_NA_TELA:
+            mostrados += 1
+            print(f"  {tipo} registro {numero}: {motivo}", file=sys.stderr)
+
+    def progresso(resultado) -> None:
+        print(
+            f"\r  {resultado.tipo}: {resultado.retomado_em + resultado.lidos} registros "
+            f"({resultado.por_segundo:,.0f}/s)",
+            end="",
+            file=sys.stderr,
+            flush=True,
+        )
+
+    importador = BulkImporter(args.nome, args.lote, rejeitado=rejeitado, progresso=progresso)
+    resultados = []
+    try:
+        for tipo, caminho in arquivos:
+            resultado = importador.importar(tipo, caminho)
+            print(file=sys.stderr)
+            if resultado.retomado_em:
+                estado = "já concluído" if not resultado.lidos else f"retomado após {resultado.retomado_em}"
+                print(f"  {tipo}: {estado}", file=sys.stderr)
+            resultados.append(resultado)
+    finally:
+        if saida_rejeitados is not None:
+            saida_rejeitados.close()
+        StorageManager.close_all()
+
+    print(f"{'tipo':10} {'lidos':>10} {'importados':>11} {'rejeitados':>11} {'segundos':>9} {'registros/s':>12}")
+    for r in resultados:
+        print(
+            f"{r.tipo:10} {r.lidos:10} {r.importados:11} {r.rejeitados:11} "
+            f"{r.segundos:9.1f} {r.por_segundo:12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,23 @@ import argparse
 import os
 
 from gestor_propostas.auth import AuthManager, USERS_FILE
+from gestor_propostas.services.aggregates import AggregateEngine
+from gestor_propostas.services.migrations import MigrationRunner
 from gestor_propostas.services.storage import StorageManager
 
 
+def _imprimir_status(runner: MigrationRunner) -> None:
+    status = runner.status()
+    print(f"Versão do schema: {status['versao_atual']} (mais recente: {status['versao_mais_recente']})")
+    for versao, descricao, aplicada_em in status["aplicadas"]:
+        print(f"  v{versao} {descricao} ({aplicada_em})")
+    if status["pendentes"]:
+        print(f"Migrações pendentes: {', '.join(map(str, status['pendentes']))}")
+    for nome, ultimo_id, concluido in status["backfills"]:
+        estado = "concluído" if concluido else f"em andamento (último id {ultimo_id})"
+        print(f"Backfill {nome}: {estado}")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Inicializa o banco do DealFlow")
     parser.add_argument(
@@ -12,15 +26,72 @@ def main() -> None:
         action="store_true",
         help="Remove o banco e os usuários antes de recriar as tabelas.",
     )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Mostra a versão do schema, migrações pendentes e backfills, sem alterar nada.",
+    )
+    parser.add_argument(
+        "--target",
+        type=int,
+        default=None,
+        help="Migra só até a versão informada.",
+    )
+    parser.add_argument(
+        "--skip-backfill",
+        action="store_true",
+        help="Aplica só as migrações de schema; os backfills podem rodar depois.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Linhas por lote (e por transação) nos backfills.",
+    )
+    parser.add_argument(
+        "--check-metrics",
+        action="store_true",
+        help="Compara as métricas do dashboard com as propostas, sem alterar nada.",
+    )
+    parser.add_argument(
+        "--rebuild-metrics",
+        action="store_true",
+        help="Recalcula do zero as métricas do dashboard.",
+    )
     args = parser.parse_args()
 
+    runner = MigrationRunner(StorageManager)
+
+    if args.status:
+        _imprimir_status(runner)
+        return
+
+    if args.check_metrics:
+        divergentes = AggregateEngine().verificar()
+        for (status, mes), (gravado, recalculado) in sorted(divergentes.items()):
+            print(f"  {status} {mes}: tabela={gravado} propostas={recalculado}")
+        print(f"Métricas do dashboard: {len(divergentes)} grupo(s) divergente(s).")
+        return
+
+    if args.rebuild_metrics:
+        divergentes = AggregateEngine().reconstruir()
+        print(f"Métricas do dashboard reconstruídas ({divergentes} grupo(s) divergiam).")
+        return
+
     if args.reset:
-        if os.path.exists(StorageManager.DB_PATH):
-            os.remove(StorageManager.DB_PATH)
+        StorageManager.close_all()
+        for sufixo in ("", "-wal", "-shm"):
+            if os.path.exists(StorageManager.DB_PATH + sufixo):
+                os.remove(StorageManager.DB_PATH + sufixo)
         if os.path.exists(USERS_FILE):
             os.remove(USERS_FILE)
 
-    StorageManager.init_db()
+    aplicadas = runner.migrar(alvo=args.target)
+    if aplicadas:
+        print(f"Migrações aplicadas: {', '.join(map(str, aplicadas))}")
+    if not args.skip_backfill:
+        for nome, lotes in runner.executar_backfills(lote=args.batch_size).items():
+            print(f"Backfill {nome}: {lotes} lote(s) processado(s)")
     AuthManager.ensure_default_admin()
 
     print("Banco inicializado. Usuário admin garantido.")
@@ -35,6 +35,16 @@ document.addEventListener("DOMContentLoaded", () => {
         }
     };
 
+    // "selecionar todas" das ações em lote (ver propostas.html)
+    document.querySelectorAll('[data-selecionar-todas]').forEach(todas => {
+        const nome = todas.getAttribute('data-selecionar-todas');
+        todas.addEventListener('change', () => {
+            document.querySelectorAll(`input[type="checkbox"][name="${nome}"]`).forEach(cb => {
+                cb.checked = todas.checked;
+            });
+        });
+    });
+
     updateIcon();
 
     btn.addEventListener("click", () => {
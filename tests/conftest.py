@@ -0,0 +1,20 @@
+import pytest
+
+import gestor_propostas
+from gestor_propostas import models
+from gestor_propostas.services.storage import StorageManager
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(StorageManager, "DB_PATH", str(tmp_path / "dealflow.db"))
+    # inicializar() instala alocador e repositório globais; o teardown os
+    # devolve ao estado anterior para não apontarem para o banco removido
+    monkeypatch.setattr(models, "_alocador_ids", models._alocador_ids)
+    globais = {nome: vars(gestor_propostas)[nome] for nome in ("gestor", "repositorio") if nome in vars(gestor_propostas)}
+    StorageManager.init_db()
+    yield StorageManager
+    StorageManager.close_all()
+    for nome in ("gestor", "repositorio"):
+        vars(gestor_propostas).pop(nome, None)
+    vars(gestor_propostas).update(globais)
@@ -0,0 +1,47 @@
+from gestor_propostas.models import ItemProposta
+from gestor_propostas.services.aggregates import AggregateEngine
+from gestor_propostas.services.repository import Repository
+
+
+def _proposta(repo, cliente, valor, status="rascunho"):
+    proposta = repo.criar_proposta(cliente, "P")
+    proposta.adicionar_item(ItemProposta("Servico", 1, valor))
+    proposta.alterar_status(status)
+    repo.salvar_proposta(proposta, itens=True)
+    return proposta
+
+
+def test_metricas_acompanham_as_gravacoes(db):
+    repo = Repository()
+    cliente = repo.criar_cliente("ACME")
+    p1 = _proposta(repo, cliente, 100.0, "aceita")
+    _proposta(repo, cliente, 50.0)
+    p3 = _proposta(repo, cliente, 30.0, "enviada")
+
+    p1.definir_desconto_percentual(10)
+    repo.salvar_proposta(p1)
+    p3.adicionar_item(ItemProposta("Extra", 2, 5.0))
+    p3.alterar_status("aceita")
+    repo.salvar_proposta(p3, itens=True)
+    repo.excluir_proposta(_proposta(repo, cliente, 7.0, "aceita").id)
+
+    resumo = repo.resumo_dashboard()
+    assert resumo["total_propostas"] == 3
+    assert resumo["qtd_aceitas"] == 2
+    assert resumo["valor_total_aceitas"] == 130.0
+    assert resumo["status_counts"] == [("rascunho", 1), ("aceita", 2)]
+    assert repo.agregados.verificar() == {}
+
+
+def test_reconstruir_corrige_divergencia(db):
+    repo = Repository()
+    _proposta(repo, repo.criar_cliente("ACME"), 100.0, "aceita")
+    with db.transacao() as conn:
+        conn.execute("UPDATE metricas_dashboard SET soma = soma + 1")
+
+    # persistida: outra instância (reinício) enxerga o mesmo estado
+    engine = AggregateEngine()
+    assert list(engine.verificar().values()) == [([1, 101.0], [1, 100.0])]
+    assert engine.reconstruir() == 1
+    assert engine.verificar() == {}
+    assert engine.resumo()["valor_total_aceitas"] == 100.0
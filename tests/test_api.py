@@ -0,0 +1,69 @@
+import base64
+import json
+
+import pytest
+from flask import Flask
+from werkzeug.security import generate_password_hash
+
+from gestor_propostas import auth
+from gestor_propostas.models import ItemProposta
+from gestor_propostas.services.repository import Repository
+
+
+@pytest.fixture
+def cliente_http(db, tmp_path, monkeypatch):
+    monkeypatch.setenv("DEALFLOW_FUZZY_MAX_BYTES", "0")
+    monkeypatch.setattr(auth, "USERS_FILE", str(tmp_path / "users.json"))
+    senha = generate_password_hash("segredo", method="pbkdf2:sha256:1000")
+    usuarios = {"admin": {"password": senha}, "api": {"password": senha}}
+    (tmp_path / "users.json").write_text(json.dumps(usuarios))
+
+    from gestor_propostas import api
+
+    repo = Repository()
+    monkeypatch.setattr(api, "repositorio", repo)
+    monkeypatch.setattr(api, "_credenciais", {})
+    app = Flask(__name__)
+    app.secret_key = "teste"
+    app.register_blueprint(api.bp)
+    return app.test_client(), repo
+
+
+def _get(http, url, senha="segredo"):
+    token = base64.b64encode(f"api:{senha}".encode()).decode()
+    return http.get(url, headers={"Authorization": f"Basic {token}"})
+
+
+def test_exige_autenticacao(cliente_http):
+    http, _ = cliente_http
+
+    assert http.get("/api/v1/clientes").status_code == 401
+    resposta = _get(http, "/api/v1/clientes", senha="errada")
+    assert resposta.status_code == 401
+    assert resposta.get_json() == {"erro": "Autenticação necessária."}
+
+
+def test_campos_cursor_e_lote(cliente_http):
+    http, repo = cliente_http
+    acme = repo.criar_cliente("ACME")
+    ids = []
+    for i in range(3):
+        proposta = repo.criar_proposta(acme, f"P{i}")
+        proposta.adicionar_item(ItemProposta("Servico", 1, 10.0 * (i + 1)))
+        repo.salvar_proposta(proposta, itens=True)
+        ids.append(proposta.id)
+
+    pagina = _get(http, "/api/v1/propostas?limit=2&fields=id,total").get_json()
+    assert pagina["dados"] == [{"id": ids[0], "total": 10.0}, {"id": ids[1], "total": 20.0}]
+    seguinte = _get(http, f"/api/v1/propostas?limit=2&fields=id&apos={pagina['proximo']}").get_json()
+    assert seguinte["dados"] == [{"id": ids[2]}] and seguinte["proximo"] is None
+
+    lote = _get(http, f"/api/v1/propostas?ids={ids[2]},{ids[0]}&fields=id,cliente,itens").get_json()
+    assert [p["id"] for p in lote["dados"]] == [ids[2], ids[0]]
+    assert lote["dados"][0]["cliente"] == {"id": acme.id, "nome": "ACME"}
+    assert lote["dados"][0]["itens"][0]["total"] == 30.0
+
+    assert "itens" not in _get(http, f"/api/v1/propostas/{ids[0]}").get_json()
+    assert _get(http, "/api/v1/propostas/999").status_code == 404
+    assert _get(http, "/api/v1/propostas?fields=id,senha").status_code == 400
+    assert _get(http, "/api/v1/clientes?ids=1,x").status_code == 400
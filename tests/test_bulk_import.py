@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from gestor_propostas.services.bulk_import import BulkImporter
+from gestor_propostas.services.repository import Repository
+
+
+def _arquivos(tmp_path, n=10):
+    clientes = tmp_path / "clientes.csv"
+    clientes.write_text("id,nome,documento\nC1,ACME,123\nC2,Beta,\n,Sem id,\n", encoding="utf-8")
+    propostas = tmp_path / "propostas.jsonl"
+    linhas = [
+        json.dumps({"id": f"P{i}", "cliente_id": "C1" if i % 2 else "C2", "titulo": f"Legado {i}",
+                    "data_criacao": "2019-03-01T10:00:00", "status": "aceita"})
+        for i in range(n)
+    ]
+    linhas += [json.dumps({"id": "PX", "cliente_id": "C9"}), "{quebrado", json.dumps({"id": "P0", "cliente_id": "C1"})]
+    propostas.write_text("\n".join(linhas) + "\n", encoding="utf-8")
+    itens = tmp_path / "itens.csv"
+    itens.write_text(
+        "proposta_id,descricao,quantidade,valor_unitario\n"
+        + "".join(f"P{i},Servico,2,\"10,5\"\n" for i in range(n))
+        + "P0,Sem quantidade,,1\n",
+        encoding="utf-8",
+    )
+    return clientes, propostas, itens
+
+
+def test_importa_resolvendo_ids_de_origem(db, tmp_path):
+    clientes, propostas, itens = _arquivos(tmp_path)
+    rejeitados = []
+    importador = BulkImporter("teste", tamanho_lote=4, rejeitado=lambda *r: rejeitados.append(r))
+
+    resultados = [importador.importar(tipo, str(arquivo)) for tipo, arquivo in
+                  (("clientes", clientes), ("propostas", propostas), ("itens", itens))]
+
+    assert [(r.importados, r.rejeitados) for r in resultados] == [(2, 1), (10, 3), (10, 1)]
+    assert [(tipo, numero) for tipo, numero, _ in rejeitados] == [
+        ("clientes", 3), ("propostas", 11), ("propostas", 12), ("propostas", 13), ("itens", 11)
+    ]
+    repo = Repository()
+    assert repo.contar_propostas() == 10
+    resumo = repo.resumo_dashboard()
+    assert resumo["qtd_aceitas"] == 10 and resumo["valor_total_aceitas"] == pytest.approx(210.0)
+    assert {p.cliente.nome for p in repo.listar_propostas(limit=20)} == {"ACME", "Beta"}
+
+    # já concluída: rodar de novo não duplica
+    assert BulkImporter("teste").importar("propostas", str(propostas)).importados == 0
+    assert repo.contar_propostas() == 10
+
+
+def test_retoma_do_ultimo_lote_gravado(db, tmp_path, monkeypatch):
+    clientes, propostas, _ = _arquivos(tmp_path, n=9)
+    BulkImporter("teste").importar("clientes", str(clientes))
+
+    importador = BulkImporter("teste", tamanho_lote=4)
+    gravar = importador._gravar
+    lotes = []
+
+    def falha_no_segundo_lote(*args):
+        lotes.append(args)
+        if len(lotes) == 2:
+            raise RuntimeError("queda")
+        gravar(*args)
+
+    monkeypatch.setattr(importador, "_gravar", falha_no_segundo_lote)
+    with pytest.raises(RuntimeError):
+        importador.importar("propostas", str(propostas))
+    assert Repository().contar_propostas() == 4
+
+    retomado = BulkImporter("teste", tamanho_lote=4).importar("propostas", str(propostas))
+    assert retomado.retomado_em == 4
+    assert (retomado.importados, retomado.rejeitados) == (5, 3)
+    assert Repository().contar_propostas() == 9
+
+
+def test_valores_com_separador_de_milhar(db, tmp_path):
+    (tmp_path / "clientes.csv").write_text("id,nome\nC1,ACME\n", encoding="utf-8")
+    (tmp_path / "propostas.csv").write_text(
+        "id,cliente_id,tipo_desconto,desconto_valor,desconto_percentual\n"
+        'P1,C1,R,"1.000,00",\n'
+        'P2,C1,%,,"12,5"\n',
+        encoding="utf-8",
+    )
+    (tmp_path / "itens.csv").write_text(
+        "proposta_id,descricao,quantidade,valor_unitario\n"
+        'P1,Licença,2,"R$ 1.234,56"\n'
+        "P2,Suporte,1,1234.5\n",
+        encoding="utf-8",
+    )
+    importador = BulkImporter("milhar")
+    for tipo in ("clientes", "propostas", "itens"):
+        assert importador.importar(tipo, str(tmp_path / f"{tipo}.csv")).rejeitados == 0
+
+    linhas = db._get_conn().execute("SELECT subtotal, desconto, total FROM propostas ORDER BY id").fetchall()
+    assert linhas == [(2469.12, 1000.0, 1469.12), (1234.5, pytest.approx(154.3125), pytest.approx(1080.1875))]
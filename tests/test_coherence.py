@@ -0,0 +1,93 @@
+import sqlite3
+
+from gestor_propostas.models import GestorPropostas, ItemProposta
+from gestor_propostas.services.coherence import ChangeFeed
+from gestor_propostas.services.repository import Repository
+
+
+def _outro_worker(db, *comandos):
+    # outra conexão, como um worker em outro processo
+    conn = sqlite3.connect(db.DB_PATH)
+    with conn:
+        for comando in comandos:
+            conn.execute(comando)
+    conn.close()
+
+
+def _popular(repo):
+    cliente = repo.criar_cliente("ACME")
+    proposta = repo.criar_proposta(cliente, "Site")
+    proposta.adicionar_item(ItemProposta("Servico", 1, 100.0))
+    repo.salvar_proposta(proposta, itens=True)
+    return cliente, proposta
+
+
+def test_cache_descarta_o_que_outro_worker_gravou(db):
+    repo = Repository(cache_size=10)
+    _, proposta = _popular(repo)
+    repo.sincronizar()
+    cacheada = repo.obter_proposta(proposta.id)
+    repo.sincronizar()
+    assert repo.obter_proposta(proposta.id) is cacheada
+
+    _outro_worker(db, f"UPDATE propostas SET titulo = 'Loja' WHERE id = {proposta.id}")
+    repo.sincronizar()
+
+    assert repo.obter_proposta(proposta.id).titulo == "Loja"
+
+
+def test_gestor_recarrega_so_as_linhas_alteradas(db):
+    repo = Repository(GestorPropostas())
+    cliente, proposta = _popular(repo)
+    outra = repo.criar_proposta(cliente, "App")
+    repo.sincronizar()
+    outra = repo.gestor.obter_proposta_por_id(outra.id)
+
+    _outro_worker(
+        db,
+        f"UPDATE clientes SET nome = 'ACME S/A' WHERE id = {cliente.id}",
+        "INSERT INTO clientes (id, nome) VALUES (900, 'Beta')",
+        "INSERT INTO propostas (id, cliente_id, titulo, data_criacao, status) "
+        "VALUES (900, 900, 'Nova', '2024-01-01 00:00:00', 'enviada')",
+        "INSERT INTO itens (proposta_id, descricao, quantidade, valor_unitario) VALUES (900, 'X', 2, 10)",
+        f"DELETE FROM itens WHERE proposta_id = {proposta.id}",
+    )
+    repo.sincronizar()
+
+    gestor = repo.gestor
+    assert cliente.nome == "ACME S/A"
+    assert gestor.obter_proposta_por_id(900).calcular_total() == 20.0
+    assert gestor.obter_proposta_por_id(900).cliente is gestor.obter_cliente_por_id(900)
+    assert gestor.obter_proposta_por_id(proposta.id).itens == []
+    # o que não mudou continua o mesmo objeto
+    assert gestor.obter_proposta_por_id(outra.id) is outra
+    assert gestor.contagem_por_status() == {"rascunho": 2, "enviada": 1}
+
+
+def test_log_podado_alem_do_lido_pede_recarga(db):
+    feed = ChangeFeed(manter=1)
+    feed.posicionar()
+    _outro_worker(db, *(f"INSERT INTO clientes (nome) VALUES ('c{i}')" for i in range(5)))
+    ChangeFeed(manter=1).podar()
+
+    assert feed.novas() is None
+    assert feed.novas() == {}
+
+
+def test_carregar_gestor_reaplica_o_que_foi_gravado_durante_a_carga(db, monkeypatch):
+    repo = Repository()
+    cliente, proposta = _popular(repo)
+    carregar_tudo = db.carregar_tudo
+
+    def carregar_e_gravar(gestor, **opcoes):
+        carregar_tudo(gestor, **opcoes)
+        # gravado depois das leituras da carga, antes de o gestor entrar em uso
+        _outro_worker(db, f"UPDATE propostas SET titulo = 'Loja' WHERE id = {proposta.id}")
+
+    monkeypatch.setattr(db, "carregar_tudo", carregar_e_gravar)
+    gestor = GestorPropostas()
+    repo.carregar_gestor(gestor)
+
+    assert repo.gestor is gestor
+    assert gestor.obter_proposta_por_id(proposta.id).titulo == "Loja"
+    assert repo.obter_proposta(proposta.id) is gestor.obter_proposta_por_id(proposta.id)
@@ -0,0 +1,72 @@
+from gestor_propostas.services.fuzzy import TrigramIndex, normalizar
+from gestor_propostas.services.repository import Repository
+
+
+def test_normalizar_remove_acentos_e_pontuacao():
+    assert normalizar("Associação  São-João!") == "associacao sao joao"
+    assert normalizar("123.456.789-00") == "123 456 789 00"
+    assert normalizar(None) == ""
+
+
+def test_busca_tolera_acentos_e_erros():
+    indice = TrigramIndex()
+    indice.carregar(
+        [
+            (1, "João da Silva", "123.456.789-00"),
+            (2, "Associação Beta", ""),
+            (3, "Maria Souza", "987.654.321-00"),
+        ]
+    )
+
+    assert indice.buscar("joao")[0][0] == 1
+    assert indice.buscar("asociacao")[0][0] == 2
+    assert indice.buscar("maria sousa")[0][0] == 3
+    assert indice.buscar("12345678900")[0] == (1, 1.0)
+    assert indice.buscar("zzz") == []
+
+
+def test_empate_favorece_nome_mais_curto():
+    indice = TrigramIndex()
+    indice.carregar([(1, "Ana Paula Ferreira Gomes", ""), (2, "Ana Paula", "")])
+
+    assert [cid for cid, _ in indice.buscar("ana paula")] == [2, 1]
+
+
+def test_reindexar_e_remover():
+    indice = TrigramIndex()
+    indice.adicionar(1, "Carlos", "")
+    indice.adicionar(1, "Beatriz", "")
+    assert indice.buscar("carlos") == []
+    assert indice.buscar("beatriz")[0][0] == 1
+
+    indice.remover(1)
+    assert indice.buscar("beatriz") == []
+    assert len(indice) == 0
+
+
+def test_orcamento_de_memoria():
+    indice = TrigramIndex(max_bytes=20_000)
+    total = indice.carregar((i, f"Cliente {i}", "") for i in range(1, 1000))
+
+    assert 0 < total < 999
+    assert indice.excedido
+    assert indice.bytes_usados <= 20_000
+
+
+def test_repositorio_sugere_clientes_novos(db):
+    repo = Repository()
+    repo.criar_cliente("João da Silva")
+    assert [c.nome for c, _ in repo.sugerir_clientes("joao")] == ["João da Silva"]
+
+    # criados depois da construção do índice (inclusive por outro processo)
+    repo.criar_cliente("Conceição Ltda")
+    db.salvar_ou_atualizar_cliente(db.cliente_from_row((99, "Sebastião", "", "")))
+    assert repo.sugerir_clientes("conseicao")[0][0].nome == "Conceição Ltda"
+    assert repo.sugerir_clientes("sebastiao")[0][0].id == 99
+
+
+def test_sem_orcamento_usa_fts(db):
+    repo = Repository(fuzzy_max_bytes=0)
+    repo.criar_cliente("Associação Beta")
+
+    assert [c.nome for c, _ in repo.sugerir_clientes("associa")] == ["Associação Beta"]
@@ -0,0 +1,88 @@
+import pytest
+from flask import Flask
+
+import gestor_propostas
+from gestor_propostas.models import ItemProposta
+from gestor_propostas.services.repository import Repository
+from gestor_propostas.services.storage import StorageManager
+
+
+@pytest.fixture
+def ui_http(db, monkeypatch):
+    monkeypatch.setenv("DEALFLOW_FUZZY_MAX_BYTES", "0")
+    from flask_wtf import CSRFProtect
+
+    from gestor_propostas import auth, ui
+
+    repo = Repository()
+    monkeypatch.setattr(ui, "repositorio", repo)
+    app = Flask(__name__, template_folder=gestor_propostas.TEMPLATE_DIR, static_folder=gestor_propostas.STATIC_DIR)
+    app.secret_key = "teste"
+    CSRFProtect(app)
+    app.register_blueprint(ui.bp)
+    app.register_blueprint(auth.bp)
+    http = app.test_client()
+    with http.session_transaction() as sessao:
+        sessao["username"] = "admin"
+    return http, repo
+
+
+def _proposta(repo):
+    proposta = repo.criar_proposta(repo.criar_cliente("ACME"), "Site")
+    proposta.adicionar_item(ItemProposta("Servico", 1, 100.0))
+    repo.salvar_proposta(proposta, itens=True)
+    return proposta
+
+
+def test_versao_muda_a_cada_alteracao(db):
+    repo = Repository()
+    proposta = _proposta(repo)
+    versoes = [repo.versao_proposta(proposta.id)[0]]
+
+    proposta.itens[0].descricao = "Consultoria"
+    repo.salvar_proposta(proposta, itens=True)
+    versoes.append(repo.versao_proposta(proposta.id)[0])
+    proposta.cliente.nome = "ACME S/A"
+    StorageManager.salvar_muitos_clientes([proposta.cliente])
+    versoes.append(repo.versao_proposta(proposta.id)[0])
+
+    assert len(set(versoes)) == 3
+    assert repo.versao_proposta(proposta.id)[1] is not None
+    assert repo.versao_proposta(999) is None
+
+
+@pytest.mark.parametrize("url", ["/propostas/{pid}", "/propostas/{pid}/pdf", "/propostas/excel"])
+def test_304_sem_gerar_de_novo_ate_a_proxima_alteracao(ui_http, url):
+    http, repo = ui_http
+    proposta = _proposta(repo)
+    url = url.format(pid=proposta.id)
+
+    primeira = http.get(url)
+    etag = primeira.headers["ETag"]
+    assert primeira.status_code == 200 and not etag.startswith("W/")
+
+    repetida = http.get(url, headers={"If-None-Match": etag})
+    assert repetida.status_code == 304 and repetida.data == b""
+
+    proposta.alterar_status("enviada")
+    repo.salvar_proposta(proposta)
+    depois = http.get(url, headers={"If-None-Match": etag})
+    assert depois.status_code == 200 and depois.headers["ETag"] != etag
+
+
+
+def test_mensagem_pendente_nao_vira_304(ui_http):
+    http, repo = ui_http
+    http.application.config["WTF_CSRF_ENABLED"] = False
+    proposta = _proposta(repo)
+    url = f"/propostas/{proposta.id}"
+    etag = http.get(url).headers["ETag"]
+
+    # POST inválido: nada muda no banco, mas o erro precisa aparecer
+    http.post(f"/propostas/{proposta.id}/add_item", data={"descricao": "", "quantidade": "1"})
+    com_erro = http.get(url, headers={"If-None-Match": etag})
+    assert com_erro.status_code == 200
+    assert "Descrição é obrigatória." in com_erro.get_data(as_text=True)
+
+    # mostrada a mensagem, a mesma versão volta a responder 304
+    assert http.get(url, headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,81 @@
+import multiprocessing
+import threading
+import time
+
+from gestor_propostas.services.ids import IdAllocator
+from gestor_propostas.services.storage import StorageManager
+
+
+def _alocar_em_processo(db_path, quantidade, saida):
+    StorageManager.DB_PATH = db_path
+    alocador = IdAllocator(bloco=16)
+    saida.put([alocador.proximo("propostas") for _ in range(quantidade)])
+
+
+def test_blocos_por_alocador_sem_ida_ao_banco_por_id(db):
+    alocador = IdAllocator(bloco=10)
+
+    assert [alocador.proximo("clientes") for _ in range(3)] == [1, 2, 3]
+    # outro processo reserva o bloco seguinte
+    assert IdAllocator(bloco=10).proximo("clientes") == 11
+    assert db._get_conn().execute("SELECT proximo FROM id_blocos WHERE tabela = 'clientes'").fetchone()[0] == 21
+
+
+def test_respeita_ids_gravados_diretamente(db):
+    with db.transacao() as conn:
+        conn.execute("INSERT INTO clientes (id, nome) VALUES (500, 'ACME')")
+
+    assert IdAllocator().proximo("clientes") == 501
+
+
+def test_estresse_threads_e_processos_sem_colisao(db):
+    alocadores = [IdAllocator(bloco=7), IdAllocator(bloco=13)]
+    por_thread = []
+
+    def alocar(alocador):
+        por_thread.append([alocador.proximo("propostas") for _ in range(300)])
+
+    threads = [threading.Thread(target=alocar, args=(alocadores[i % 2],)) for i in range(16)]
+    ctx = multiprocessing.get_context("spawn")
+    saida = ctx.Queue()
+    processos = [ctx.Process(target=_alocar_em_processo, args=(db.DB_PATH, 500, saida)) for _ in range(4)]
+    for worker in threads + processos:
+        worker.start()
+    ids = [i for _ in processos for i in saida.get(timeout=60)]
+    for worker in threads + processos:
+        worker.join()
+
+    ids += [i for lote in por_thread for i in lote]
+    assert len(ids) == 16 * 300 + 4 * 500
+    assert len(set(ids)) == len(ids)
+
+
+def test_thread_em_transacao_nao_espera_reserva_de_outra(db):
+    alocador = IdAllocator(bloco=4)
+    em_transacao = threading.Event()
+    liberar = threading.Event()
+    resultado = {}
+
+    def escritor():
+        with db.transacao():
+            em_transacao.set()
+            # outra thread já está reservando (e esperando por este lock de escrita)
+            liberar.wait(5)
+            resultado["escritor"] = alocador.proximo("clientes")
+
+    def leitor():
+        em_transacao.wait(5)
+        resultado["leitor"] = alocador.proximo("clientes")
+
+    threads = [threading.Thread(target=escritor), threading.Thread(target=leitor)]
+    for thread in threads:
+        thread.start()
+    em_transacao.wait(5)
+    time.sleep(0.2)
+    inicio = time.perf_counter()
+    liberar.set()
+    for thread in threads:
+        thread.join(10)
+
+    assert time.perf_counter() - inicio < 2
+    assert len(set(resultado.values())) == 2
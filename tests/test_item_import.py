@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+from gestor_propostas.services.item_import import linhas_texto, linhas_xlsx
+
+
+def test_separador_deduzido_e_linhas_vazias_ignoradas():
+    tsv = "Descrição\tQtd\tValor\nCabo\t100\t2,50\n\nConector\t20\n"
+    assert list(linhas_texto(io.StringIO(tsv, newline=""))) == [
+        (1, ["Descrição", "Qtd", "Valor"]),
+        (2, ["Cabo", "100", "2,50"]),
+        (4, ["Conector", "20", ""]),
+    ]
+
+    ponto_e_virgula = "Cabo;1;1.234,56\n"
+    assert list(linhas_texto(io.StringIO(ponto_e_virgula))) == [(1, ["Cabo", "1", "1.234,56"])]
+
+    virgula = 'Cabo,1,"2,50",extra\n'
+    assert list(linhas_texto(io.StringIO(virgula))) == [(1, ["Cabo", "1", "2,50"])]
+    assert list(linhas_texto(io.StringIO(""))) == []
+
+
+def test_planilha_xlsx():
+    openpyxl = pytest.importorskip("openpyxl")
+    pasta = openpyxl.Workbook()
+    aba = pasta.active
+    aba.append(["Descrição", "Quantidade", "Valor"])
+    aba.append(["Cabo", 3.0, 2.5])
+    aba.append([None, None, None])
+    aba.append(["Switch", 1, 1200])
+    arquivo = io.BytesIO()
+    pasta.save(arquivo)
+    arquivo.seek(0)
+
+    assert list(linhas_xlsx(arquivo)) == [
+        (1, ["Descrição", "Quantidade", "Valor"]),
+        (2, ["Cabo", "3", "2.5"]),
+        (4, ["Switch", "1", "1200"]),
+    ]
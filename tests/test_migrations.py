@@ -0,0 +1,100 @@
+from gestor_propostas.services.migrations import MIGRATIONS, Backfill, Migration, MigrationRunner
+
+
+def _indices(conn, tabela):
+    return {row[1] for row in conn.execute(f"PRAGMA index_list({tabela})")}
+
+
+def test_init_db_registra_versao_e_cria_indices(db):
+    conn = db._get_conn()
+
+    assert MigrationRunner(db).versao_atual() == MIGRATIONS[-1].versao
+    assert "idx_itens_proposta" in _indices(conn, "itens")
+    assert {"idx_propostas_cliente", "idx_propostas_status", "idx_propostas_data_criacao"} <= _indices(
+        conn, "propostas"
+    )
+
+
+def test_migrar_e_idempotente(db):
+    assert MigrationRunner(db).migrar() == []
+
+
+def test_migrar_ignora_versao_aplicada_por_outro_worker(db):
+    # pendentes() lido antes de outro worker aplicar as mesmas migrações
+    runner = MigrationRunner(db)
+    runner.pendentes = lambda: list(MIGRATIONS)
+
+    assert runner.migrar() == []
+    assert db._get_conn().execute("SELECT COUNT(*) FROM schema_version").fetchone()[0] == len(MIGRATIONS)
+
+
+def test_backfill_retomavel_em_lotes(db):
+    conn = db._get_conn()
+    with db.transacao():
+        conn.executemany(
+            "INSERT INTO clientes (id, nome) VALUES (?, ?)", [(i, f"c{i}") for i in range(1, 11)]
+        )
+
+    def maiusculas(conn, inicio, fim):
+        conn.execute("UPDATE clientes SET nome = UPPER(nome) WHERE id > ? AND id <= ?", (inicio, fim))
+
+    migracoes = list(MIGRATIONS) + [
+        Migration(99, "teste", backfills=(Backfill("clientes_maiusculas", "clientes", maiusculas),))
+    ]
+    runner = MigrationRunner(db, migracoes)
+    runner.migrar()
+
+    # interrompe depois de 2 lotes e retoma de onde parou
+    assert runner.executar_backfills(lote=3, max_lotes=2) == {"clientes_maiusculas": 2}
+    assert conn.execute("SELECT COUNT(*) FROM clientes WHERE nome = UPPER(nome)").fetchone()[0] == 6
+
+    runner.executar_backfills(lote=3)
+    assert conn.execute("SELECT COUNT(*) FROM clientes WHERE nome = UPPER(nome)").fetchone()[0] == 10
+    assert ("clientes_maiusculas", 10, 1) in runner.status()["backfills"]
+
+
+def test_backfill_de_totais(db):
+    conn = db._get_conn()
+    with db.transacao():
+        conn.execute("INSERT INTO clientes (id, nome) VALUES (1, 'ACME')")
+        conn.execute(
+            "INSERT INTO propostas (id, cliente_id, titulo, data_criacao, status, tipo_desconto, desconto_percentual) "
+            "VALUES (1, 1, 'Site', '2024-01-01 00:00:00', 'aceita', '%', 10)"
+        )
+        conn.execute("INSERT INTO itens (proposta_id, descricao, quantidade, valor_unitario) VALUES (1, 'x', 2, 50)")
+        # simula um banco anterior à migração 4
+        conn.execute("UPDATE propostas SET subtotal = 0, desconto = 0, total = 0")
+        conn.execute("UPDATE schema_backfill SET concluido = 0, ultimo_id = 0 WHERE nome = 'totais_propostas'")
+
+    MigrationRunner(db).executar_backfills()
+
+    assert conn.execute("SELECT subtotal, desconto, total FROM propostas").fetchone() == (100.0, 10.0, 90.0)
+
+
+def test_versao_e_log_contam_uma_vez_por_alteracao(db):
+    from gestor_propostas.models import Cliente, ItemProposta, Proposta
+
+    conn = db._get_conn()
+    cliente = Cliente("ACME")
+    db.salvar_ou_atualizar_cliente(cliente)
+    proposta = Proposta(cliente, "Site")
+
+    def estado():
+        log = conn.execute("SELECT COUNT(*) FROM alteracoes WHERE tabela = 'propostas'").fetchone()[0]
+        return conn.execute("SELECT versao FROM propostas WHERE id = ?", (proposta.id,)).fetchone()[0], log
+
+    db.salvar_ou_atualizar_proposta(proposta)
+    assert estado() == (1, 1)
+    proposta.adicionar_item(ItemProposta("Servico", 1, 100.0))
+    db.sincronizar_itens_proposta(proposta)
+    assert estado() == (2, 2)
+    proposta.itens[0].quantidade = 2
+    db.sincronizar_itens_proposta(proposta)
+    assert estado() == (3, 3)
+    proposta.alterar_status("enviada")
+    db.salvar_ou_atualizar_proposta(proposta)
+    assert estado() == (4, 4)
+    # gravar de novo sem mudança não gera versão nem log
+    db.salvar_ou_atualizar_proposta(proposta)
+    assert estado() == (4, 4)
+    assert conn.execute("SELECT total FROM propostas WHERE id = ?", (proposta.id,)).fetchone()[0] == 200.0
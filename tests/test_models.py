@@ -1,6 +1,8 @@
+import threading
+
 import pytest
 
-from gestor_propostas.models import Cliente, ItemProposta, Proposta
+from gestor_propostas.models import Cliente, GestorPropostas, ItemProposta, Proposta, TemplateProposta
 
 
 def test_calculo_total_sem_desconto():
@@ -45,3 +47,147 @@ def test_status_valido_e_invalido():
 
     with pytest.raises(ValueError):
         proposta.alterar_status("desconhecido")
+
+
+def test_gestor_indices_por_id_status_cliente_e_mes():
+    gestor = GestorPropostas()
+    acme = gestor.criar_cliente("ACME")
+    beta = gestor.criar_cliente("Beta")
+    p1 = gestor.criar_proposta(acme, "Um")
+    p2 = gestor.criar_proposta(beta, "Dois")
+    mes = p1.data_criacao.strftime("%Y-%m")
+
+    assert gestor.obter_proposta_por_id(p2.id) is p2
+    assert gestor.obter_cliente_por_id(acme.id) is acme
+    assert gestor.propostas_por_status("rascunho") == [p1, p2]
+    assert gestor.propostas_do_cliente(beta.id) == [p2]
+    assert gestor.propostas_do_mes(mes) == [p1, p2]
+
+    gestor.alterar_status_proposta(p1, "aceita")
+    assert gestor.propostas_por_status("aceita") == [p1]
+    assert gestor.contagem_por_status() == {"rascunho": 1, "aceita": 1}
+
+    gestor.remover_proposta(p2.id)
+    assert gestor.obter_proposta_por_id(p2.id) is None
+    assert gestor.propostas_do_cliente(beta.id) == []
+    assert gestor.propostas == [p1]
+
+
+def test_gestor_remover_template_desvincula_propostas():
+    gestor = GestorPropostas()
+    template = gestor.criar_template("Padrão")
+    proposta = gestor.criar_proposta(gestor.criar_cliente("ACME"), template_id=template.id)
+
+    gestor.remover_template(template.id)
+
+    assert gestor.obter_template_por_id(template.id) is None
+    assert proposta.template_id is None
+
+
+def test_subtotal_em_cache_acompanha_itens():
+    proposta = Proposta(Cliente("ACME"))
+    servico = ItemProposta("Servico", 2, 100.0)
+    proposta.adicionar_item(servico)
+    proposta.adicionar_item(ItemProposta("Produto", 1, 50.0))
+    assert proposta.calcular_subtotal() == 250.0
+
+    servico.quantidade = 3
+    assert proposta.calcular_subtotal() == 350.0
+
+    removido = proposta.itens.pop()
+    assert proposta.calcular_subtotal() == 300.0
+    # item fora da proposta não altera mais o subtotal
+    removido.valor_unitario = 1000.0
+    assert proposta.calcular_subtotal() == 300.0
+
+    proposta.itens[0] = ItemProposta("Outro", 1, 10.0)
+    assert proposta.calcular_subtotal() == 10.0
+    proposta.itens = [ItemProposta("A", 1, 1.0), ItemProposta("B", 2, 2.0)]
+    assert proposta.calcular_subtotal() == 5.0
+    proposta.itens.clear()
+    assert proposta.calcular_subtotal() == 0
+
+
+def test_total_usa_desconto_atual_sobre_subtotal_em_cache():
+    proposta = Proposta(Cliente("ACME"))
+    proposta.adicionar_item(ItemProposta("Servico", 2, 100.0))
+    assert proposta.calcular_total() == 200.0
+
+    proposta.definir_desconto_percentual(10)
+    assert proposta.calcular_total() == 180.0
+    # atributos alterados diretamente (como faz o StorageManager) também valem
+    proposta.tipo_desconto, proposta.desconto_valor = "R", 250.0
+    assert proposta.calcular_total() == 0.0
+
+
+def test_modelos_sem_dict_por_instancia():
+    cliente = Cliente("ACME")
+    for obj in (cliente, Proposta(cliente), ItemProposta("A", 1, 1.0), TemplateProposta("T")):
+        assert not hasattr(obj, "__dict__")
+
+
+def test_snapshot_nao_muda_com_escritas_posteriores():
+    gestor = GestorPropostas()
+    acme = gestor.criar_cliente("ACME")
+    p1 = gestor.criar_proposta(acme, "Um")
+    antes = gestor.snapshot()
+
+    gestor.alterar_status_proposta(p1, "aceita")
+    p2 = gestor.criar_proposta(acme, "Dois")
+    gestor.remover_proposta(p1.id)
+
+    assert antes.propostas == [p1]
+    assert antes.contagem_por_status() == {"rascunho": 1}
+    assert gestor.snapshot().propostas == [p2]
+    assert gestor.contagem_por_status() == {"rascunho": 1}
+
+
+def test_lote_publica_tudo_de_uma_vez_ou_nada():
+    gestor = GestorPropostas()
+    acme = gestor.criar_cliente("ACME")
+
+    with gestor.lote():
+        gestor.criar_proposta(acme, "Um")
+        assert gestor.propostas == []
+    assert len(gestor.propostas) == 1
+
+    with pytest.raises(RuntimeError):
+        with gestor.lote():
+            gestor.limpar()
+            raise RuntimeError("falhou no meio")
+    assert len(gestor.propostas) == 1
+    assert gestor.listar_clientes() == [acme]
+
+
+def test_leitores_concorrentes_veem_versoes_consistentes():
+    gestor = GestorPropostas()
+    acme = gestor.criar_cliente("ACME")
+    propostas = [gestor.criar_proposta(acme) for _ in range(200)]
+    erros = []
+    parar = threading.Event()
+
+    def ler():
+        while not parar.is_set():
+            versao = gestor.snapshot()
+            try:
+                if sum(versao.contagem_por_status().values()) != len(versao.propostas):
+                    erros.append("contagem")
+                for proposta in versao.propostas_por_status("aceita"):
+                    if versao.obter_proposta_por_id(proposta.id) is None:
+                        erros.append("indice")
+            except RuntimeError as exc:  # dicionário alterado durante a iteração
+                erros.append(repr(exc))
+
+    leitores = [threading.Thread(target=ler) for _ in range(8)]
+    for leitor in leitores:
+        leitor.start()
+    for proposta in propostas:
+        gestor.alterar_status_proposta(proposta, "aceita")
+        gestor.remover_proposta(proposta.id)
+        gestor.registrar_proposta(proposta)
+    parar.set()
+    for leitor in leitores:
+        leitor.join()
+
+    assert erros == []
+    assert gestor.contagem_por_status() == {"aceita": 200}
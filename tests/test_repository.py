@@ -0,0 +1,243 @@
+import base64
+import json
+
+import pytest
+
+from gestor_propostas.models import Cliente, GestorPropostas, ItemProposta, Proposta
+from gestor_propostas.services.repository import IdentityMap, Repository
+
+
+def _popular(repo):
+    acme = repo.criar_cliente("ACME")
+    beta = repo.criar_cliente("Beta Ltda")
+
+    p1 = repo.criar_proposta(acme, "Site")
+    p1.adicionar_item(ItemProposta("Servico", 2, 100.0))
+    p1.definir_desconto_percentual(10)
+    p1.alterar_status("aceita")
+    repo.salvar_proposta(p1, itens=True)
+
+    p2 = repo.criar_proposta(beta, "App")
+    p2.adicionar_item(ItemProposta("Produto", 1, 50.0))
+    repo.salvar_proposta(p2, itens=True)
+    return p1, p2
+
+
+def test_obter_proposta_do_banco(db):
+    p1, _ = _popular(Repository())
+
+    carregada = Repository().obter_proposta(p1.id)
+
+    assert carregada is not p1
+    assert carregada.cliente.nome == "ACME"
+    assert carregada.calcular_total() == 180.0
+
+
+def test_filtros_e_paginacao_no_sql(db):
+    _, p2 = _popular(Repository())
+    repo = Repository()
+
+    assert [p.id for p in repo.listar_propostas(q="beta")] == [p2.id]
+    assert repo.contar_propostas(status="aceita") == 1
+    assert len(repo.listar_propostas(limit=1, offset=1)) == 1
+    assert repo.listar_status() == ["aceita", "rascunho"]
+
+
+def test_resumo_dashboard_agrega_no_banco(db):
+    _popular(Repository())
+
+    resumo = Repository().resumo_dashboard()
+
+    assert resumo["total_propostas"] == 2
+    assert resumo["qtd_aceitas"] == 1
+    assert resumo["valor_total_aceitas"] == 180.0
+    assert dict(resumo["status_counts"]) == {"aceita": 1, "rascunho": 1}
+
+
+def test_cache_de_identidade_limitado(db):
+    p1, p2 = _popular(Repository())
+    repo = Repository(cache_size=1)
+
+    primeira = repo.obter_proposta(p1.id)
+    assert repo.obter_proposta(p1.id) is primeira
+
+    repo.obter_proposta(p2.id)
+    assert repo.obter_proposta(p1.id) is not primeira
+
+
+def test_identity_map_desativado():
+    mapa = IdentityMap(0)
+    mapa.put(("proposta", 1), object())
+    assert mapa.get(("proposta", 1)) is None
+
+
+def test_gestor_pre_carregado_serve_de_mapa(db):
+    p1, _ = _popular(Repository())
+    gestor = GestorPropostas()
+    db.carregar_tudo(gestor)
+    repo = Repository(gestor)
+
+    assert repo.obter_proposta(p1.id) is gestor.obter_proposta_por_id(p1.id)
+    repo.excluir_template(999)
+    repo.excluir_proposta(p1.id)
+    assert gestor.obter_proposta_por_id(p1.id) is None
+
+
+def test_totais_mantidos_pelo_banco(db):
+    p1, p2 = _popular(Repository())
+    conn = db._get_conn()
+
+    def totais(pid):
+        return conn.execute(
+            "SELECT subtotal, desconto, total FROM propostas WHERE id = ?", (pid,)
+        ).fetchone()
+
+    assert totais(p1.id) == (200.0, 20.0, 180.0)
+
+    p1.itens[0].quantidade = 3
+    p1.definir_desconto_valor(500.0)
+    Repository().salvar_proposta(p1, itens=True)
+    assert totais(p1.id) == (300.0, 500.0, 0.0)
+
+    p1.itens.clear()
+    Repository().salvar_proposta(p1, itens=True)
+    assert totais(p1.id)[0] == 0.0
+
+    assert [p.id for p in Repository().listar_propostas(ordenar="valor")] == [p2.id, p1.id]
+
+
+def _salvar_muitas(db, n, data="2024-01-01 10:00:00"):
+    cliente = Cliente("ACME")
+    db.salvar_ou_atualizar_cliente(cliente)
+    propostas = [Proposta(cliente, f"P{i}") for i in range(n)]
+    db.salvar_muitas_propostas(propostas)
+    # a mesma data em todas: o desempate por id precisa funcionar
+    db._get_conn().execute("UPDATE propostas SET data_criacao = ?", (data,))
+    db._get_conn().commit()
+    return sorted(p.id for p in propostas)
+
+
+@pytest.mark.parametrize("ordenar", ["", "recentes", "valor"])
+def test_paginacao_por_cursor_percorre_tudo_e_volta(db, ordenar):
+    ids = _salvar_muitas(db, 23)
+    repo = Repository()
+
+    paginas, apos = [], None
+    while True:
+        pagina = repo.paginar_propostas(ordenar=ordenar, limit=5, apos=apos)
+        paginas.append([p.id for p in pagina.registros])
+        if not pagina.proximo:
+            break
+        apos = pagina.proximo
+
+    vistos = [pid for ids_pagina in paginas for pid in ids_pagina]
+    assert sorted(vistos) == ids and len(vistos) == len(set(vistos))
+    assert [len(ids_pagina) for ids_pagina in paginas] == [5, 5, 5, 5, 3]
+
+    # de volta a partir da última página
+    anterior = repo.paginar_propostas(ordenar=ordenar, limit=5, antes=pagina.anterior)
+    assert [p.id for p in anterior.registros] == paginas[-2]
+    assert anterior.proximo and anterior.anterior
+
+
+def test_cursor_de_outra_ordenacao_volta_ao_inicio(db):
+    _salvar_muitas(db, 8)
+    repo = Repository()
+    cursor = repo.paginar_propostas(ordenar="valor", limit=3).proximo
+
+    pagina = repo.paginar_propostas(ordenar="recentes", limit=3, apos=cursor)
+
+    primeira = repo.paginar_propostas(ordenar="recentes", limit=3)
+    assert [p.id for p in pagina.registros] == [p.id for p in primeira.registros]
+    assert pagina.anterior is None
+    assert repo.paginar_propostas(limit=3, apos="lixo").anterior is None
+
+
+@pytest.mark.parametrize("valores", [5, "5", [[1], 2], [{"a": 1}, 2]])
+def test_cursor_com_valores_malformados_volta_ao_inicio(db, valores):
+    _salvar_muitas(db, 4)
+    repo = Repository()
+    chave = repo._consulta(None, None, None)[4]
+    cursor = base64.urlsafe_b64encode(
+        json.dumps([",".join(chave[0]), chave[1], valores]).encode()
+    ).decode()
+
+    pagina = repo.paginar_propostas(limit=3, apos=cursor)
+
+    assert pagina.anterior is None and len(pagina.registros) == 3
+
+
+def test_contagem_sem_busca_vem_das_metricas_e_com_busca_fica_em_cache(db):
+    _popular(Repository())
+    repo = Repository()
+
+    assert repo.contar_propostas() == 2
+    assert repo.contar_propostas(status="ACEITA") == 1
+    assert repo.contar_propostas(q="beta") == 1
+    assert len(repo._contagens) == 1
+
+    cliente = repo.listar_clientes()[0]
+    repo.salvar_proposta(repo.criar_proposta(cliente, "Beta 2"))
+    assert repo.contar_propostas(q="beta") == 2
+
+
+def test_leitura_em_lote_mantem_ordem_e_ignora_ausentes(db):
+    p1, p2 = _popular(Repository())
+    repo = Repository()
+
+    propostas = repo.obter_propostas([p2.id, 999, p1.id, p2.id])
+    assert [p.id for p in propostas] == [p2.id, p1.id]
+    assert propostas[1].calcular_total() == 180.0
+    assert [c.nome for c in repo.obter_clientes([p2.cliente.id, p1.cliente.id])] == ["Beta Ltda", "ACME"]
+
+    primeira = repo.paginar_clientes(limit=1)
+    segunda = repo.paginar_clientes(limit=1, apos=primeira.proximo)
+    assert [c.nome for c in primeira.registros + segunda.registros] == ["ACME", "Beta Ltda"]
+    assert segunda.proximo is None
+
+
+@pytest.mark.parametrize("pre_carregado", [False, True])
+def test_acao_em_lote_informa_resultado_por_id(db, pre_carregado):
+    p1, p2 = _popular(Repository())
+    repo = Repository(gestor=GestorPropostas()) if pre_carregado else Repository(cache_size=16)
+    if pre_carregado:
+        repo.recarregar()
+
+    resultados = repo.aplicar_em_lote("aceita", [p2.id, p1.id, 999, p2.id])
+
+    assert resultados == {p2.id: "ok", p1.id: "inalterada", 999: "nao_encontrada"}
+    assert Repository().obter_proposta(p2.id).status == "aceita"
+    assert repo.resumo_dashboard()["qtd_aceitas"] == 2
+    if pre_carregado:
+        assert {p.id for p in repo.gestor.propostas_por_status("aceita")} == {p1.id, p2.id}
+
+    assert repo.aplicar_em_lote("excluir", [p1.id, 999]) == {p1.id: "ok", 999: "nao_encontrada"}
+    assert repo.obter_proposta(p1.id) is None
+    assert repo.contar_propostas() == 1
+    with pytest.raises(ValueError):
+        repo.aplicar_em_lote("arquivar", [p2.id])
+
+
+def test_linhas_do_relatorio_iguais_as_calculadas_pelos_itens(db, tmp_path):
+    from datetime import date
+
+    from openpyxl import load_workbook
+
+    from gestor_propostas.services.excel_report import ExcelReportGenerator
+
+    repo = Repository()
+    p1, p2 = _popular(repo)
+    p1.validade = date(2024, 12, 31)
+    p1.responsavel = "Ana"
+    repo.salvar_proposta(p1)
+    p2.definir_desconto_valor(15.5)
+    repo.salvar_proposta(p2)
+
+    linhas = list(repo.linhas_relatorio())
+    assert linhas == [ExcelReportGenerator._linha(p) for p in (p1, p2)]
+    assert linhas[0][-3:] == [200.0, 20.0, 180.0]
+
+    caminho = ExcelReportGenerator.gerar_excel(iter(linhas), str(tmp_path / "propostas.xlsx"))
+    planilha = load_workbook(caminho).active
+    gravadas = list(planilha.iter_rows(min_row=2, values_only=True))
+    assert [(linha[0], linha[-1]) for linha in gravadas] == [(p1.id, 180.0), (p2.id, 34.5)]
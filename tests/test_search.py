@@ -0,0 +1,73 @@
+from gestor_propostas.models import ItemProposta
+from gestor_propostas.services.repository import Repository
+from gestor_propostas.services.search import SearchIndex, montar_consulta_fts
+
+
+def _popular(repo):
+    joao = repo.criar_cliente("João da Silva", "123.456.789-00", "joao@example.com")
+    assoc = repo.criar_cliente("Associação Beta")
+    site = repo.criar_proposta(joao, "Site institucional")
+    app = repo.criar_proposta(assoc, "Aplicativo")
+    app.adicionar_item(ItemProposta("Licença anual de servidor", 1, 100.0))
+    repo.salvar_proposta(app, itens=True)
+    return site, app
+
+
+def test_montar_consulta_fts():
+    assert montar_consulta_fts("joão sit") == '"joão"* "sit"*'
+    assert montar_consulta_fts("\"'*") is None
+    assert montar_consulta_fts("") is None
+
+
+def test_busca_sem_acento_e_por_prefixo(db):
+    site, app = _popular(Repository())
+    repo = Repository()
+
+    assert [p.id for p in repo.listar_propostas(q="joao")] == [site.id]
+    assert [p.id for p in repo.listar_propostas(q="associacao")] == [app.id]
+    assert [p.id for p in repo.listar_propostas(q="instit")] == [site.id]
+    assert [p.id for p in repo.listar_propostas(q="12345678900")] == [site.id]
+
+
+def test_busca_em_itens_e_contagem(db):
+    _, app = _popular(Repository())
+    repo = Repository()
+
+    assert [p.id for p in repo.listar_propostas(q="servidor")] == [app.id]
+    assert repo.contar_propostas(q="servidor") == 1
+    assert repo.contar_propostas(q="servidor", status="aceita") == 0
+
+
+def test_triggers_mantem_indice_atualizado(db):
+    repo = Repository()
+    site, _ = _popular(repo)
+
+    site.cliente.nome = "Maria Souza"
+    db.salvar_ou_atualizar_cliente(site.cliente)
+    assert [p.id for p in repo.listar_propostas(q="maria")] == [site.id]
+    assert repo.listar_propostas(q="joao silva") == []
+
+    repo.excluir_proposta(site.id)
+    assert repo.listar_propostas(q="maria") == []
+
+
+def test_ranking_prioriza_titulo(db):
+    repo = Repository()
+    cliente = repo.criar_cliente("ACME")
+    no_item = repo.criar_proposta(cliente, "Consultoria")
+    no_item.adicionar_item(ItemProposta("Hospedagem", 1, 1.0))
+    repo.salvar_proposta(no_item, itens=True)
+    no_titulo = repo.criar_proposta(cliente, "Hospedagem gerenciada")
+
+    ids = [pid for pid, _ in SearchIndex.buscar_propostas("hospedagem")]
+
+    assert ids == [no_titulo.id, no_item.id]
+
+
+def test_reconstruir_indices(db):
+    site, _ = _popular(Repository())
+    db._get_conn().execute("DELETE FROM propostas_fts")
+
+    SearchIndex.reconstruir()
+
+    assert [pid for pid, _ in SearchIndex.buscar_propostas("site")] == [site.id]
@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _rodar(codigo, tmp_path):
+    env = dict(
+        os.environ,
+        DEALFLOW_DB_PATH=str(tmp_path / "dealflow.db"),
+        DEALFLOW_LOG_DIR=str(tmp_path / "logs"),
+        PYTHONPATH=RAIZ,
+    )
+    return subprocess.run(
+        [sys.executable, "-c", codigo], env=env, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def test_importar_o_pacote_nao_inicializa_nada(tmp_path):
+    saida = _rodar(
+        "import sys, gestor_propostas\n"
+        "print(sorted(m for m in ('flask', 'openpyxl', 'reportlab', 'gestor_propostas.services.storage')"
+        " if m in sys.modules))",
+        tmp_path,
+    )
+
+    assert saida == "[]"
+    assert not (tmp_path / "dealflow.db").exists()
+
+
+def test_create_app_inicializa_e_adia_relatorios(tmp_path):
+    saida = _rodar(
+        "import sys, gestor_propostas\n"
+        "gestor_propostas.create_app()\n"
+        "from gestor_propostas import repositorio\n"
+        "print(repositorio is gestor_propostas.inicializar(), 'openpyxl' in sys.modules, 'reportlab' in sys.modules)\n"
+        "print([fase for fase, _ in gestor_propostas.fases_inicializacao()])",
+        tmp_path,
+    )
+
+    assert saida.splitlines()[0] == "True False False"
+    assert "init_db (migrações)" in saida
+    assert (tmp_path / "dealflow.db").exists()
+    assert (tmp_path / "logs" / "app.log").exists()
+
+
+def test_importar_os_blueprints_nao_abre_o_banco(tmp_path):
+    saida = _rodar(
+        "import gestor_propostas\n"
+        "from gestor_propostas import api, ui\n"
+        "print(api.repositorio, ui.repositorio, 'repositorio' in vars(gestor_propostas))",
+        tmp_path,
+    )
+
+    assert saida == "None None False"
+    assert not (tmp_path / "dealflow.db").exists()
@@ -0,0 +1,204 @@
+import threading
+from datetime import date, datetime
+
+import pytest
+
+from gestor_propostas.models import Cliente, GestorPropostas, ItemProposta, ItensColunares, Proposta
+from gestor_propostas.services import storage
+from gestor_propostas.services.storage import ConnectionPool, PRAGMA_PROFILES
+
+
+def test_conexao_reutilizada_na_mesma_thread(db):
+    assert db._get_conn() is db._get_conn()
+
+
+def test_conexao_separada_por_thread(db):
+    principal = db._get_conn()
+    outras = []
+
+    t = threading.Thread(target=lambda: outras.append(db._get_conn()))
+    t.start()
+    t.join()
+
+    assert outras[0] is not principal
+
+
+def test_wal_e_perfil_aplicados(tmp_path):
+    pool = ConnectionPool("fast")
+    conn = pool.get(str(tmp_path / "perfil.db"))
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 0  # OFF
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == PRAGMA_PROFILES["fast"]["cache_size"]
+    finally:
+        pool.close_all()
+
+
+def test_checkpoint_apos_escrita(db):
+    db.salvar_ou_atualizar_cliente(Cliente("ACME"))
+
+    busy, _, _ = db.checkpoint("TRUNCATE")
+
+    assert busy == 0
+
+
+def _proposta_salva(db):
+    cliente = Cliente("ACME")
+    db.salvar_ou_atualizar_cliente(cliente)
+    proposta = Proposta(cliente, "Teste")
+    db.salvar_ou_atualizar_proposta(proposta)
+    return proposta
+
+
+def _linhas_itens(db, proposta_id):
+    return db._get_conn().execute(
+        "SELECT id, descricao, quantidade, valor_unitario FROM itens WHERE proposta_id = ? ORDER BY id",
+        (proposta_id,),
+    ).fetchall()
+
+
+def test_sincronizar_itens_atribui_ids_estaveis(db):
+    proposta = _proposta_salva(db)
+    proposta.adicionar_item(ItemProposta("A", 1, 10.0))
+    proposta.adicionar_item(ItemProposta("B", 2, 20.0))
+    db.sincronizar_itens_proposta(proposta)
+    ids = [item.id for item in proposta.itens]
+
+    proposta.adicionar_item(ItemProposta("C", 3, 30.0))
+    db.sincronizar_itens_proposta(proposta)
+
+    linhas = _linhas_itens(db, proposta.id)
+    assert [linha[0] for linha in linhas[:2]] == ids
+    assert [linha[0] for linha in linhas] == [item.id for item in proposta.itens]
+
+
+def test_sincronizar_itens_atualiza_e_remove_so_o_diff(db):
+    proposta = _proposta_salva(db)
+    for desc in ("A", "B", "C"):
+        proposta.adicionar_item(ItemProposta(desc, 1, 1.0))
+    db.sincronizar_itens_proposta(proposta)
+
+    proposta.itens[0].quantidade = 5
+    removido = proposta.itens.pop(1)
+    db.sincronizar_itens_proposta(proposta)
+
+    linhas = _linhas_itens(db, proposta.id)
+    assert [(linha[1], linha[2]) for linha in linhas] == [("A", 5), ("C", 1)]
+    assert removido.id not in [linha[0] for linha in linhas]
+
+
+def _passos_para_gravar_itens(db, quantidade):
+    proposta = _proposta_salva(db)
+    for i in range(quantidade):
+        proposta.adicionar_item(ItemProposta(f"item {i}", 1, 2.5))
+    passos = []
+    conn = db._get_conn()
+    # conta instruções da VM do SQLite (a cada 100), incluindo as dos triggers
+    conn.set_progress_handler(lambda: passos.append(1), 100)
+    try:
+        db.sincronizar_itens_proposta(proposta)
+        proposta.itens.clear()
+        db.sincronizar_itens_proposta(proposta)
+    finally:
+        conn.set_progress_handler(None, 100)
+    linha = conn.execute("SELECT subtotal, total FROM propostas WHERE id = ?", (proposta.id,)).fetchone()
+    assert linha == (0.0, 0.0)
+    return len(passos)
+
+
+def test_totais_por_item_em_tempo_constante(db):
+    # quatro vezes mais itens: ~4x o trabalho (recalcular a soma a cada item daria ~16x)
+    pequeno = _passos_para_gravar_itens(db, 500)
+    grande = _passos_para_gravar_itens(db, 2000)
+    assert grande < 6 * pequeno
+
+
+def test_carregar_tudo_preserva_id_dos_itens(db):
+    proposta = _proposta_salva(db)
+    proposta.adicionar_item(ItemProposta("A", 1, 10.0))
+    db.sincronizar_itens_proposta(proposta)
+
+    gestor = GestorPropostas()
+    db.carregar_tudo(gestor)
+
+    assert gestor.obter_proposta_por_id(proposta.id).itens[0].id == proposta.itens[0].id
+
+
+def test_carregar_tudo_compacto(db):
+    proposta = _proposta_salva(db)
+    proposta.adicionar_item(ItemProposta("A", 2, 10.0))
+    proposta.adicionar_item(ItemProposta("B", 1, 5.0))
+    db.sincronizar_itens_proposta(proposta)
+
+    gestor = GestorPropostas()
+    db.carregar_tudo(gestor, compacto=True)
+    carregada = gestor.obter_proposta_por_id(proposta.id)
+
+    # subtotal sai das colunas, sem criar os objetos
+    assert isinstance(carregada._itens, ItensColunares)
+    assert carregada.calcular_subtotal() == 25.0
+    # o primeiro acesso a `itens` materializa a lista editável
+    carregada.itens[0].quantidade = 3
+    assert [(i.id, i.descricao) for i in carregada.itens] == [(i.id, i.descricao) for i in proposta.itens]
+    assert carregada.calcular_subtotal() == 35.0
+
+
+def _resumo(propostas):
+    return [
+        (p.id, p.cliente.id, p.data_criacao.replace(microsecond=0), p.validade, [(i.id, i.descricao) for i in p.itens])
+        for p in sorted(propostas, key=lambda p: p.id)
+    ]
+
+
+@pytest.mark.parametrize("paralelo", [False, True])
+def test_carregar_tudo_em_lotes(db, monkeypatch, paralelo):
+    # lotes menores que as tabelas, para passar por vários fetchmany
+    monkeypatch.setattr(storage, "LOTE_CARGA", 3)
+    clientes = [Cliente(f"Cliente {i}") for i in range(4)]
+    db.salvar_muitos_clientes(clientes)
+    propostas = [Proposta(clientes[i % 4], f"P{i}", validade=date(2025, 1, i + 1)) for i in range(10)]
+    db.salvar_muitas_propostas(propostas)
+    for proposta in propostas:
+        proposta.adicionar_item(ItemProposta("A", 1, 1.0))
+        proposta.adicionar_item(ItemProposta("B", 2, 2.0))
+        db.sincronizar_itens_proposta(proposta)
+
+    gestor = GestorPropostas()
+    db.carregar_tudo(gestor, paralelo=paralelo)
+
+    assert len(gestor.listar_clientes()) == 4
+    assert _resumo(gestor.listar_propostas()) == _resumo(propostas)
+
+
+def test_parse_de_datas(db):
+    assert db._parse_data_criacao("2024-03-05 10:20:30") == datetime(2024, 3, 5, 10, 20, 30)
+    assert isinstance(db._parse_data_criacao("lixo"), datetime)
+    assert isinstance(db._parse_data_criacao(None), datetime)
+    assert db._parse_validade("2024-03-05") == date(2024, 3, 5)
+    assert db._parse_validade("05/03/2024") is None
+    assert db._parse_validade(None) is None
+
+
+def test_upsert_atualiza_registro_existente(db):
+    cliente = Cliente("ACME")
+    db.salvar_ou_atualizar_cliente(cliente)
+
+    cliente.nome = "ACME S.A."
+    db.salvar_ou_atualizar_cliente(cliente)
+
+    linhas = db._get_conn().execute("SELECT id, nome FROM clientes").fetchall()
+    assert linhas == [(cliente.id, "ACME S.A.")]
+
+
+def test_salvar_em_lote(db):
+    clientes = [Cliente(f"Cliente {i}") for i in range(50)]
+    db.salvar_muitos_clientes(clientes)
+    propostas = [Proposta(c, "Lote") for c in clientes]
+    db.salvar_muitas_propostas(iter(propostas))
+
+    propostas[0].alterar_status("aceita")
+    db.salvar_muitas_propostas(propostas[:1])
+
+    conn = db._get_conn()
+    assert conn.execute("SELECT COUNT(*) FROM propostas").fetchone()[0] == 50
+    assert conn.execute("SELECT status FROM propostas WHERE id = ?", (propostas[0].id,)).fetchone()[0] == "aceita"
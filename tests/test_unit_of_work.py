@@ -0,0 +1,83 @@
+import pytest
+
+from gestor_propostas.models import Cliente, ItemProposta, Proposta
+from gestor_propostas.services.repository import Repository
+from gestor_propostas.services.unit_of_work import UnitOfWork
+
+
+def _contar(db, tabela):
+    return db._get_conn().execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+
+
+def test_commit_grava_tudo_em_uma_transacao(db):
+    cliente = Cliente("ACME")
+    proposta = Proposta(cliente, "Site")
+    proposta.adicionar_item(ItemProposta("Servico", 1, 10.0))
+
+    with UnitOfWork() as uow:
+        uow.salvar_cliente(cliente)
+        uow.salvar_proposta(proposta, itens=True)
+        assert _contar(db, "propostas") == 0
+
+    assert _contar(db, "propostas") == 1
+    assert _contar(db, "itens") == 1
+
+
+def test_excecao_descarta_alteracoes(db):
+    with pytest.raises(RuntimeError):
+        with UnitOfWork() as uow:
+            uow.salvar_cliente(Cliente("ACME"))
+            raise RuntimeError("falhou")
+
+    assert _contar(db, "clientes") == 0
+
+
+def test_transacao_aninhada_faz_rollback_completo(db):
+    with pytest.raises(RuntimeError):
+        with db.transacao():
+            db.salvar_ou_atualizar_cliente(Cliente("ACME"))
+            raise RuntimeError("falhou")
+
+    assert _contar(db, "clientes") == 0
+
+
+def test_sessao_do_repositorio_adia_escritas(db):
+    repo = Repository()
+    repo.abrir_sessao()
+    cliente = repo.criar_cliente("ACME")
+    template = repo.criar_template(nome="Padrão")
+    repo.criar_proposta(cliente, "Site", template_id=template.id)
+    repo.excluir_template(template.id)
+    assert _contar(db, "clientes") == 0
+
+    repo.fechar_sessao(commit=True)
+
+    assert _contar(db, "clientes") == 1
+    assert _contar(db, "templates") == 0
+    assert db._get_conn().execute("SELECT template_id FROM propostas").fetchone()[0] is None
+
+
+def test_commit_que_falha_devolve_memoria_ao_estado_do_banco(db, monkeypatch):
+    from gestor_propostas.models import GestorPropostas
+
+    repo = Repository()
+    proposta = repo.criar_proposta(repo.criar_cliente("ACME"), "Site")
+    outra = repo.criar_proposta(proposta.cliente, "App")
+    repo.carregar_gestor(GestorPropostas())
+
+    repo.abrir_sessao()
+    em_memoria = repo.obter_proposta(proposta.id)
+    em_memoria.alterar_status("aceita")
+    repo.salvar_proposta(em_memoria)
+    repo.excluir_proposta(outra.id)
+
+    def falhar(*args):
+        raise RuntimeError("disco cheio")
+
+    monkeypatch.setattr(db, "deletar_muitas_propostas", falhar)
+    with pytest.raises(RuntimeError):
+        repo.fechar_sessao(commit=True)
+
+    assert repo.obter_proposta(proposta.id).status == "rascunho"
+    assert repo.obter_proposta(outra.id) is not None
+    assert [p.id for p in repo.gestor.propostas_por_status("aceita")] == []